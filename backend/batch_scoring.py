@@ -0,0 +1,161 @@
+# batch_scoring.py
+# 大量ツイートのバズ度をNumPyでまとめて計算する（インストール: pip install numpy）
+import time
+
+import numpy as np
+
+from scoring import DEFAULT_WEIGHTS
+from timeutil import parse_created_at
+
+
+class TweetColumns:
+    def __init__(self, ids, retweets, likes, replies, quotes, created_at, followers):
+        """
+        ツイートのエンゲージメントを列ごとに保持するバッチ
+
+        Args:
+            ids: ツイートIDの配列
+            retweets, likes, replies, quotes: 各エンゲージメント数の配列
+            created_at: 投稿時刻（UNIX時刻、不明はNaN）の配列
+            followers: 投稿者のフォロワー数の配列
+        """
+        self.ids = np.asarray(ids, dtype=object)
+        self.retweets = np.asarray(retweets, dtype=np.int64)
+        self.likes = np.asarray(likes, dtype=np.int64)
+        self.replies = np.asarray(replies, dtype=np.int64)
+        self.quotes = np.asarray(quotes, dtype=np.int64)
+        self.created_at = np.asarray(created_at, dtype=np.float64)
+        self.followers = np.asarray(followers, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_records(cls, records):
+        """正規化したツイートdict（_tweet_to_record の形式）のリストから作成"""
+        n = len(records)
+        ids = np.empty(n, dtype=object)
+        counts = np.zeros((4, n), dtype=np.int64)
+        created_at = np.full(n, np.nan)
+        followers = np.zeros(n, dtype=np.int64)
+
+        for i, record in enumerate(records):
+            metrics = record.get('metrics') or {}
+            ids[i] = record['id']
+            counts[0, i] = metrics.get('retweet_count') or 0
+            counts[1, i] = metrics.get('favorite_count') or 0
+            counts[2, i] = metrics.get('reply_count') or 0
+            counts[3, i] = metrics.get('quote_count') or 0
+            timestamp = parse_created_at(record.get('created_at'))
+            if timestamp is not None:
+                created_at[i] = timestamp
+            followers[i] = (record.get('user') or {}).get('followers_count') or 0
+
+        return cls(ids, counts[0], counts[1], counts[2], counts[3], created_at, followers)
+
+    @classmethod
+    def from_batch(cls, batch):
+        """records.TweetBatch から作成（数値の列は型付き配列からまとめてコピー）"""
+        user_followers = np.array([user.followers_count or 0 for user in batch.users], dtype=np.int64)
+        user_index = np.array(batch.user_index, dtype=np.int64)
+        created_at = np.array(
+            [np.nan if t is None else t for t in map(parse_created_at, batch.created_at)], dtype=np.float64
+        )
+        return cls(
+            [str(i) for i in batch.ids],
+            np.array(batch.retweet_count, dtype=np.int64),
+            np.array(batch.favorite_count, dtype=np.int64),
+            np.array(batch.reply_count, dtype=np.int64),
+            np.array(batch.quote_count, dtype=np.int64),
+            created_at,
+            user_followers[user_index] if len(user_index) else np.zeros(0, dtype=np.int64),
+        )
+
+
+def score_batch(columns, weights=None, half_life_hours=None, min_engagement=50, now=None):
+    """
+    バズ度・エンゲージメント率・伸び判定を一括計算
+
+    Args:
+        columns (TweetColumns): 対象ツイート
+        weights (dict): エンゲージメントごとの重み（省略時は DEFAULT_WEIGHTS）
+        half_life_hours (float): 時間減衰の半減期（時間）。Noneなら減衰なし
+        min_engagement (int): 伸び判定のしきい値（is_trending_tweet と同じ基準）
+        now (float): 減衰計算の基準時刻（UNIX時刻）
+
+    Returns:
+        dict: 'buzz_score', 'engagement', 'engagement_rate', 'trending' の配列
+    """
+    w = dict(DEFAULT_WEIGHTS)
+    if weights:
+        w.update(weights)
+
+    buzz_score = (
+        columns.retweets * float(w['retweet_count'])
+        + columns.likes * float(w['favorite_count'])
+        + columns.replies * float(w['reply_count'])
+        + columns.quotes * float(w['quote_count'])
+    )
+
+    if half_life_hours:
+        if now is None:
+            now = time.time()
+        age_hours = np.maximum((now - columns.created_at) / 3600.0, 0.0)
+        # 投稿時刻が不明なツイートは減衰させない
+        decay = np.where(np.isnan(age_hours), 1.0, np.exp2(-age_hours / half_life_hours))
+        buzz_score *= decay
+
+    engagement = columns.retweets + columns.likes + columns.replies
+    engagement_rate = engagement / np.maximum(columns.followers, 1)
+
+    return {
+        'buzz_score': buzz_score,
+        'engagement': engagement,
+        'engagement_rate': engagement_rate,
+        'trending': engagement >= min_engagement,
+    }
+
+
+def top_k(scores, k, mask=None):
+    """
+    スコア上位k件のインデックスを降順で返す（argpartitionで O(n)）
+
+    Args:
+        scores: スコアの配列
+        k (int): 件数
+        mask: 対象を絞り込む真偽値配列（例: score_batch の 'trending'）
+    """
+    scores = np.asarray(scores)
+    candidates = np.flatnonzero(mask) if mask is not None else np.arange(len(scores))
+    if k <= 0 or len(candidates) == 0:
+        return candidates[:0]
+
+    values = scores[candidates]
+    if k < len(candidates):
+        part = np.argpartition(-values, k - 1)[:k]
+    else:
+        part = np.arange(len(candidates))
+    order = part[np.argsort(-values[part], kind='stable')]
+    return candidates[order]
+
+
+def rank_records(records, top_n, trending_only=False, **score_kwargs):
+    """
+    正規化したツイートdictを一括で再スコアリングして上位N件を返す
+
+    Args:
+        records (list): ツイートdictのリスト
+        top_n (int): 件数
+        trending_only (bool): 伸び判定を満たすツイートのみ対象にする
+        **score_kwargs: score_batch に渡す引数（weights, half_life_hours など）
+    """
+    columns = TweetColumns.from_records(records)
+    result = score_batch(columns, **score_kwargs)
+    mask = result['trending'] if trending_only else None
+
+    ranked = []
+    for i in top_k(result['buzz_score'], top_n, mask):
+        record = dict(records[i])
+        record['buzz_score'] = float(result['buzz_score'][i])
+        ranked.append(record)
+    return ranked
@@ -0,0 +1,186 @@
+# benchmark.py
+# オフラインのスループット計測（python benchmark.py --help）
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from rate_limiter import DEFAULT_RATE_LIMITS
+from replay_client import ReplayClient, build_synthetic_fixtures, load_fixtures, deserialize_response
+from scraper import TwikitScraper
+
+# 再生時はレート制限で待たないようにする
+UNLIMITED_RATE_LIMITS = {endpoint: 10 ** 9 for endpoint in DEFAULT_RATE_LIMITS}
+
+
+def make_scraper(fixtures, args):
+    client = ReplayClient(
+        fixtures, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, seed=args.seed
+    )
+    scraper = TwikitScraper(
+        human_like=False, user_cache_path=':memory:',
+        max_concurrency=args.concurrency, rate_limits=UNLIMITED_RATE_LIMITS, client=client
+    )
+    return scraper, client
+
+
+async def measure(name, coro_factory, fixtures, args):
+    """1ケースを計測して結果のdictを返す"""
+    # 1回目は捨てる（遅延import（near_dup の numpy など）の時間とメモリを計測に含めないため）
+    warmup, _ = make_scraper(fixtures, args)
+    await coro_factory(warmup)
+
+    scraper, client = make_scraper(fixtures, args)
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = await coro_factory(scraper)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    useful = len(result)
+    return {
+        'name': name,
+        'seconds': elapsed,
+        'tweets': useful,
+        'tweets_per_sec': useful / elapsed if elapsed else float('inf'),
+        'requests': client.request_count,
+        'requests_per_tweet': client.request_count / useful if useful else float('inf'),
+        'peak_kb': peak / 1024,
+    }
+
+
+def measure_scoring(fixtures, repeat):
+    """バズ度計算（1件ずつ / NumPy一括）の計測"""
+    raw_tweets = []
+    for payload in fixtures['responses']['get_user_tweets'].values():
+        raw_tweets.extend(deserialize_response('get_user_tweets', payload))
+    raw_tweets *= repeat
+
+    scraper = TwikitScraper(human_like=False, user_cache_path=None, client=object())
+    results = []
+
+    start = time.perf_counter()
+    for tweet in raw_tweets:
+        scraper.calculate_buzz_score(tweet)
+        scraper.is_trending_tweet(tweet)
+    elapsed = time.perf_counter() - start
+    results.append({'name': 'calculate_buzz_score (loop)', 'seconds': elapsed, 'tweets': len(raw_tweets),
+                    'tweets_per_sec': len(raw_tweets) / elapsed})
+
+    try:
+        from batch_scoring import TweetColumns, score_batch, top_k
+    except ImportError:
+        print("numpy が無いため一括スコアリングの計測はスキップします")
+        return results
+
+    records = [scraper._tweet_to_record(tweet) for tweet in raw_tweets]
+    columns = TweetColumns.from_records(records)
+    start = time.perf_counter()
+    scored = score_batch(columns, half_life_hours=24)
+    top_k(scored['buzz_score'], 60, scored['trending'])
+    elapsed = time.perf_counter() - start
+    results.append({'name': 'score_batch (numpy)', 'seconds': elapsed, 'tweets': len(records),
+                    'tweets_per_sec': len(records) / elapsed})
+    return results
+
+
+def measure_records(fixtures, repeat):
+    """保持形式（dict / TweetRecord / TweetBatch）ごとの作成時間とメモリ"""
+    from records import TweetBatch
+
+    raw_tweets = []
+    for payload in fixtures['responses']['get_user_tweets'].values():
+        raw_tweets.extend(deserialize_response('get_user_tweets', payload))
+    raw_tweets *= repeat
+    scraper = TwikitScraper(human_like=False, user_cache_path=None, client=object())
+
+    cases = [
+        ('records: dict', lambda: [scraper._tweet_to_record(t).to_dict() for t in raw_tweets]),
+        ('records: TweetRecord', lambda: [scraper._tweet_to_record(t) for t in raw_tweets]),
+        ('records: TweetBatch', lambda: TweetBatch.from_records(scraper._tweet_to_record(t) for t in raw_tweets)),
+    ]
+    results = []
+    for name, build in cases:
+        tracemalloc.start()
+        start = time.perf_counter()
+        records = build()
+        elapsed = time.perf_counter() - start
+        # 作成途中の一時オブジェクトを除いた、保持しているメモリ
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append({'name': name, 'seconds': elapsed, 'tweets': len(records),
+                        'tweets_per_sec': len(records) / elapsed, 'peak_kb': current / 1024})
+        del records
+    return results
+
+
+def print_results(results):
+    print(f"\n{'ケース':<40} {'秒':>8} {'件数':>8} {'件/秒':>12} {'req':>6} {'req/件':>8} {'peakKB':>9}")
+    for r in results:
+        print(
+            f"{r['name']:<40} {r['seconds']:>8.3f} {r['tweets']:>8} {r['tweets_per_sec']:>12.1f} "
+            f"{r.get('requests', ''):>6} {r.get('requests_per_tweet', 0):>8.2f} {r.get('peak_kb', 0):>9.1f}"
+        )
+
+
+async def run(args):
+    if args.fixtures:
+        fixtures = load_fixtures(args.fixtures)
+        main_users = args.users
+    else:
+        main_users = [f"main_user{i}" for i in range(args.main_users)]
+        fixtures = build_synthetic_fixtures(main_users, args.followers, args.tweets, args.seed)
+
+    results = [
+        await measure(
+            'get_buzz_tweets_from_users_and_followers',
+            lambda s: s.get_buzz_tweets_from_users_and_followers(
+                main_users, follower_count=args.followers, tweet_count_per_user=args.tweets,
+                min_engagement=args.min_engagement, top_n=60
+            ),
+            fixtures, args
+        ),
+        await measure(
+            'get_buzz_tweets_with_budget',
+            lambda s: s.get_buzz_tweets_with_budget(
+                main_users, follower_count=args.followers, tweet_count_per_user=args.tweets,
+                min_engagement=args.min_engagement, top_n=60, request_budget=args.request_budget,
+                score_per_follower=args.score_per_follower
+            ),
+            fixtures, args
+        ),
+        await measure(
+            'get_multiple_users_tweets',
+            lambda s: s.get_multiple_users_tweets(main_users, count_per_user=args.tweets),
+            fixtures, args
+        ),
+    ]
+    results.extend(measure_scoring(fixtures, args.scoring_repeat))
+    results.extend(measure_records(fixtures, args.scoring_repeat // 10 or 1))
+    print_results(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='TwikitScraper のオフラインベンチマーク')
+    parser.add_argument('--fixtures', help='RecordingClient で記録したフィクスチャ（省略時は合成データ）')
+    parser.add_argument('--users', nargs='*', default=[], help='フィクスチャ使用時のメインユーザー')
+    parser.add_argument('--main-users', type=int, default=2, help='合成データのメインユーザー数')
+    parser.add_argument('--followers', type=int, default=30, help='メインユーザーごとのフォロワー数')
+    parser.add_argument('--tweets', type=int, default=30, help='ユーザーごとのツイート数')
+    parser.add_argument('--min-engagement', type=int, default=100)
+    parser.add_argument('--request-budget', type=int, default=100, help='get_buzz_tweets_with_budget の予算')
+    parser.add_argument('--score-per-follower', type=float, help='get_buzz_tweets_with_budget で実績の無いフォロワーの上限見積り')
+    parser.add_argument('--concurrency', type=int, default=1, help='max_concurrency')
+    parser.add_argument('--latency', type=float, default=0.0, help='1リクエストの擬似レイテンシ（秒）')
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--scoring-repeat', type=int, default=100, help='スコアリング計測でツイートを何倍に増やすか')
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# checkpoint_store.py
+import sqlite3
+import time
+
+
+class CheckpointStore:
+    def __init__(self, path='checkpoints.db'):
+        """
+        ユーザーごとの取得済み位置（最新ツイートID・最終取得時刻・フォロワー一覧のカーソル）を保存
+
+        次回以降は最新ツイートIDより新しいツイートだけを取得すればよく、
+        ジョブが途中で止まっても取得済みのユーザー・フォロワー一覧のページから再開できる。
+
+        Args:
+            path (str): SQLiteファイルのパス
+        """
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS user_checkpoints (
+                user_id TEXT PRIMARY KEY,
+                username TEXT,
+                newest_id INTEGER,
+                last_poll REAL NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS follower_cursors (
+                user_id TEXT PRIMARY KEY,
+                cursor TEXT,
+                fetched INTEGER NOT NULL DEFAULT 0,
+                page_offset INTEGER NOT NULL DEFAULT 0,
+                updated REAL NOT NULL
+            )
+        """)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(follower_cursors)")}
+        if 'page_offset' not in columns:
+            self.conn.execute("ALTER TABLE follower_cursors ADD COLUMN page_offset INTEGER NOT NULL DEFAULT 0")
+        self.conn.commit()
+
+    def get(self, user_id):
+        """チェックポイントを取得（未登録はNone）"""
+        row = self.conn.execute(
+            "SELECT newest_id, last_poll FROM user_checkpoints WHERE user_id = ?",
+            (str(user_id),)
+        ).fetchone()
+        if row is None:
+            return None
+        return {'newest_id': row[0], 'last_poll': row[1]}
+
+    def get_since_id(self, user_id):
+        """取得済みの最新ツイートID（未登録はNone）"""
+        checkpoint = self.get(user_id)
+        return checkpoint['newest_id'] if checkpoint else None
+
+    def polled_within(self, user_id, seconds):
+        """指定秒数以内に取得済みかどうか"""
+        checkpoint = self.get(user_id)
+        return checkpoint is not None and time.time() - checkpoint['last_poll'] < seconds
+
+    def update(self, user_id, newest_id=None, username=None):
+        """
+        チェックポイントを更新（最新ツイートIDは大きくなる場合のみ更新）
+
+        Args:
+            user_id: ユーザーID
+            newest_id (int): 今回取得した中で最新のツイートID（新着なしならNone）
+            username (str): ユーザー名（参照用）
+        """
+        self.conn.execute("""
+            INSERT INTO user_checkpoints (user_id, username, newest_id, last_poll)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET
+                username = COALESCE(excluded.username, username),
+                newest_id = MAX(COALESCE(newest_id, 0), COALESCE(excluded.newest_id, 0)),
+                last_poll = excluded.last_poll
+        """, (str(user_id), username, newest_id, time.time()))
+        self.conn.commit()
+
+    def reset(self, user_id=None):
+        """チェックポイントを削除（user_id省略時は全件）"""
+        if user_id is None:
+            self.conn.execute("DELETE FROM user_checkpoints")
+            self.conn.execute("DELETE FROM follower_cursors")
+        else:
+            self.conn.execute("DELETE FROM user_checkpoints WHERE user_id = ?", (str(user_id),))
+            self.conn.execute("DELETE FROM follower_cursors WHERE user_id = ?", (str(user_id),))
+        self.conn.commit()
+
+    def get_follower_cursor(self, user_id):
+        """
+        フォロワー一覧の続きの位置を取得
+
+        Returns:
+            dict: {'cursor', 'page_offset', 'fetched', 'updated'}（未登録・最後まで取得済みはNone）
+                  cursor のページの先頭 page_offset 人は処理済み（cursor がNoneなら先頭のページ）
+        """
+        row = self.conn.execute(
+            "SELECT cursor, page_offset, fetched, updated FROM follower_cursors WHERE user_id = ?",
+            (str(user_id),)
+        ).fetchone()
+        if row is None or (row[0] is None and not row[1]):
+            return None
+        return {'cursor': row[0], 'page_offset': row[1], 'fetched': row[2], 'updated': row[3]}
+
+    def update_follower_cursor(self, user_id, cursor, fetched, page_offset=0):
+        """
+        フォロワー一覧の取得位置を保存
+
+        Args:
+            user_id: ユーザーID
+            cursor (str): 次のページのカーソル（最後まで取得したらNone。次回は先頭から）
+            fetched (int): これまでに取得したフォロワー数
+            page_offset (int): cursor のページのうち処理済みの人数（ページの途中で打ち切った場合）
+        """
+        self.conn.execute("""
+            INSERT INTO follower_cursors (user_id, cursor, fetched, page_offset, updated)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET
+                cursor = excluded.cursor,
+                fetched = excluded.fetched,
+                page_offset = excluded.page_offset,
+                updated = excluded.updated
+        """, (str(user_id), cursor, fetched, page_offset, time.time()))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
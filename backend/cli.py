@@ -0,0 +1,271 @@
+# cli.py
+# ジョブファイルの一括実行とローカルデータの参照（python cli.py --help）
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+from scoring import SCORERS
+
+logger = logging.getLogger(__name__)
+
+# ジョブの type → TwikitScraper のメソッド名
+JOB_TYPES = {
+    'user_info': 'get_user_info',
+    'user_tweets': 'get_user_tweets',
+    'users_tweets': 'get_multiple_users_tweets',
+    'followers': 'get_user_followers',
+    'trending': 'get_trending_tweets_only',
+    'buzz': 'get_buzz_tweets_from_users_and_followers',
+    'buzz_budget': 'get_buzz_tweets_with_budget',
+    'buzz_users': 'get_buzz_tweets_from_users',
+    'search': 'search_tweets',
+    'rising': 'get_rising_tweets',
+    'trends': 'get_trending_topics',
+}
+
+# ジョブファイルの session で指定できる TwikitScraper の引数
+SESSION_OPTIONS = (
+    'use_guest_mode', 'human_like', 'user_cache_path', 'max_concurrency', 'rate_limits',
+    'checkpoint_path', 'min_poll_interval', 'store_path', 'velocity_path', 'yield_path',
+    'seen_path', 'seen_ttl', 'scorer',
+)
+
+JOB_FILE_EXAMPLE = """\
+ジョブファイルの例:
+{
+  "session": {"use_guest_mode": true, "max_concurrency": 4, "store_path": "tweets.db"},
+  "jobs": [
+    {"type": "buzz", "params": {"main_usernames": ["elonmusk"], "follower_count": 30, "top_n": 60},
+     "output": "community_buzz_tweets.json"},
+    {"type": "user_tweets", "params": {"username": "orenikurue", "count": 50},
+     "output": "orenikurue.jsonl.gz"}
+  ]
+}
+"""
+
+
+def load_job_file(path):
+    """
+    ジョブファイル（JSON）を読み込む
+
+    Returns:
+        tuple: (session の dict, jobs のリスト)
+    """
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        data = {'jobs': data}
+
+    session = data.get('session') or {}
+    unknown = set(session) - set(SESSION_OPTIONS) - {'login'}
+    if unknown:
+        raise ValueError(f"session に未対応の項目があります: {', '.join(sorted(unknown))}")
+
+    jobs = data.get('jobs') or []
+    for i, job in enumerate(jobs, 1):
+        if job.get('type') not in JOB_TYPES:
+            raise ValueError(f"ジョブ{i}: type は {', '.join(JOB_TYPES)} のいずれかです")
+    return session, jobs
+
+
+def write_output(scraper, result, path, append=False):
+    """
+    結果を保存（.jsonl / .jsonl.gz / .jsonl.zst なら1行1件、それ以外はJSON）
+
+    Args:
+        append (bool): JSON Lines の既存ファイルに追記する（JSONは常に上書き）
+    """
+    from jsonl_sink import JsonlWriter
+
+    if '.jsonl' in os.path.basename(path):
+        with JsonlWriter(path, append=append) as writer:
+            for record in result if isinstance(result, list) else [result]:
+                writer.write(record)
+        logger.info(f"{writer.count}件のデータを {path} に保存しました")
+    else:
+        scraper.save_to_json(result, path)
+
+
+async def run_jobs(scraper, jobs, append=False):
+    """
+    ジョブを順に実行（1つ失敗しても残りは続ける）
+
+    Args:
+        append (bool): JSON Lines の出力に追記する（ジョブの "append" で個別に指定できる）
+
+    Returns:
+        list: ジョブごとの {'type', 'ok', 'items', 'seconds', 'requests', 'output', 'error'}
+    """
+    summaries = []
+    for i, job in enumerate(jobs, 1):
+        name = job.get('name') or job['type']
+        logger.info(f"=== ジョブ {i}/{len(jobs)}: {name} ===")
+        summary = {'name': name, 'type': job['type'], 'output': job.get('output'), 'ok': True}
+        requests_before = scraper.metrics.total_requests()
+        start = time.perf_counter()
+        try:
+            result = await getattr(scraper, JOB_TYPES[job['type']])(**(job.get('params') or {}))
+            summary['items'] = len(result) if isinstance(result, list) else int(result is not None)
+            if job.get('output') and result is not None:
+                write_output(scraper, result, job['output'], job.get('append', append))
+        except Exception as e:
+            logger.exception(f"ジョブ {name} が失敗しました")
+            summary.update(ok=False, error=str(e))
+        finally:
+            # 取得のたびに記録した推移・ユーザーキャッシュを、ジョブが失敗・中断しても次回に引き継ぐ
+            scraper.flush()
+        summary['seconds'] = time.perf_counter() - start
+        summary['requests'] = scraper.metrics.total_requests() - requests_before
+        summaries.append(summary)
+    return summaries
+
+
+async def run_job_file(args):
+    from scraper import TwikitScraper
+
+    session, jobs = load_job_file(args.job_file)
+    login = session.pop('login', False) or args.login
+    if login:
+        session['use_guest_mode'] = False
+    if args.concurrency:
+        session['max_concurrency'] = args.concurrency
+
+    scraper = TwikitScraper(**session)
+    # ログイン / activate() は全ジョブで1回だけ
+    if login:
+        await scraper.setup(
+            username=os.environ.get('X_USERNAME'),
+            email=os.environ.get('X_EMAIL'),
+            password=os.environ.get('X_PASSWORD'),
+        )
+    else:
+        await scraper.setup()
+
+    summaries = await run_jobs(scraper, jobs, args.append)
+
+    print(f"\n{'ジョブ':<30} {'結果':>4} {'件数':>6} {'req':>6} {'秒':>8}")
+    for s in summaries:
+        print(f"{s['name']:<30} {'OK' if s['ok'] else 'NG':>4} {s.get('items', 0):>6} {s['requests']:>6} {s['seconds']:>8.2f}")
+    if args.metrics:
+        with open(args.metrics, 'w', encoding='utf-8') as f:
+            f.write(scraper.metrics.to_prometheus())
+    return 0 if all(s['ok'] for s in summaries) else 1
+
+
+def search_command(args):
+    from tweet_store import TweetStore
+
+    store = TweetStore(args.store)
+    try:
+        results = store.search(args.query, args.count, args.username)
+    finally:
+        store.close()
+    for i, tweet in enumerate(results, 1):
+        print(f"{i}. @{tweet['username']} (バズ度: {tweet['buzz_score']}) {tweet['url']}")
+        print(f"   {(tweet.get('text') or '')[:150]}")
+    return 0
+
+
+def dashboard_command(args):
+    from tweet_store import TweetStore
+
+    store = TweetStore(args.store)
+    try:
+        data = store.dashboard(args.username, args.days, args.top)
+    finally:
+        store.close()
+    print(json.dumps(data, ensure_ascii=False, indent=2))
+    return 0
+
+
+def rank_command(args):
+    from scoring import rank_store, rescore_store
+    from tweet_store import TweetStore
+
+    store = TweetStore(args.store)
+    try:
+        if args.write:
+            count = rescore_store(store, args.scorer, args.username)
+            logger.info(f"{count}件のバズ度を {args.scorer} で計算し直しました")
+        results = rank_store(store, args.scorer, args.top, args.username)
+    finally:
+        store.close()
+    for i, tweet in enumerate(results, 1):
+        print(f"{i}. @{tweet['username']} ({args.scorer}: {tweet['buzz_score']}) {tweet['url']}")
+        print(f"   {(tweet.get('text') or '')[:150]}")
+    return 0
+
+
+def analytics_command(args):
+    from text_analytics import analyze_store
+
+    since = time.time() - args.days * 86400 if args.days else None
+    result = analyze_store(args.store, args.username, since, args.top, args.workers)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='X 投稿分析のバックエンド CLI')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser(
+        'run', help='ジョブファイルのジョブを1つのセッションでまとめて実行',
+        epilog=JOB_FILE_EXAMPLE, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    run_parser.add_argument('job_file', help='ジョブファイル（JSON）')
+    run_parser.add_argument('--login', action='store_true', help='ログインモード（X_USERNAME / X_EMAIL / X_PASSWORD を使用）')
+    run_parser.add_argument('--concurrency', type=int, help='max_concurrency の上書き')
+    run_parser.add_argument('--metrics', help='終了時に Prometheus 形式のメトリクスを保存するパス')
+    run_parser.add_argument('--append', action='store_true', help='JSON Lines の出力を上書きせずに追記する')
+
+    search_parser = subparsers.add_parser('search', help='収集済みツイートの全文検索（ネットワーク不要）')
+    search_parser.add_argument('query')
+    search_parser.add_argument('--store', default='tweets.db')
+    search_parser.add_argument('--count', type=int, default=20)
+    search_parser.add_argument('--username')
+
+    dashboard_parser = subparsers.add_parser('dashboard', help='ダッシュボード用の集計を表示（ネットワーク不要）')
+    dashboard_parser.add_argument('--store', default='tweets.db')
+    dashboard_parser.add_argument('--username')
+    dashboard_parser.add_argument('--days', type=int, default=7)
+    dashboard_parser.add_argument('--top', type=int, default=5)
+
+    rank_parser = subparsers.add_parser('rank', help='収集済みツイートを別のスコアラーで順位付け（ネットワーク不要）')
+    rank_parser.add_argument('--store', default='tweets.db')
+    rank_parser.add_argument('--scorer', default='zscore', choices=list(SCORERS))
+    rank_parser.add_argument('--top', type=int, default=20)
+    rank_parser.add_argument('--username')
+    rank_parser.add_argument('--write', action='store_true', help='計算し直したバズ度をストアに保存する')
+
+    analytics_parser = subparsers.add_parser('analytics', help='本文の集計（ネットワーク不要）')
+    analytics_parser.add_argument('--store', default='tweets.db')
+    analytics_parser.add_argument('--username')
+    analytics_parser.add_argument('--days', type=float)
+    analytics_parser.add_argument('--top', type=int, default=30)
+    analytics_parser.add_argument('--workers', type=int, help='プロセス数（省略時はCPU数）')
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    if args.command == 'run':
+        return asyncio.run(run_job_file(args))
+    if args.command == 'search':
+        return search_command(args)
+    if args.command == 'dashboard':
+        return dashboard_command(args)
+    if args.command == 'rank':
+        return rank_command(args)
+    return analytics_command(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+# follower_scheduler.py
+import heapq
+import sqlite3
+import time
+
+from scoring import weighted_engagement
+
+
+class TopK:
+    def __init__(self, k, key='buzz_score'):
+        """
+        スコア上位k件だけを保持するヒープ
+
+        Args:
+            k (int): 保持する件数
+            key (str): スコアのキー
+        """
+        self.k = k
+        self.key = key
+        self.heap = []
+        self.seen = 0
+
+    def push(self, record):
+        self.seen += 1
+        # 同点は先に見つかった方を優先（-seen で比較し、dict同士の比較を避ける）
+        entry = (record[self.key], -self.seen, record)
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, entry)
+        elif entry > self.heap[0]:
+            heapq.heapreplace(self.heap, entry)
+
+    def extend(self, records):
+        for record in records:
+            self.push(record)
+
+    @property
+    def full(self):
+        return len(self.heap) >= self.k
+
+    def threshold(self):
+        """上位k件に入るための最低スコア（まだk件に満たなければNone）"""
+        return self.heap[0][0] if self.full else None
+
+    def results(self):
+        """スコアの高い順のリスト"""
+        return [record for _, _, record in sorted(self.heap, reverse=True)]
+
+    def __len__(self):
+        return len(self.heap)
+
+
+class YieldStore:
+    def __init__(self, path='user_yield.db'):
+        """
+        ユーザーごとの過去の伸びツイート収穫実績
+
+        Args:
+            path (str): SQLiteファイルのパス（':memory:' で実行中のみ）
+        """
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS user_yield (
+                username TEXT PRIMARY KEY COLLATE NOCASE,
+                runs INTEGER NOT NULL DEFAULT 0,
+                tweets_checked INTEGER NOT NULL DEFAULT 0,
+                trending_count INTEGER NOT NULL DEFAULT 0,
+                best_score REAL NOT NULL DEFAULT 0,
+                last_run REAL
+            )
+        """)
+        self.conn.commit()
+
+    def get(self, username):
+        """実績を取得（未登録はNone）"""
+        row = self.conn.execute(
+            "SELECT runs, tweets_checked, trending_count, best_score FROM user_yield WHERE username = ?",
+            (username,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {'runs': row[0], 'tweets_checked': row[1], 'trending_count': row[2], 'best_score': row[3]}
+
+    def record(self, username, tweets_checked, trending_tweets):
+        """
+        1回分の評価結果を加算
+
+        Args:
+            username (str): ユーザー名
+            tweets_checked (int): チェックしたツイート数
+            trending_tweets (list): 見つかった伸びツイート
+        """
+        # 打ち切りの上限見積りに使うので、スコアラーによらず生の重み付きエンゲージメントで記録する
+        best_score = max((weighted_engagement(t) for t in trending_tweets), default=0)
+        self.conn.execute("""
+            INSERT INTO user_yield (username, runs, tweets_checked, trending_count, best_score, last_run)
+            VALUES (?, 1, ?, ?, ?, ?)
+            ON CONFLICT(username) DO UPDATE SET
+                runs = runs + 1,
+                tweets_checked = tweets_checked + excluded.tweets_checked,
+                trending_count = trending_count + excluded.trending_count,
+                best_score = MAX(best_score, excluded.best_score),
+                last_run = excluded.last_run
+        """, (username, tweets_checked, len(trending_tweets), best_score, time.time()))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class FollowerScheduler:
+    def __init__(self, yield_store, min_engagement=100, min_followers=1000, score_per_follower=None, growth_margin=1.5):
+        """
+        フォロワーを期待値の高い順に評価するための優先度付きキュー
+
+        期待値 = フォロワー数 × 過去の伸びツイート率（ラプラス平滑化、実績が無ければ0.5）。
+        上限見積り = max(過去の最高バズ度, 伸び判定未満のツイートが取り得る最大バズ度) × growth_margin。
+        実績の無いユーザーの上限は score_per_follower を指定した場合のみ フォロワー数 × score_per_follower、
+        指定しなければ無制限（必ず評価対象に残る）。
+        残り候補の上限見積りが現在の上位K件のしきい値以下になったら、それ以上順位は変わらないとみなす。
+
+        Args:
+            yield_store (YieldStore): 過去の実績
+            min_engagement (int): 伸び判定のしきい値（get_trending_tweets_only と同じ値）
+            min_followers (int): これ未満のフォロワー数のユーザーは候補にしない
+            score_per_follower (float): 実績の無いユーザーのフォロワー1人あたりのバズ度上限
+            growth_margin (float): 過去の実績に対する余裕
+        """
+        self.yield_store = yield_store
+        self.min_engagement = min_engagement
+        self.min_followers = min_followers
+        self.score_per_follower = score_per_follower
+        self.growth_margin = growth_margin
+        self.heap = []
+        self.upper_bounds = {}
+        self.skipped = 0
+
+    def estimate(self, candidate):
+        """(期待値, 上限見積り) を返す"""
+        followers = candidate['followers_count']
+        history = self.yield_store.get(candidate['username'])
+        if history is None or not history['tweets_checked']:
+            upper = followers * self.score_per_follower if self.score_per_follower else float('inf')
+            return followers * 0.5, upper
+
+        rate = (history['trending_count'] + 1) / (history['tweets_checked'] + 2)
+        # 伸び判定に届かなかったツイートのバズ度は最大でも min_engagement × 3（リツイートの重み）
+        upper = max(history['best_score'], self.min_engagement * 3) * self.growth_margin
+        return followers * rate, upper
+
+    def add(self, candidate):
+        """
+        候補を追加
+
+        Args:
+            candidate (dict): get_user_followers の要素（username, followers_count を使用）
+        """
+        username = candidate['username']
+        if username in self.upper_bounds or candidate['followers_count'] < self.min_followers:
+            self.skipped += 1
+            return False
+        expected, upper = self.estimate(candidate)
+        self.upper_bounds[username] = upper
+        heapq.heappush(self.heap, (-expected, len(self.upper_bounds), username))
+        return True
+
+    def add_many(self, candidates):
+        for candidate in candidates:
+            self.add(candidate)
+
+    def discard(self, username):
+        """評価済みのユーザーを候補から外す（メインユーザーなど）"""
+        self.upper_bounds.pop(username, None)
+
+    def max_upper_bound(self):
+        return max(self.upper_bounds.values(), default=0)
+
+    def next_batch(self, size, threshold=None):
+        """
+        次に評価する候補を最大size人返す
+
+        Args:
+            size (int): 人数
+            threshold (float): 現在の上位K件のしきい値（None ならまだK件に満たない）
+
+        Returns:
+            list: ユーザー名のリスト（もう順位が変わらない・候補が無い場合は空）
+        """
+        if threshold is not None and self.max_upper_bound() <= threshold:
+            return []
+
+        batch = []
+        while self.heap and len(batch) < size:
+            _, _, username = heapq.heappop(self.heap)
+            upper = self.upper_bounds.pop(username, None)
+            if upper is None:
+                continue
+            # 上限見積りがしきい値以下の候補は評価しても上位に入らない
+            if threshold is not None and upper <= threshold:
+                continue
+            batch.append(username)
+        return batch
+
+    def __len__(self):
+        return len(self.upper_bounds)
@@ -0,0 +1,93 @@
+# jsonl_sink.py
+import gzip
+import io
+import json
+
+from records import json_default
+
+
+def _open_binary(filename, mode, compression):
+    """圧縮形式に応じてバイナリファイルを開く"""
+    if compression is None:
+        return open(filename, mode + 'b')
+    if compression == 'gzip':
+        return gzip.open(filename, mode + 'b')
+    if compression == 'zstd':
+        # zstd はオプション（インストール: pip install zstandard）
+        import zstandard
+        raw = open(filename, mode + 'b')
+        if mode == 'r':
+            return zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+        return zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+    raise ValueError(f"未対応の圧縮形式です: {compression}")
+
+
+def guess_compression(filename):
+    """拡張子から圧縮形式を判定"""
+    if filename.endswith('.gz'):
+        return 'gzip'
+    if filename.endswith('.zst'):
+        return 'zstd'
+    return None
+
+
+class JsonlWriter:
+    def __init__(self, filename, compression='auto', flush_every=100, append=False):
+        """
+        JSON Lines 形式のストリーミング書き込み
+
+        レコードはバッファに溜めて flush_every 件ごとにまとめて書き出すので、
+        ジョブが途中で止まっても書き出し済みの分は残る。
+
+        Args:
+            filename (str): 出力ファイル名
+            compression (str): None, 'gzip', 'zstd', 'auto'（拡張子から判定）
+            flush_every (int): 何件ごとにファイルへ書き出すか
+            append (bool): 既存ファイルに追記するか（Falseなら上書き）
+        """
+        if compression == 'auto':
+            compression = guess_compression(filename)
+        self.filename = filename
+        self.compression = compression
+        self.flush_every = max(1, flush_every)
+        self.count = 0
+        self._buffer = []
+        self._file = _open_binary(filename, 'a' if append else 'w', compression)
+
+    def write(self, record):
+        """1レコード書き込み"""
+        self._buffer.append(json.dumps(record, ensure_ascii=False, default=json_default))
+        self.count += 1
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """バッファをファイルに書き出す"""
+        if self._buffer:
+            self._file.write(('\n'.join(self._buffer) + '\n').encode('utf-8'))
+            self._buffer = []
+        self._file.flush()
+
+    def close(self):
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_jsonl(filename, compression='auto'):
+    """JSON Lines ファイルを1レコードずつ読み込む（ジェネレーター）"""
+    if compression == 'auto':
+        compression = guess_compression(filename)
+    with _open_binary(filename, 'r', compression) as raw:
+        for line in io.TextIOWrapper(raw, encoding='utf-8'):
+            line = line.strip()
+            if line:
+                yield json.loads(line)
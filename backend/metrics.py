@@ -0,0 +1,187 @@
+# metrics.py
+import bisect
+import cProfile
+import functools
+import pstats
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# レイテンシヒストグラムのバケット上限（秒）
+DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """固定バケットのヒストグラム（Prometheus の histogram と同じ累積形式で出力）"""
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """(上限, 累積件数) のリスト（最後は +Inf）"""
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'avg': self.sum / self.count if self.count else 0.0,
+            'buckets': {('+Inf' if bound == float('inf') else bound): n for bound, n in self.cumulative()},
+        }
+
+
+class Metrics:
+    def __init__(self):
+        """
+        スクレイパーの計測値
+
+        - メソッドごと・エンドポイントごとのレイテンシヒストグラム
+        - エンドポイントごとのリクエスト数・エラー数・再試行数・サーキットブレーカーで止めた数
+        - 待機時間の累計（human_delay / 再試行の待機 / レート制限待ち）
+        - キャッシュのヒット率（register_cache で登録したもの）
+        """
+        self.method_latency = defaultdict(Histogram)
+        self.request_latency = defaultdict(Histogram)
+        self.requests = defaultdict(int)
+        self.errors = defaultdict(int)
+        self.retries = defaultdict(int)
+        self.rejected = defaultdict(int)
+        self.sleep_seconds = defaultdict(float)
+        self.caches = {}
+        self.started_at = time.time()
+
+    def observe_method(self, method, seconds):
+        self.method_latency[method].observe(seconds)
+
+    def observe_request(self, endpoint, seconds, error=False):
+        self.requests[endpoint] += 1
+        self.request_latency[endpoint].observe(seconds)
+        if error:
+            self.errors[endpoint] += 1
+
+    def observe_retry(self, endpoint):
+        self.retries[endpoint] += 1
+
+    def observe_rejected(self, endpoint):
+        """サーキットブレーカーが開いていて呼び出さなかった"""
+        self.rejected[endpoint] += 1
+
+    def total_requests(self):
+        """全エンドポイントのリクエスト数の合計"""
+        return sum(self.requests.values())
+
+    def add_sleep(self, reason, seconds):
+        """
+        待機時間を加算
+
+        Args:
+            reason (str): 'human_delay', 'retry_backoff', 'rate_limit' など
+            seconds (float): 待機した秒数
+        """
+        self.sleep_seconds[reason] += seconds
+
+    def register_cache(self, name, cache):
+        """hits / misses 属性を持つキャッシュを登録"""
+        self.caches[name] = cache
+
+    def snapshot(self):
+        """現在の計測値を dict で返す"""
+        caches = {}
+        for name, cache in self.caches.items():
+            total = cache.hits + cache.misses
+            caches[name] = {
+                'hits': cache.hits,
+                'misses': cache.misses,
+                'hit_rate': cache.hits / total if total else 0.0,
+            }
+
+        return {
+            'uptime_seconds': time.time() - self.started_at,
+            'requests': dict(self.requests),
+            'errors': dict(self.errors),
+            'retries': dict(self.retries),
+            'rejected': dict(self.rejected),
+            'sleep_seconds': dict(self.sleep_seconds),
+            'request_latency': {k: h.snapshot() for k, h in self.request_latency.items()},
+            'method_latency': {k: h.snapshot() for k, h in self.method_latency.items()},
+            'caches': caches,
+        }
+
+    def to_prometheus(self, prefix='scraper'):
+        """Prometheus のテキスト形式で出力"""
+        lines = []
+
+        def counter(name, help_text, values, label):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for key, value in sorted(values.items()):
+                lines.append(f'{prefix}_{name}{{{label}="{key}"}} {value}')
+
+        def histogram(name, help_text, histograms, label):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            for key, hist in sorted(histograms.items()):
+                for bound, total in hist.cumulative():
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{prefix}_{name}_bucket{{{label}="{key}",le="{le}"}} {total}')
+                lines.append(f'{prefix}_{name}_sum{{{label}="{key}"}} {hist.sum}')
+                lines.append(f'{prefix}_{name}_count{{{label}="{key}"}} {hist.count}')
+
+        counter('requests_total', 'Upstream requests by endpoint.', self.requests, 'endpoint')
+        counter('errors_total', 'Upstream errors by endpoint.', self.errors, 'endpoint')
+        counter('retries_total', 'Upstream retries by endpoint.', self.retries, 'endpoint')
+        counter('rejected_total', 'Calls rejected by an open circuit breaker.', self.rejected, 'endpoint')
+        counter('sleep_seconds_total', 'Time spent sleeping by reason.', self.sleep_seconds, 'reason')
+        histogram('request_seconds', 'Upstream request latency.', self.request_latency, 'endpoint')
+        histogram('method_seconds', 'Scraper method latency.', self.method_latency, 'method')
+
+        snapshot = self.snapshot()['caches']
+        counter('cache_hits_total', 'Cache hits.', {k: v['hits'] for k, v in snapshot.items()}, 'cache')
+        counter('cache_misses_total', 'Cache misses.', {k: v['misses'] for k, v in snapshot.items()}, 'cache')
+
+        return '\n'.join(lines) + '\n'
+
+    @contextmanager
+    def profile(self, filename=None, sort='cumulative', limit=30):
+        """
+        cProfile でブロック内の処理を計測
+
+        Args:
+            filename (str): プロファイル結果の保存先（省略時は上位を表示のみ）
+            sort (str): 表示時の並び順
+            limit (int): 表示する関数の数
+        """
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+            if filename:
+                profiler.dump_stats(filename)
+            else:
+                pstats.Stats(profiler).sort_stats(sort).print_stats(limit)
+
+
+def instrumented(func):
+    """TwikitScraper の非同期メソッドの所要時間を self.metrics に記録するデコレーター"""
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await func(self, *args, **kwargs)
+        finally:
+            self.metrics.observe_method(func.__name__, time.perf_counter() - start)
+    return wrapper
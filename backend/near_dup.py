@@ -0,0 +1,256 @@
+# near_dup.py
+import random
+import re
+import unicodedata
+import zlib
+
+from velocity import METRIC_KEYS
+
+# 2^31 - 1（メルセンヌ素数）。ハッシュ値を法で割ってから a*h + b を計算するので64bitに収まる
+_PRIME = (1 << 31) - 1
+
+_URL_RE = re.compile(r'https?://\S+')
+_MENTION_RE = re.compile(r'@\w+')
+_RT_PREFIX_RE = re.compile(r'^rt\s+@\w+:\s*')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize_text(text):
+    """
+    比較用にテキストを正規化
+
+    NFKC（全角英数・半角カナの統一）→ 小文字化 → 先頭の "RT @user:"・URL・メンションを除去 → 空白を詰める。
+    コピペ投稿は短縮URLやメンション先だけが違うことが多いため、それらは比較に含めない。
+    """
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    text = _RT_PREFIX_RE.sub('', text)
+    text = _URL_RE.sub(' ', text)
+    text = _MENTION_RE.sub(' ', text)
+    return _SPACE_RE.sub(' ', text).strip()
+
+
+def shingles(text, n=3):
+    """
+    文字n-gramの集合（日本語は単語の区切りが無いので文字単位で分割）
+
+    Args:
+        text (str): normalize_text 済みのテキスト
+        n (int): n-gramの長さ
+    """
+    if len(text) <= n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def choose_bands(num_perm, threshold):
+    """
+    LSHのバンド数と1バンドの行数を選ぶ
+
+    候補になる類似度の目安 (1/bands)^(1/rows) が threshold 以下で最大の組み合わせ
+    （取りこぼしを減らすため、しきい値より少し低めから候補にする）。
+    """
+    best = (num_perm, 1)
+    best_estimate = 0.0
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        estimate = (1.0 / bands) ** (1.0 / rows)
+        if best_estimate < estimate <= threshold:
+            best, best_estimate = (bands, rows), estimate
+    return best
+
+
+class MinHasher:
+    def __init__(self, num_perm=64, ngram=3, seed=1):
+        """
+        MinHash署名の計算
+
+        Args:
+            num_perm (int): ハッシュ関数の数（署名の長さ）
+            ngram (int): 文字n-gramの長さ
+            seed (int): ハッシュ関数の係数の乱数シード（同じシードなら同じ署名）
+        """
+        self.num_perm = num_perm
+        self.ngram = ngram
+        rng = random.Random(seed)
+        self.params = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+        # NumPyがあれば署名計算をまとめて行う（無くても同じ署名になる）。import は使うときまで遅らせる
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+        self.np = np
+        if np is not None:
+            self._a = np.array([a for a, _ in self.params], dtype=np.uint64)[:, None]
+            self._b = np.array([b for _, b in self.params], dtype=np.uint64)[:, None]
+
+    def signature(self, text):
+        """
+        テキストのMinHash署名（正規化後に空ならNone）
+        """
+        grams = shingles(normalize_text(text), self.ngram)
+        if not grams:
+            return None
+        hashes = [zlib.crc32(g.encode('utf-8')) % _PRIME for g in grams]
+        if self.np is not None:
+            values = (self._a * self.np.array(hashes, dtype=self.np.uint64) + self._b) % _PRIME
+            return tuple(values.min(axis=1).tolist())
+        return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in self.params)
+
+
+def similarity(sig1, sig2):
+    """署名の一致率（Jaccard係数の推定値）"""
+    return sum(1 for x, y in zip(sig1, sig2) if x == y) / len(sig1)
+
+
+class NearDuplicateIndex:
+    def __init__(self, threshold=0.7, num_perm=64, ngram=3, seed=1, key='buzz_score'):
+        """
+        ほぼ同じ内容のツイートをまとめるストリーミング索引（MinHash + LSH）
+
+        追加のたびにLSHのバケットから候補だけを取り出して署名を比較するので、
+        件数に対してほぼ線形の時間で済む。類似と判定したツイートは
+        Union-Findで同じクラスタにまとめ、クラスタごとに代表（key が最大）と
+        エンゲージメントの合計を保持する。
+
+        Args:
+            threshold (float): 同じ投稿とみなす推定Jaccard係数
+            num_perm (int): MinHash署名の長さ
+            ngram (int): 文字n-gramの長さ
+            seed (int): ハッシュ関数の乱数シード
+            key (str): 代表を選ぶスコアのキー
+        """
+        self.threshold = threshold
+        self.key = key
+        self.hasher = MinHasher(num_perm, ngram, seed)
+        self.bands, self.rows = choose_bands(num_perm, threshold)
+        self.buckets = [{} for _ in range(self.bands)]
+        self.signatures = []
+        self.parent = []
+        self.clusters = {}
+        self.ids = {}
+
+    def _find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def _union(self, i, j):
+        root_i, root_j = self._find(i), self._find(j)
+        if root_i == root_j:
+            return root_i
+        # 大きい方のクラスタに小さい方を統合
+        if self.clusters[root_i]['count'] < self.clusters[root_j]['count']:
+            root_i, root_j = root_j, root_i
+        self.parent[root_j] = root_i
+        self._merge_cluster(self.clusters[root_i], self.clusters.pop(root_j))
+        return root_i
+
+    def _merge_cluster(self, cluster, other):
+        cluster['count'] += other['count']
+        cluster['ids'].extend(other['ids'])
+        cluster['usernames'].update(other['usernames'])
+        for metric in METRIC_KEYS:
+            cluster['metrics'][metric] += other['metrics'][metric]
+        cluster['score'] += other['score']
+        if other['representative'][self.key] > cluster['representative'][self.key]:
+            cluster['representative'] = other['representative']
+
+    def _new_cluster(self, record):
+        metrics = record.get('metrics') or {}
+        return {
+            'representative': record,
+            'count': 1,
+            'ids': [record['id']],
+            'usernames': {record.get('username')} - {None},
+            'metrics': {metric: metrics.get(metric) or 0 for metric in METRIC_KEYS},
+            'score': record.get(self.key) or 0,
+        }
+
+    def add(self, record):
+        """
+        ツイートを追加
+
+        Args:
+            record (dict): _tweet_to_record の形式のツイート
+
+        Returns:
+            bool: 既存のクラスタに統合されたらTrue（同じIDの再追加もTrue）
+        """
+        tweet_id = str(record['id'])
+        if tweet_id in self.ids:
+            return True
+
+        index = len(self.parent)
+        self.parent.append(index)
+        self.ids[tweet_id] = index
+        self.clusters[index] = self._new_cluster(record)
+
+        signature = self.hasher.signature(record.get('text'))
+        self.signatures.append(signature)
+        if signature is None:
+            return False
+
+        candidates = set()
+        for band, bucket in enumerate(self.buckets):
+            band_key = signature[band * self.rows:(band + 1) * self.rows]
+            members = bucket.setdefault(band_key, [])
+            candidates.update(members)
+            members.append(index)
+
+        merged = False
+        for other in candidates:
+            if self._find(other) == self._find(index):
+                continue
+            if similarity(signature, self.signatures[other]) >= self.threshold:
+                self._union(index, other)
+                merged = True
+        return merged
+
+    def extend(self, records):
+        for record in records:
+            self.add(record)
+
+    def representatives(self):
+        """
+        クラスタごとの代表ツイート
+
+        代表のdictのコピーに 'duplicates'（クラスタの件数・ID・投稿者・
+        エンゲージメントとスコアの合計）を付けて返す。
+
+        Returns:
+            list: 代表ツイートのリスト
+        """
+        results = []
+        for root in sorted(self.clusters):
+            cluster = self.clusters[root]
+            record = dict(cluster['representative'])
+            record['duplicates'] = {
+                'count': cluster['count'],
+                'ids': list(cluster['ids']),
+                'usernames': sorted(cluster['usernames']),
+                'metrics': dict(cluster['metrics']),
+                self.key: cluster['score'],
+            }
+            results.append(record)
+        return results
+
+    def __len__(self):
+        """クラスタ数"""
+        return len(self.clusters)
+
+
+def dedupe_tweets(records, threshold=0.7, **kwargs):
+    """
+    ツイートのリストからほぼ同じ内容のものをまとめ、代表だけを返す
+
+    Args:
+        records (list): _tweet_to_record の形式のツイート
+        threshold (float): 同じ投稿とみなす推定Jaccard係数
+        **kwargs: NearDuplicateIndex のその他の引数
+    """
+    index = NearDuplicateIndex(threshold, **kwargs)
+    index.extend(records)
+    return index.representatives()
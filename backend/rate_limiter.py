@@ -0,0 +1,116 @@
+# rate_limiter.py
+import asyncio
+import time
+
+# エンドポイントごとの公開レート制限（15分あたりのリクエスト数）
+# https://github.com/d60/twikit/blob/main/ratelimits.md
+DEFAULT_RATE_LIMITS = {
+    'get_user_by_screen_name': 95,
+    'get_user_by_id': 500,
+    'get_user_tweets': 50,
+    'get_user_followers': 50,
+    'search_tweet': 50,
+    'get_tweet_by_id': 150,
+    'get_trends': 20000,
+}
+RATE_LIMIT_WINDOW = 15 * 60
+
+
+class TokenBucket:
+    def __init__(self, capacity, refill_per_sec):
+        """
+        トークンバケット
+
+        Args:
+            capacity (float): バケットの最大トークン数（バースト許容量）
+            refill_per_sec (float): 1秒あたりの補充トークン数
+        """
+        self.capacity = capacity
+        self.refill_per_sec = refill_per_sec
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.resume_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_sec)
+        self.updated_at = now
+
+    async def acquire(self, tokens=1):
+        """トークンを取得（足りなければ補充されるまで待機）。待機した秒数を返す"""
+        waited = 0.0
+        # ロックで待機順を保ち、後から来たリクエストの割り込みを防ぐ
+        async with self._lock:
+            pause = self.resume_at - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                waited += pause
+            if self.resume_at:
+                # 上流のウィンドウがリセットされたので満タンから再開
+                self.resume_at = 0.0
+                self.tokens = self.capacity
+                self.updated_at = time.monotonic()
+            self._refill()
+            while self.tokens < tokens:
+                wait = (tokens - self.tokens) / self.refill_per_sec
+                await asyncio.sleep(wait)
+                waited += wait
+                self._refill()
+            self.tokens -= tokens
+        return waited
+
+    def pause(self, seconds):
+        """
+        seconds 秒後まで次のトークンを出さない（上流からレート制限を返されたとき用）
+
+        上流のウィンドウはその時点でリセットされるので、再開後はバケットを満タンに戻す。
+        """
+        self.resume_at = max(self.resume_at, time.monotonic() + seconds)
+
+
+class RateLimiter:
+    def __init__(self, rate_limits=None, window=RATE_LIMIT_WINDOW, burst=1.0):
+        """
+        エンドポイントごとのトークンバケットをまとめたレートリミッター
+
+        Args:
+            rate_limits (dict): エンドポイント名→ウィンドウあたりのリクエスト数
+            window (float): レート制限のウィンドウ（秒）
+            burst (float): バケット容量の割合（1.0でウィンドウ分を一気に使える）
+        """
+        self.rate_limits = dict(DEFAULT_RATE_LIMITS)
+        if rate_limits:
+            self.rate_limits.update(rate_limits)
+        self.window = window
+        self.burst = burst
+        self.buckets = {}
+
+    def bucket(self, endpoint):
+        """エンドポイントのバケットを取得（未登録のエンドポイントは制限なし）"""
+        if endpoint not in self.buckets:
+            limit = self.rate_limits.get(endpoint)
+            if limit is None:
+                return None
+            self.buckets[endpoint] = TokenBucket(max(1.0, limit * self.burst), limit / self.window)
+        return self.buckets[endpoint]
+
+    async def acquire(self, endpoint):
+        """エンドポイントのトークンを1つ取得。待機した秒数を返す"""
+        bucket = self.bucket(endpoint)
+        if bucket is None:
+            return 0.0
+        return await bucket.acquire()
+
+    def pause(self, endpoint, seconds):
+        """
+        エンドポイントのリクエストを seconds 秒間止める
+
+        Returns:
+            bool: 止めた場合True（制限なしのエンドポイントはFalse）
+        """
+        bucket = self.bucket(endpoint)
+        if bucket is None:
+            return False
+        bucket.pause(seconds)
+        return True
@@ -0,0 +1,214 @@
+# records.py
+from array import array
+from collections.abc import Mapping
+
+# _tweet_to_record の metrics のキー（TweetRecord の属性名と同じ）
+METRIC_FIELDS = ('retweet_count', 'favorite_count', 'reply_count', 'quote_count')
+
+
+class UserRecord(Mapping):
+    __slots__ = ('id', 'name', 'username', 'followers_count', 'verified')
+
+    KEYS = __slots__
+
+    def __init__(self, id, name, username, followers_count, verified):
+        """
+        ツイートの投稿者（_tweet_to_record の 'user' と同じ項目）
+
+        同じ投稿者のツイートでは1つのインスタンスを共有する。
+        dict と同じように読み取れる（record['username'], record.get(...), dict(record)）。
+        """
+        self.id = id
+        self.name = name
+        self.username = username
+        self.followers_count = followers_count
+        self.verified = verified
+
+    @classmethod
+    def from_user(cls, user):
+        """twikitのUserオブジェクトから作成"""
+        return cls(user.id, user.name, user.screen_name, user.followers_count, user.verified)
+
+    @classmethod
+    def from_profile(cls, profile):
+        """ユーザー情報dict（get_user_info の形式）から作成"""
+        if isinstance(profile, cls):
+            return profile
+        return cls(profile['id'], profile['name'], profile['username'],
+                   profile['followers_count'], profile['verified'])
+
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS)
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in self.KEYS}
+
+    def __repr__(self):
+        return f"UserRecord({self.to_dict()!r})"
+
+
+class TweetRecord(Mapping):
+    __slots__ = ('id', 'text', 'created_at', 'user', 'buzz_score') + METRIC_FIELDS
+
+    KEYS = ('id', 'text', 'created_at', 'username', 'user_id', 'user', 'metrics', 'buzz_score', 'url')
+
+    def __init__(self, id, text, created_at, user, retweet_count=0, favorite_count=0,
+                 reply_count=0, quote_count=0, buzz_score=0):
+        """
+        正規化したツイート（_tweet_to_record の dict と同じ項目を読み取れる）
+
+        入れ子の dict や url の文字列は持たず、'metrics'・'url' などは読み取り時に作る。
+        投稿者は UserRecord を共有するので、同じユーザーのツイートが多いほど小さくなる。
+
+        Args:
+            user (UserRecord): 投稿者
+        """
+        self.id = id
+        self.text = text
+        self.created_at = created_at
+        self.user = user
+        self.retweet_count = retweet_count
+        self.favorite_count = favorite_count
+        self.reply_count = reply_count
+        self.quote_count = quote_count
+        self.buzz_score = buzz_score
+
+    @property
+    def username(self):
+        return self.user.username
+
+    @property
+    def user_id(self):
+        return self.user.id
+
+    @property
+    def metrics(self):
+        return {
+            'retweet_count': self.retweet_count,
+            'favorite_count': self.favorite_count,
+            'reply_count': self.reply_count,
+            'quote_count': self.quote_count,
+        }
+
+    @property
+    def url(self):
+        return f"https://twitter.com/{self.user.username}/status/{self.id}"
+
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS)
+
+    def to_dict(self):
+        """_tweet_to_record の形式の dict（JSON保存・API応答用）"""
+        record = {key: getattr(self, key) for key in self.KEYS}
+        record['user'] = self.user.to_dict()
+        return record
+
+    def __repr__(self):
+        return f"TweetRecord(id={self.id!r}, username={self.username!r}, buzz_score={self.buzz_score!r})"
+
+
+class TweetBatch:
+    __slots__ = ('ids', 'texts', 'created_at', 'user_index', 'users', '_user_positions',
+                 'buzz_scores') + METRIC_FIELDS
+
+    def __init__(self):
+        """
+        大量のツイートを列ごとに保持するバッチ
+
+        IDと数値は型付き配列、投稿者は重複を除いたリストへの番号で持つ。
+        TweetRecord / dict に戻せるほか、batch_scoring.TweetColumns.from_batch で
+        数値の列を1回のメモリコピーでNumPyの配列にできる。IDは数値で保持し、読み出し時は文字列に戻す。
+        """
+        self.ids = array('q')
+        self.texts = []
+        self.created_at = []
+        self.user_index = array('l')
+        self.users = []
+        self._user_positions = {}
+        self.retweet_count = array('q')
+        self.favorite_count = array('q')
+        self.reply_count = array('q')
+        self.quote_count = array('q')
+        self.buzz_scores = array('d')
+
+    @classmethod
+    def from_records(cls, records):
+        batch = cls()
+        batch.extend(records)
+        return batch
+
+    def append(self, record):
+        """
+        ツイートを追加
+
+        Args:
+            record: TweetRecord または _tweet_to_record の形式の dict
+        """
+        user = record['user']
+        position = self._user_positions.get(user['id'])
+        if position is None:
+            position = len(self.users)
+            self._user_positions[user['id']] = position
+            self.users.append(UserRecord.from_profile(user))
+
+        metrics = record['metrics']
+        self.ids.append(int(record['id']))
+        self.texts.append(record['text'])
+        self.created_at.append(record['created_at'])
+        self.user_index.append(position)
+        self.retweet_count.append(metrics.get('retweet_count') or 0)
+        self.favorite_count.append(metrics.get('favorite_count') or 0)
+        self.reply_count.append(metrics.get('reply_count') or 0)
+        self.quote_count.append(metrics.get('quote_count') or 0)
+        self.buzz_scores.append(record['buzz_score'])
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def record(self, i):
+        """i 番目のツイートを TweetRecord で返す"""
+        score = self.buzz_scores[i]
+        # calculate_buzz_score は整数を返すので、元が整数なら整数に戻す
+        if score.is_integer():
+            score = int(score)
+        return TweetRecord(
+            str(self.ids[i]), self.texts[i], self.created_at[i], self.users[self.user_index[i]],
+            self.retweet_count[i], self.favorite_count[i], self.reply_count[i], self.quote_count[i],
+            score
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.record(i)
+
+    def to_dicts(self):
+        """_tweet_to_record の形式の dict のリスト"""
+        return [record.to_dict() for record in self]
+
+
+def json_default(value):
+    """json.dumps の default（TweetRecord などは dict に変換、それ以外は文字列）"""
+    to_dict = getattr(value, 'to_dict', None)
+    if to_dict is not None:
+        return to_dict()
+    return str(value)
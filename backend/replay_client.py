@@ -0,0 +1,314 @@
+# replay_client.py
+# ネットワークなしでスクレイパーを動かすための記録・再生クライアント
+import asyncio
+import json
+import logging
+import random
+from collections import Counter
+from types import SimpleNamespace
+
+USER_FIELDS = (
+    'id', 'name', 'screen_name', 'description', 'followers_count', 'friends_count',
+    'statuses_count', 'verified', 'profile_image_url', 'created_at'
+)
+TWEET_FIELDS = (
+    'id', 'text', 'created_at', 'retweet_count', 'favorite_count', 'reply_count', 'quote_count'
+)
+
+logger = logging.getLogger(__name__)
+
+# エンドポイントごとのレスポンスの種類
+RESPONSE_KINDS = {
+    'get_user_by_screen_name': 'user',
+    'get_user_by_id': 'user',
+    'get_user_tweets': 'tweets',
+    'search_tweet': 'tweets',
+    'get_user_followers': 'users',
+    'get_tweet_by_id': 'tweet',
+    'get_trends': 'trends',
+}
+
+
+class ReplayError(Exception):
+    """再生クライアントのエラー（注入したエラーや未記録のリクエスト）"""
+
+
+class InjectedError(ReplayError):
+    """
+    error_rate で注入する障害
+
+    上流の一時的な障害の再現なので、retry では再試行する一時的な障害に分類される。
+    """
+
+
+class UnrecordedRequestError(ReplayError, KeyError):
+    """
+    未記録のリクエスト
+
+    twikit は存在しないユーザーなどのレスポンスを解析するときに KeyError になるので、
+    それと同じく恒久的なエラーとして扱われるよう KeyError も継承する。
+    """
+
+    __str__ = Exception.__str__
+
+
+def serialize_user(user):
+    return {field: getattr(user, field, None) for field in USER_FIELDS}
+
+
+def serialize_tweet(tweet):
+    data = {field: getattr(tweet, field, None) for field in TWEET_FIELDS}
+    user = getattr(tweet, 'user', None)
+    data['user'] = serialize_user(user) if user is not None else None
+    return data
+
+
+def serialize_response(endpoint, response):
+    """APIのレスポンスをJSONに保存できる形に変換"""
+    kind = RESPONSE_KINDS[endpoint]
+    if kind == 'user':
+        return serialize_user(response)
+    if kind == 'tweet':
+        return serialize_tweet(response)
+    if kind == 'trends':
+        return {'items': [{'name': trend.name, 'url': getattr(trend, 'url', None)} for trend in response]}
+
+    serialize = serialize_tweet if kind == 'tweets' else serialize_user
+    return {
+        'items': [serialize(item) for item in response],
+        'next_cursor': getattr(response, 'next_cursor', None),
+    }
+
+
+class ReplayPage(list):
+    """twikitの Result の代わり（リスト + next_cursor）"""
+
+    def __init__(self, items, next_cursor=None):
+        super().__init__(items)
+        self.next_cursor = next_cursor
+
+
+def _to_user(data):
+    return SimpleNamespace(**data)
+
+
+def _to_tweet(data):
+    data = dict(data)
+    if data.get('user') is not None:
+        data['user'] = _to_user(data['user'])
+    else:
+        data.pop('user', None)
+    return SimpleNamespace(**data)
+
+
+def deserialize_response(endpoint, payload, count=None):
+    """保存したレスポンスをtwikitのオブジェクト相当に戻す"""
+    kind = RESPONSE_KINDS[endpoint]
+    if kind == 'user':
+        return _to_user(payload)
+    if kind == 'tweet':
+        return _to_tweet(payload)
+    if kind == 'trends':
+        return [SimpleNamespace(**item) for item in payload['items']]
+
+    convert = _to_tweet if kind == 'tweets' else _to_user
+    items = payload['items'][:count] if count else payload['items']
+    return ReplayPage([convert(item) for item in items], payload.get('next_cursor'))
+
+
+def request_key(endpoint, args, kwargs):
+    """レスポンスを引くためのキー（取得件数は含めない）"""
+    parts = [str(args[0])] if args else []
+    if endpoint == 'search_tweet' and len(args) > 1:
+        parts.append(str(args[1]))
+    if kwargs.get('cursor'):
+        parts.append(str(kwargs['cursor']))
+    return '|'.join(parts)
+
+
+def _request_count(endpoint, args, kwargs):
+    if 'count' in kwargs:
+        return kwargs['count']
+    if endpoint == 'search_tweet' and len(args) > 2:
+        return args[2]
+    return None
+
+
+def load_fixtures(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+class RecordingClient:
+    def __init__(self, client, fixture_path):
+        """
+        本物のクライアントをラップしてレスポンスをフィクスチャに記録
+
+        Args:
+            client: twikitの Client / GuestClient
+            fixture_path (str): 保存先のJSONファイル
+        """
+        self.client = client
+        self.fixture_path = fixture_path
+        self.fixtures = {'version': 1, 'responses': {}}
+
+    def __getattr__(self, name):
+        method = getattr(self.client, name)
+        if name not in RESPONSE_KINDS:
+            # activate / login などはそのまま呼ぶ
+            return method
+
+        async def record(*args, **kwargs):
+            response = await method(*args, **kwargs)
+            responses = self.fixtures['responses'].setdefault(name, {})
+            responses[request_key(name, args, kwargs)] = serialize_response(name, response)
+            return response
+        return record
+
+    def save(self):
+        """記録したレスポンスをファイルに保存"""
+        with open(self.fixture_path, 'w', encoding='utf-8') as f:
+            json.dump(self.fixtures, f, ensure_ascii=False, indent=2, default=str)
+        logger.info(f"フィクスチャを {self.fixture_path} に保存しました")
+
+
+class ReplayClient:
+    def __init__(self, fixtures, latency=0.0, jitter=0.0, error_rate=0.0, seed=0, error_factory=None):
+        """
+        フィクスチャからレスポンスを返す決定的なクライアント
+
+        Args:
+            fixtures (dict or str): フィクスチャ（dict またはJSONファイルのパス）
+            latency (float): 1リクエストあたりの擬似レイテンシ（秒）
+            jitter (float): レイテンシに加えるランダム幅（秒）
+            error_rate (float or dict): エラーを注入する確率（エンドポイント名→確率のdictも可）
+            seed (int): 乱数シード（同じシードなら同じ順でエラーが起きる）
+            error_factory: 注入するエラーを作る関数（省略時は InjectedError）
+        """
+        if isinstance(fixtures, str):
+            fixtures = load_fixtures(fixtures)
+        self.responses = fixtures['responses']
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_factory = error_factory or (lambda endpoint: InjectedError(f"injected error: {endpoint}"))
+        self.random = random.Random(seed)
+        self.calls = Counter()
+        self.errors = Counter()
+
+    @property
+    def request_count(self):
+        return sum(self.calls.values())
+
+    async def activate(self):
+        pass
+
+    async def login(self, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        if name not in RESPONSE_KINDS:
+            raise AttributeError(name)
+
+        async def replay(*args, **kwargs):
+            return await self._replay(name, args, kwargs)
+        return replay
+
+    async def _replay(self, endpoint, args, kwargs):
+        self.calls[endpoint] += 1
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+
+        rate = self.error_rate.get(endpoint, 0.0) if isinstance(self.error_rate, dict) else self.error_rate
+        if rate and self.random.random() < rate:
+            self.errors[endpoint] += 1
+            raise self.error_factory(endpoint)
+
+        key = request_key(endpoint, args, kwargs)
+        payload = self.responses.get(endpoint, {}).get(key)
+        if payload is None:
+            raise UnrecordedRequestError(f"未記録のリクエストです: {endpoint}({key})")
+        return deserialize_response(endpoint, payload, _request_count(endpoint, args, kwargs))
+
+
+def build_synthetic_fixtures(main_users=('main_user',), followers_per_user=30, tweets_per_user=50, seed=0,
+                             followers_page_size=20):
+    """
+    ベンチマーク用の合成フィクスチャを作成
+
+    メインユーザーとそのフォロワー、各ユーザーのタイムラインを乱数で生成する
+    （エンゲージメントは少数のツイートに偏る分布）。
+    フォロワー一覧は followers_page_size 人ずつのページ（next_cursor でつながる）に分ける。
+    """
+    rng = random.Random(seed)
+    responses = {endpoint: {} for endpoint in RESPONSE_KINDS}
+    next_user_id = 1
+    next_tweet_id = 10 ** 15
+
+    def make_user(screen_name):
+        nonlocal next_user_id
+        user = {
+            'id': str(next_user_id),
+            'name': screen_name,
+            'screen_name': screen_name,
+            'description': '',
+            'followers_count': int(rng.paretovariate(1.2) * 300),
+            'friends_count': rng.randint(10, 2000),
+            'statuses_count': rng.randint(100, 50000),
+            'verified': rng.random() < 0.05,
+            'profile_image_url': '',
+            'created_at': 'Mon Jan 01 00:00:00 +0000 2018',
+        }
+        next_user_id += 1
+        responses['get_user_by_screen_name'][screen_name] = user
+        responses['get_user_by_id'][user['id']] = user
+        return user
+
+    words = ['今日', '新作', 'ラーメン', '東京', '大雨', 'Python', '非同期', '最高', '映画', '発売',
+             'ライブ', '写真', '猫', '仕事', '週末', 'ゲーム', 'コーヒー', '朝', 'ニュース', '桜']
+    copied_texts = []
+
+    def make_text(user, i):
+        # 一部はコピペ（URLだけ違う）投稿にして重複検出の負荷も再現する
+        if copied_texts and rng.random() < 0.05:
+            return rng.choice(copied_texts) + f" https://t.co/{rng.randrange(10 ** 6)}"
+        text = f"{user['screen_name']} のツイート {i} " + ''.join(rng.choice(words) for _ in range(rng.randint(3, 20)))
+        if rng.random() < 0.05:
+            copied_texts.append(text)
+        return text
+
+    def make_timeline(user):
+        nonlocal next_tweet_id
+        tweets = []
+        for i in range(tweets_per_user):
+            scale = max(1, user['followers_count'] // 100)
+            likes = int(rng.paretovariate(1.1) * scale) - scale
+            tweets.append({
+                'id': str(next_tweet_id),
+                'text': make_text(user, i),
+                'created_at': 'Wed Oct 10 20:19:24 +0000 2018',
+                'retweet_count': likes // rng.randint(3, 10),
+                'favorite_count': likes,
+                'reply_count': likes // rng.randint(10, 30),
+                'quote_count': likes // 50,
+                'user': user,
+            })
+            next_tweet_id -= 1
+        responses['get_user_tweets'][user['id']] = {'items': tweets, 'next_cursor': None}
+
+    for screen_name in main_users:
+        main = make_user(screen_name)
+        make_timeline(main)
+        followers = []
+        for i in range(followers_per_user):
+            follower = make_user(f"{screen_name}_follower{i}")
+            make_timeline(follower)
+            followers.append(follower)
+        for start in range(0, max(len(followers), 1), followers_page_size):
+            key = main['id'] if start == 0 else f"{main['id']}|{start}"
+            end = start + followers_page_size
+            next_cursor = str(end) if end < len(followers) else None
+            responses['get_user_followers'][key] = {'items': followers[start:end], 'next_cursor': next_cursor}
+
+    return {'version': 1, 'responses': responses}
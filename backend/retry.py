@@ -0,0 +1,258 @@
+# retry.py
+import random
+import time
+
+# エラーの分類
+RATE_LIMITED = 'rate_limited'   # レート制限（リセット時刻まで待って再試行）
+TRANSIENT = 'transient'         # 一時的な障害（指数バックオフで再試行）
+PERMANENT = 'permanent'         # 再試行しても結果が変わらない（否定キャッシュに入れる）
+AUTH = 'auth'                   # セッション・アカウントの問題（再試行せず、否定キャッシュにも入れない）
+UNKNOWN = 'unknown'             # 分類できない（再試行も否定キャッシュもせず、ブレーカーにも数えない）
+
+# 例外クラス名での分類（twikit / httpx を import せずに判定するため名前で比較）
+# https://github.com/d60/twikit/blob/main/twikit/errors.py
+ERROR_KINDS = {
+    'TooManyRequests': RATE_LIMITED,
+
+    'RequestTimeout': TRANSIENT,
+    'ServerError': TRANSIENT,
+    'TimeoutException': TRANSIENT,      # httpx.ConnectTimeout / ReadTimeout など
+    'NetworkError': TRANSIENT,          # httpx.ConnectError / ReadError など
+    'RemoteProtocolError': TRANSIENT,
+    'TimeoutError': TRANSIENT,
+    'ConnectionError': TRANSIENT,
+    'gaierror': TRANSIENT,              # 名前解決の失敗
+    'InjectedError': TRANSIENT,         # replay_client が注入する障害
+
+    'NotFound': PERMANENT,
+    'UserNotFound': PERMANENT,
+    'UserUnavailable': PERMANENT,       # 凍結・非公開など
+    'TweetNotAvailable': PERMANENT,
+    'BadRequest': PERMANENT,
+
+    # セッション切れ・ログイン中のアカウントの停止などは呼び出しごとの結果ではない
+    'Unauthorized': AUTH,
+    'Forbidden': AUTH,
+    'AccountSuspended': AUTH,
+    'AccountLocked': AUTH,
+
+    # 存在しないユーザーなどでレスポンスの形が違うと twikit の解析で発生する
+    'KeyError': PERMANENT,
+    'IndexError': PERMANENT,
+}
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, endpoint, retry_after):
+        """サーキットブレーカーが開いているため呼び出さなかった"""
+        super().__init__(f"{endpoint} は連続して失敗しているため {retry_after:.0f}秒間停止中です")
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+class BudgetExhaustedError(Exception):
+    def __init__(self, limit):
+        """ジョブのリクエスト予算を使い切ったため呼び出さなかった"""
+        super().__init__(f"リクエスト予算 {limit} を使い切りました")
+        self.limit = limit
+
+
+class RequestBudget:
+    def __init__(self, limit):
+        """
+        ジョブ1回で上流に送れるリクエスト数（再試行も1回と数える）
+
+        Args:
+            limit (int): 上限
+        """
+        self.limit = limit
+        self.used = 0
+
+    @property
+    def remaining(self):
+        return max(self.limit - self.used, 0)
+
+    def take(self):
+        """1リクエスト分を使う（残っていなければFalse）"""
+        if self.used >= self.limit:
+            return False
+        self.used += 1
+        return True
+
+
+def _status_code(error):
+    """例外が持つHTTPステータスコード（httpx.HTTPStatusError など。無ければNone）"""
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status if isinstance(status, int) else None
+
+
+def classify_error(error):
+    """
+    例外を RATE_LIMITED / TRANSIENT / PERMANENT / AUTH / UNKNOWN に分類
+
+    継承元のクラス名もたどって ERROR_KINDS で判定し、当たらなければHTTPステータスコード
+    （429 はレート制限、5xx は一時的な障害）で判定する。どれにも当たらなければ UNKNOWN とし、
+    再試行するのは通信エラー・タイムアウト・5xx・429 と分かっているものだけにする。
+    """
+    for cls in type(error).__mro__:
+        kind = ERROR_KINDS.get(cls.__name__)
+        if kind:
+            return kind
+    status = _status_code(error)
+    if status == 429:
+        return RATE_LIMITED
+    if status is not None and status >= 500:
+        return TRANSIENT
+    return UNKNOWN
+
+
+class RetryPolicy:
+    def __init__(self, max_retries=3, base_delay=1.0, max_delay=30.0, max_rate_limit_wait=900.0):
+        """
+        再試行の方針
+
+        Args:
+            max_retries (int): 1回の呼び出しで再試行する最大回数
+            base_delay (float): 一時的な障害の初回待機の上限（秒）。以降は2倍ずつ増やす
+            max_delay (float): 一時的な障害の待機の上限（秒）
+            max_rate_limit_wait (float): レート制限のリセットを待つ最大秒数（超えるなら諦める）
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_rate_limit_wait = max_rate_limit_wait
+
+    def backoff(self, attempt):
+        """attempt 回目（0始まり）の再試行前の待機（Full Jitter）"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def rate_limit_wait(self, error, attempt):
+        """レート制限のリセットまでの秒数（リセット時刻が不明ならバックオフ）"""
+        reset = getattr(error, 'rate_limit_reset', None)
+        if reset:
+            return max(0.0, float(reset) - time.time()) + random.uniform(0, 1.0)
+        return self.backoff(attempt + 2)
+
+    def delay(self, error, kind, attempt):
+        """
+        再試行までの待機秒数
+
+        Args:
+            error (Exception): 発生した例外
+            kind (str): classify_error の結果
+            attempt (int): これまでに再試行した回数
+
+        Returns:
+            float: 待機秒数（再試行しない場合はNone）
+        """
+        if kind in (PERMANENT, AUTH, UNKNOWN) or attempt >= self.max_retries:
+            return None
+        if kind == RATE_LIMITED:
+            wait = self.rate_limit_wait(error, attempt)
+            return wait if wait <= self.max_rate_limit_wait else None
+        return self.backoff(attempt)
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=60.0):
+        """
+        エンドポイントごとのサーキットブレーカー
+
+        連続で failure_threshold 回失敗すると開いて、reset_timeout 秒間は呼び出しを止める。
+        数えるのは一時的な障害と認証エラーだけ（レート制限はリセット時刻まで待てば通るので数えない）。
+        その後は1回だけ試し（半開）、成功すれば閉じ、失敗すれば再び開く。
+
+        Args:
+            failure_threshold (int): 開くまでの連続失敗回数
+            reset_timeout (float): 開いている秒数
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return 'open'
+        return 'half_open'
+
+    def retry_after(self):
+        """呼び出しを再開できるまでの秒数"""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def allow(self):
+        """呼び出してよいか（半開のときは試しの1回だけ許可）"""
+        state = self.state
+        if state == 'closed':
+            return True
+        if state == 'half_open' and not self.trial_running:
+            self.trial_running = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+    def release(self):
+        """結果に数えずに呼び出しを終える（半開の試しがレート制限された場合は次の呼び出しで試し直す）"""
+        self.trial_running = False
+
+    def record_failure(self):
+        """失敗を記録（開いたらTrue）"""
+        self.failures += 1
+        if self.trial_running or self.failures >= self.failure_threshold:
+            was_closed = self.opened_at is None
+            self.opened_at = time.monotonic()
+            self.trial_running = False
+            return was_closed
+        return False
+
+
+class NegativeCache:
+    def __init__(self, ttl=3600.0, max_entries=10000):
+        """
+        恒久的なエラー（存在しない・凍結されたユーザーなど）を一定時間覚えておくキャッシュ
+
+        例外のインスタンスではなく型と引数を覚え、get() のたびに新しい例外を作る
+        （同じインスタンスを raise し直すとトレースバックが積み重なるため）。
+
+        Args:
+            ttl (float): 有効期限（秒）
+            max_entries (int): 最大件数（超えたら古いものから削除）
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """覚えているエラーを新しい例外として返す（無ければNone）"""
+        entry = self.entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            self.entries.pop(key, None)
+            self.misses += 1
+            return None
+        self.hits += 1
+        _, error_type, args, message = entry
+        try:
+            return error_type(*args)
+        except Exception:
+            # 引数から作り直せない例外は、分類が変わらないよう同名のクラスで代用する
+            return type(error_type.__name__, (Exception,), {})(message)
+
+    def set(self, key, error):
+        if len(self.entries) >= self.max_entries:
+            # dictは挿入順なので先頭が最も古い
+            self.entries.pop(next(iter(self.entries)))
+        self.entries[key] = (time.monotonic(), type(error), error.args, str(error))
@@ -0,0 +1,246 @@
+# scoring.py
+import heapq
+import math
+
+# TwikitScraper.calculate_buzz_score と同じ重み
+DEFAULT_WEIGHTS = {
+    'retweet_count': 3,
+    'favorite_count': 1,
+    'reply_count': 2,
+    'quote_count': 0,
+}
+
+
+def weighted_engagement(record, weights=DEFAULT_WEIGHTS):
+    """正規化したツイート（TweetRecord / dict）の重み付きエンゲージメント"""
+    metrics = record.get('metrics') or {}
+    return sum(weight * (metrics.get(field) or 0) for field, weight in weights.items() if weight)
+
+
+def _set_score(record, score):
+    if isinstance(record, dict):
+        record['buzz_score'] = score
+    else:
+        record.buzz_score = score
+
+
+class Scorer:
+    name = None
+
+    def __init__(self, weights=None):
+        """
+        バズ度の計算方法の基底クラス
+
+        score() でツイート1件のバズ度を返す。投稿者ごとの基準を使うスコアラーは
+        observe() で取得したツイートを基準に反映する（score_records が先にまとめて呼ぶ）。
+
+        Args:
+            weights (dict): エンゲージメントごとの重み（省略時は DEFAULT_WEIGHTS）
+        """
+        self.weights = dict(DEFAULT_WEIGHTS)
+        if weights:
+            self.weights.update(weights)
+
+    def observe(self, record):
+        pass
+
+    def observe_many(self, records):
+        for record in records:
+            self.observe(record)
+
+    def score(self, record):
+        raise NotImplementedError
+
+
+class EngagementScorer(Scorer):
+    """重み付きエンゲージメントそのもの（従来のバズ度）"""
+
+    name = 'raw'
+
+    def score(self, record):
+        return weighted_engagement(record, self.weights)
+
+
+class EngagementRateScorer(Scorer):
+    name = 'rate'
+
+    def __init__(self, weights=None, per=1000):
+        """
+        フォロワー数あたりの重み付きエンゲージメント（フォロワーの多いアカウントが常に上位になるのを防ぐ）
+
+        Args:
+            per (int): 何人あたりの値にするか
+        """
+        super().__init__(weights)
+        self.per = per
+
+    def score(self, record):
+        followers = (record.get('user') or {}).get('followers_count') or 0
+        return round(weighted_engagement(record, self.weights) * self.per / max(followers, 1), 4)
+
+
+class _Baseline:
+    __slots__ = ('values', 'total', 'total_sq')
+
+    def __init__(self):
+        # ツイートID → 値（同じツイートの再取得は上書き）と、その合計・二乗和
+        self.values = {}
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def update(self, tweet_id, value, window):
+        old = self.values.get(tweet_id)
+        if old is not None:
+            self.total -= old
+            self.total_sq -= old * old
+        elif len(self.values) >= window:
+            # 直近 window 件（IDの大きい順）だけを残す
+            oldest = min(self.values)
+            if tweet_id < oldest:
+                return
+            removed = self.values.pop(oldest)
+            self.total -= removed
+            self.total_sq -= removed * removed
+        self.values[tweet_id] = value
+        self.total += value
+        self.total_sq += value * value
+
+    def stats(self, exclude=None):
+        """(件数, 平均, 標準偏差)。exclude のツイート自身は除く"""
+        n, total, total_sq = len(self.values), self.total, self.total_sq
+        own = self.values.get(exclude)
+        if own is not None:
+            n -= 1
+            total -= own
+            total_sq -= own * own
+        if n <= 0:
+            return 0, 0.0, 0.0
+        mean = total / n
+        return n, mean, math.sqrt(max(total_sq / n - mean * mean, 0.0))
+
+
+class ZScoreScorer(Scorer):
+    name = 'zscore'
+
+    def __init__(self, weights=None, window=50, min_samples=5, min_std=0.25, loader=None):
+        """
+        投稿者自身の直近のツイートに比べてどれだけ伸びているか（z-score）
+
+        値は log(1 + 重み付きエンゲージメント)。投稿者ごとの直近 window 件の平均・分散は
+        一度作ったら保持し、新しいツイートを observe するたびに合計・二乗和を差分更新する。
+        基準にはそのツイート自身を含めず、件数が min_samples に満たない投稿者は 0 とする。
+
+        Args:
+            window (int): 基準にする直近のツイート数
+            min_samples (int): z-score を出すのに必要な基準のツイート数
+            min_std (float): 標準偏差の下限（ばらつきの小さい投稿者で値が極端にならないように）
+            loader: 初めて見る投稿者の過去のツイートを返す関数 (username, limit) -> list
+                （TweetStore.recent_engagement。省略時は observe したツイートだけで基準を作る）
+        """
+        super().__init__(weights)
+        self.window = window
+        self.min_samples = min_samples
+        self.min_std = min_std
+        self.loader = loader
+        self.baselines = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _value(self, record):
+        return math.log1p(weighted_engagement(record, self.weights))
+
+    def baseline(self, username):
+        """投稿者の基準（無ければ作る）"""
+        baseline = self.baselines.get(username)
+        if baseline is not None:
+            self.hits += 1
+            return baseline
+        self.misses += 1
+        baseline = self.baselines[username] = _Baseline()
+        if self.loader is not None:
+            for record in self.loader(username, self.window):
+                baseline.update(int(record['id']), self._value(record), self.window)
+        return baseline
+
+    def observe(self, record):
+        self.baseline(record['username']).update(int(record['id']), self._value(record), self.window)
+
+    def score(self, record):
+        n, mean, std = self.baseline(record['username']).stats(int(record['id']))
+        if n < self.min_samples:
+            return 0.0
+        return round((self._value(record) - mean) / max(std, self.min_std), 3)
+
+
+SCORERS = {
+    'raw': EngagementScorer,
+    'rate': EngagementRateScorer,
+    'zscore': ZScoreScorer,
+}
+
+
+def make_scorer(scorer=None, **options):
+    """
+    スコアラーを作成
+
+    Args:
+        scorer: SCORERS の名前、またはスコアラーのインスタンス（省略時は 'raw'）
+        **options: スコアラーの引数（weights, window など）
+    """
+    if scorer is None:
+        scorer = 'raw'
+    if not isinstance(scorer, str):
+        return scorer
+    if scorer not in SCORERS:
+        raise ValueError(f"scorer は {', '.join(SCORERS)} のいずれかです")
+    return SCORERS[scorer](**options)
+
+
+def score_records(scorer, records):
+    """
+    ツイートのバズ度を scorer で計算し直す（records の buzz_score を書き換えて返す）
+
+    先に全件を observe してから採点するので、同じ取得で得た投稿者の他のツイートも基準に入る。
+    """
+    scorer.observe_many(records)
+    for record in records:
+        _set_score(record, scorer.score(record))
+    return records
+
+
+def _scores(store, scorer, username=None):
+    rows = store.iter_engagement(username)
+    scorer.observe_many(rows)
+    for record in store.iter_engagement(username):
+        yield scorer.score(record), record['id']
+
+
+def rank_store(store, scorer, top_n=20, username=None):
+    """
+    蓄積したツイートを scorer で採点し直して上位N件を返す（上流へのリクエスト無し・ストアは書き換えない）
+
+    Args:
+        store (TweetStore): ツイートストア
+        scorer: スコアラーまたは SCORERS の名前
+        top_n (int): 件数
+        username (str): 投稿者で絞り込む
+    """
+    scorer = make_scorer(scorer)
+    results = []
+    for score, tweet_id in heapq.nlargest(top_n, _scores(store, scorer, username)):
+        record = store.get_tweet(tweet_id)
+        record['buzz_score'] = score
+        results.append(record)
+    return results
+
+
+def rescore_store(store, scorer, username=None):
+    """
+    蓄積したツイートのバズ度を scorer で計算し直して保存（上流へのリクエスト無し）
+
+    Returns:
+        int: 更新した件数
+    """
+    scores = list(_scores(store, make_scorer(scorer), username))
+    store.update_scores(scores)
+    return len(scores)
@@ -1,10 +1,27 @@
 # twikit_scraper.py
 import asyncio
+import contextvars
+import heapq
 import json
+import logging
 import random
 import time
-from twikit import Client
-from twikit.guest import GuestClient
+from checkpoint_store import CheckpointStore
+from follower_scheduler import FollowerScheduler, TopK, YieldStore
+from jsonl_sink import JsonlWriter
+from metrics import Metrics, instrumented
+from near_dup import NearDuplicateIndex, dedupe_tweets
+from rate_limiter import RateLimiter
+from records import TweetRecord, UserRecord, json_default
+from retry import (
+    PERMANENT, RATE_LIMITED, UNKNOWN, BudgetExhaustedError, CircuitBreaker, CircuitOpenError, NegativeCache,
+    RequestBudget, RetryPolicy, classify_error,
+)
+from scoring import ZScoreScorer, make_scorer, score_records
+from seen_set import SeenSet
+from tweet_store import TweetStore
+from user_cache import UserCache
+from velocity import VelocityTracker
 """
 community_buzz_tweets2.json
 orenikurue
@@ -12,28 +29,98 @@ orenikurue
 orenikurue
 """
 
+logger = logging.getLogger(__name__)
+
+# 実行中のジョブのリクエスト予算（asyncio.gather で作ったタスクにも引き継がれる）
+_request_budget = contextvars.ContextVar('request_budget', default=None)
+
 class TwikitScraper:
-    def __init__(self, use_guest_mode=True, human_like=True):
+    def __init__(self, use_guest_mode=True, human_like=True, user_cache_path='user_cache.db',
+                 max_concurrency=1, rate_limits=None, checkpoint_path=None, min_poll_interval=0,
+                 client=None, store_path=None, velocity_path=None, yield_path=None, retry_policy=None,
+                 seen_path=None, seen_ttl=None, scorer=None):
         """
         Twikitスクレイパーの初期化
         
         Args:
             use_guest_mode (bool): ゲストモード使用（ログイン不要）
             human_like (bool): 人間らしい動作を模倣（レート制限回避）
+            user_cache_path (str): ユーザー情報キャッシュのパス（Noneでキャッシュ無効）
+            max_concurrency (int): 同時実行するリクエスト数の上限（2以上で並行モード）
+            rate_limits (dict): エンドポイントごとのレート制限（15分あたり）の上書き
+            checkpoint_path (str): 差分取得用チェックポイントのパス（Noneで毎回全件取得）
+            min_poll_interval (float): この秒数以内に取得済みのユーザーはスキップ（中断したジョブの再開用）
+            client: 使用するクライアント（省略時はtwikitのクライアントを作成。replay_client の記録・再生用）
+            store_path (str): 取得したツイート・プロフィールを蓄積するストアのパス（Noneで保存しない）
+            velocity_path (str): エンゲージメント推移の保存先（Noneならメモリ上のみ）
+            yield_path (str): ユーザーごとの伸びツイート収穫実績の保存先（Noneならメモリ上のみ）
+            retry_policy (RetryPolicy): 失敗時の再試行の方針（省略時は既定値）
+            seen_path (str): 評価済みフォロワーの保存先（Noneなら実行ごとに全員を評価）
+            seen_ttl (float): 評価済みとみなす秒数（Noneなら期限なし）
+            scorer: バズ度の計算方法（'raw', 'rate', 'zscore' または scoring のスコアラー。省略時は 'raw'）
         """
         self.use_guest_mode = use_guest_mode
         self.human_like = human_like
         self.request_count = 0
         self.last_request_time = 0
         self.session_start_time = time.time()
+        self.metrics = Metrics()
+        self.user_cache = UserCache(user_cache_path) if user_cache_path else None
+        if self.user_cache:
+            self.metrics.register_cache('user_cache', self.user_cache)
+        
+        # 並行モードではランダム待機の代わりにセマフォとトークンバケットで流量を制御する
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrent = self.max_concurrency > 1
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.rate_limiter = RateLimiter(rate_limits)
+        
+        # 失敗の種類に応じた再試行・エンドポイントごとのサーキットブレーカー・恒久的なエラーの記憶
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breakers = {}
+        self.negative_cache = NegativeCache()
+        self.metrics.register_cache('negative_cache', self.negative_cache)
+        
+        # 差分取得（前回取得した最新ツイートより新しいものだけを取る）
+        self.checkpoints = CheckpointStore(checkpoint_path) if checkpoint_path else None
+        self.min_poll_interval = min_poll_interval
+        
+        # 取得したツイートの蓄積（ダッシュボード用の集計も更新される）
+        self.store = TweetStore(store_path) if store_path else None
+        
+        # バズ度の計算方法（z-score の投稿者ごとの基準は、ストアがあれば過去のツイートから作る）
+        self.scorer = make_scorer(scorer)
+        if isinstance(self.scorer, ZScoreScorer):
+            if self.scorer.loader is None and self.store:
+                self.scorer.loader = self.store.recent_engagement
+            self.metrics.register_cache('score_baselines', self.scorer)
         
-        if use_guest_mode:
+        # 取得のたびにエンゲージメントを記録し、伸び率（速度・加速度）を計算する
+        self.velocity = VelocityTracker()
+        self.velocity_path = velocity_path
+        if velocity_path:
+            self.velocity.load(velocity_path)
+        
+        # フォロワー探索の優先度付けに使う過去の実績
+        self.yield_store = YieldStore(yield_path or ':memory:')
+        
+        # 評価済みのフォロワー（実行をまたいで再評価しない）
+        self.seen = SeenSet(seen_path, seen_ttl) if seen_path else None
+        if self.seen:
+            self.metrics.register_cache('seen_set', self.seen)
+        
+        if client is not None:
+            self.client = client
+        elif use_guest_mode:
+            # twikit はクライアントを作るときに読み込む（ローカルデータだけを扱う処理の起動を速くする）
+            from twikit.guest import GuestClient
             self.client = GuestClient()
         else:
+            from twikit import Client
             self.client = Client('ja-JP')  # 日本語設定
     async def human_delay(self):
         """人間らしい待機時間を作る"""
-        if not self.human_like:
+        if not self.human_like or self.concurrent:
             return
         
         self.request_count += 1
@@ -46,7 +133,7 @@ class TwikitScraper:
         if self.request_count % 10 == 0:
             # 10リクエストごとに長めの休憩（5-10秒）
             base_delay += random.uniform(5.0, 10.0)
-            print(f"💤 長めの休憩中... ({base_delay:.1f}秒)")
+            logger.info(f"💤 長めの休憩中... ({base_delay:.1f}秒)")
         elif self.request_count % 5 == 0:
             # 5リクエストごとに中程度の休憩（2-5秒）
             base_delay += random.uniform(2.0, 5.0)
@@ -62,14 +149,103 @@ class TwikitScraper:
             base_delay += random.uniform(2.0, 5.0)
         
         await asyncio.sleep(base_delay)
+        self.metrics.add_sleep('human_delay', base_delay)
         self.last_request_time = time.time()
 
+    def breaker(self, endpoint):
+        """エンドポイントのサーキットブレーカー"""
+        if endpoint not in self.breakers:
+            self.breakers[endpoint] = CircuitBreaker()
+        return self.breakers[endpoint]
+
+    async def request(self, endpoint, *args, **kwargs):
+        """
+        クライアントのAPIを呼び出す（同時実行数・レート制限・再試行を適用）
+        
+        - レート制限: リセット時刻までエンドポイントのトークンバケットを止めて再試行
+        - 一時的な障害: ジッター付きの指数バックオフで再試行
+        - 恒久的なエラー（存在しない・凍結されたユーザーなど）: 再試行せず、同じ呼び出しは一定時間すぐに失敗させる
+        - 認証エラー（セッション切れなど）: 再試行も否定キャッシュもせず、ブレーカーの失敗に数える
+        - 分類できないエラー: 再試行も否定キャッシュもせず、ブレーカーにも数えない
+        - 一時的な障害・認証エラーが続いたエンドポイントはサーキットブレーカーで一定時間呼び出さない
+        - ジョブのリクエスト予算（再試行を含む）を使い切ったら、送る前に BudgetExhaustedError
+        
+        Args:
+            endpoint (str): クライアントのメソッド名（レート制限のキーを兼ねる）
+        """
+        key = (endpoint, args, tuple(sorted(kwargs.items())))
+        cached_error = self.negative_cache.get(key)
+        if cached_error is not None:
+            raise cached_error
+        
+        breaker = self.breaker(endpoint)
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                self.metrics.observe_rejected(endpoint)
+                raise CircuitOpenError(endpoint, breaker.retry_after())
+            
+            budget = _request_budget.get()
+            if budget is not None and not budget.take():
+                breaker.release()
+                raise BudgetExhaustedError(budget.limit)
+            
+            try:
+                response = await self._call(endpoint, *args, **kwargs)
+            except Exception as e:
+                kind = classify_error(e)
+                if kind == PERMANENT:
+                    # エンドポイント自体は応答しているのでブレーカーには数えない
+                    breaker.record_success()
+                    self.negative_cache.set(key, e)
+                    raise
+                
+                if kind in (RATE_LIMITED, UNKNOWN):
+                    # レート制限はリセット時刻まで待てば通り、分類できないエラーは障害とは限らないので、
+                    # ブレーカーには数えない
+                    breaker.release()
+                elif breaker.record_failure():
+                    logger.warning(f"{endpoint} の失敗が続いたため {breaker.reset_timeout:.0f}秒間停止します")
+                delay = self.retry_policy.delay(e, kind, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                self.metrics.observe_retry(endpoint)
+                logger.info(f"{endpoint} を {delay:.1f}秒後に再試行します ({attempt}/{self.retry_policy.max_retries}): {e}")
+                
+                # レート制限はトークンバケットを止め、同じエンドポイントの他のリクエストもまとめて待たせる
+                if kind == RATE_LIMITED and self.rate_limiter.pause(endpoint, delay):
+                    continue
+                await asyncio.sleep(delay)
+                self.metrics.add_sleep('retry_backoff', delay)
+                continue
+            
+            breaker.record_success()
+            return response
+
+    async def _call(self, endpoint, *args, **kwargs):
+        """クライアントのAPIを1回呼び出す（同時実行数とレート制限を適用）"""
+        # トークンはセマフォの外で待つ（制限中のエンドポイントが他のエンドポイントの枠を塞がないように）
+        waited = await self.rate_limiter.acquire(endpoint)
+        if waited:
+            self.metrics.add_sleep('rate_limit', waited)
+        
+        async with self.semaphore:
+            start = time.perf_counter()
+            try:
+                response = await getattr(self.client, endpoint)(*args, **kwargs)
+            except Exception:
+                self.metrics.observe_request(endpoint, time.perf_counter() - start, error=True)
+                raise
+            self.metrics.observe_request(endpoint, time.perf_counter() - start)
+            return response
+
     async def setup(self, username=None, email=None, password=None):
         """セットアップ"""
         if self.use_guest_mode:
             # ゲストトークンを生成してクライアントを有効化
             await self.client.activate()
-            print("ゲストモードで接続しました")
+            logger.info("ゲストモードで接続しました")
         else:
             if not all([username, email, password]):
                 raise ValueError("ログインモードには username, email, password が必要です")
@@ -81,9 +257,10 @@ class TwikitScraper:
                 password=password,
                 cookies_file='cookies.json'  # セッション保持
             )
-            print("ログインしました")
+            logger.info("ログインしました")
     
-    async def search_tweets(self, query, product='Latest', count=20):
+    @instrumented
+    async def search_tweets(self, query, product='Latest', count=20, local=False):
         """
         ツイート検索
                 
@@ -91,106 +268,167 @@ class TwikitScraper:
             query (str): 検索クエリ
             product (str): 'Top', 'Latest', 'Media', 'People'
             count (int): 取得数
+            local (bool): 上流に問い合わせず、収集済みのツイートから検索する
         """
+        if local or (self.use_guest_mode and self.store):
+            # ゲストモードでは上流の検索が使えないので、収集済みのツイートから検索する
+            return self.search_local(query, count)
+        
         try:
-            print(f"検索中: '{query}'")
+            logger.info(f"検索中: '{query}'")
             
             if self.use_guest_mode:
                 # ゲストモードでは検索機能が制限される場合があります
-                print("注意: ゲストモードでは一部機能が制限されます")
+                logger.info("注意: ゲストモードでは一部機能が制限されます")
                 return []
             else:
                 # ログインモードで検索
-                tweets = await self.client.search_tweet(query, product, count)
+                tweets = await self.request('search_tweet', query, product, count)
                 
-                results = []
-                for tweet in tweets:
-                    tweet_data = {
-                        'id': tweet.id,
-                        'text': tweet.text,
-                        'created_at': tweet.created_at,
-                        'user': {
-                            'id': tweet.user.id,
-                            'name': tweet.user.name,
-                            'username': tweet.user.screen_name,
-                            'followers_count': tweet.user.followers_count,
-                            'verified': tweet.user.verified
-                        },
-                        'metrics': {
-                            'retweet_count': tweet.retweet_count,
-                            'favorite_count': tweet.favorite_count,
-                            'reply_count': tweet.reply_count,
-                            'quote_count': tweet.quote_count if hasattr(tweet, 'quote_count') else 0
-                        },
-                        'url': f"https://twitter.com/{tweet.user.screen_name}/status/{tweet.id}"
-                    }
-                    results.append(tweet_data)
-                
-                return results
+                return self._record_tweets([self._tweet_to_record(tweet) for tweet in tweets])
                 
         except Exception as e:
-            print(f"検索エラー: {e}")
+            logger.warning(f"検索エラー: {e}")
             return []
 
+    def search_local(self, query, count=20, username=None):
+        """
+        収集済みのツイートから検索（上流へのリクエスト無し・バズ度の高い順）
+        
+        Args:
+            query (str): 検索クエリ（空白区切りでAND、OR、"フレーズ"、-除外語）
+            count (int): 取得数
+            username (str): 投稿者で絞り込む
+        """
+        if not self.store:
+            logger.info("ローカル検索にはツイートストア（store_path）が必要です")
+            return []
+        return self.store.search(query, count, username)
+
+    @instrumented
     async def get_user_info(self, username):
         """ユーザー情報取得（ユーザー名指定、@付き対応）"""
         try:
-            # 人間らしい遅延
-            await self.human_delay()
-            
             # @記号を除去して正規化
             clean_username = self.normalize_username(username)
             
-            if self.use_guest_mode:
-                user = await self.client.get_user_by_screen_name(clean_username)
-            else:
-                user = await self.client.get_user_by_screen_name(clean_username)
-            
-            return {
-                'id': user.id,
-                'name': user.name,
-                'username': user.screen_name,
-                'description': user.description,
-                'followers_count': user.followers_count,
-                'following_count': user.friends_count,
-                'tweet_count': user.statuses_count,
-                'verified': user.verified,
-                'profile_image_url': user.profile_image_url,
-                'created_at': user.created_at
-            }
+            return await self.resolve_user(clean_username)
             
         except Exception as e:
-            print(f"ユーザー情報取得エラー: {e}")
-            # エラー時は少し長めに待機
-            if self.human_like:
-                await asyncio.sleep(random.uniform(5.0, 10.0))
+            logger.warning(f"ユーザー情報取得エラー: {e}")
             return None
 
+    async def resolve_user(self, clean_username, delay=True):
+        """
+        ユーザー名からユーザー情報を解決（キャッシュ優先）
+        
+        Args:
+            clean_username (str): @を除去したユーザー名
+            delay (bool): キャッシュミス時に人間らしい遅延を入れるか
+        """
+        if self.user_cache:
+            cached = self.user_cache.get_profile_by_screen_name(clean_username)
+            if cached:
+                return cached
+        
+        # キャッシュミス時のみ通信する
+        if delay:
+            await self.human_delay()
+        user = await self.request('get_user_by_screen_name', clean_username)
+        return self._cache_user(user)
+
+    async def resolve_user_id(self, clean_username):
+        """ユーザー名からユーザーIDを解決（キャッシュ優先、遅延なし）"""
+        if self.user_cache:
+            user_id = self.user_cache.get_user_id(clean_username)
+            if user_id:
+                return user_id
+        
+        profile = await self.resolve_user(clean_username, delay=False)
+        return profile['id']
+
+    def _user_to_profile(self, user):
+        """twikitのUserオブジェクトをユーザー情報dictに変換"""
+        return {
+            'id': user.id,
+            'name': user.name,
+            'username': user.screen_name,
+            'description': user.description,
+            'followers_count': user.followers_count,
+            'following_count': user.friends_count,
+            'tweet_count': user.statuses_count,
+            'verified': user.verified,
+            'profile_image_url': user.profile_image_url,
+            'created_at': user.created_at
+        }
+
+    def _cache_user(self, user):
+        """Userオブジェクトをキャッシュに保存してユーザー情報dictを返す"""
+        profile = self._user_to_profile(user)
+        if self.user_cache:
+            self.user_cache.put_profile(profile)
+        if self.store:
+            self.store.add_profile(profile)
+        return profile
+
+    def _record_tweets(self, records):
+        """取得したツイートのバズ度を scorer で計算し、ストアと伸び率トラッカーに記録して返す"""
+        if not records:
+            return records
+        score_records(self.scorer, records)
+        if self.store:
+            self.store.add_tweets(records)
+        self.velocity.record_tweets(records)
+        return records
+
+    def _tweet_to_record(self, tweet, user=None):
+        """
+        twikitのTweetオブジェクトを正規化したツイート（TweetRecord）に変換
+        
+        エンゲージメント数とバズ度をここで一度だけ計算して保持するので、
+        後段のランキングで再取得は不要。dict と同じように読み取れ、
+        JSONにするときは to_dict()（json_default）で従来の dict の形式になる。
+        
+        Args:
+            tweet: twikitのTweetオブジェクト
+            user (dict or UserRecord): 投稿者のユーザー情報（tweet.user が無い場合に使用。
+                UserRecord を渡すと同じ投稿者のツイートで共有する）
+        """
+        author = getattr(tweet, 'user', None)
+        if author is not None and not (isinstance(user, UserRecord) and user.id == author.id):
+            user = UserRecord.from_user(author)
+        else:
+            user = UserRecord.from_profile(user)
+        
+        return TweetRecord(
+            tweet.id,
+            tweet.text,
+            getattr(tweet, 'created_at', None),
+            user,
+            getattr(tweet, 'retweet_count', 0) or 0,
+            getattr(tweet, 'favorite_count', 0) or 0,
+            getattr(tweet, 'reply_count', 0) or 0,
+            getattr(tweet, 'quote_count', 0) or 0,
+            self.calculate_buzz_score(tweet),
+        )
+
+    @instrumented
     async def get_user_info_by_id(self, user_id):
         """ユーザー情報取得（ユーザーID指定）"""
         try:
-            if self.use_guest_mode:
-                user = await self.client.get_user_by_id(str(user_id))
-            else:
-                user = await self.client.get_user_by_id(str(user_id))
+            if self.user_cache:
+                cached = self.user_cache.get_profile(user_id)
+                if cached:
+                    return cached
             
-            return {
-                'id': user.id,
-                'name': user.name,
-                'username': user.screen_name,
-                'description': user.description,
-                'followers_count': user.followers_count,
-                'following_count': user.friends_count,
-                'tweet_count': user.statuses_count,
-                'verified': user.verified,
-                'profile_image_url': user.profile_image_url,
-                'created_at': user.created_at
-            }
+            user = await self.request('get_user_by_id', str(user_id))
+            return self._cache_user(user)
             
         except Exception as e:
-            print(f"ユーザー情報取得エラー (ID: {user_id}): {e}")
+            logger.warning(f"ユーザー情報取得エラー (ID: {user_id}): {e}")
             return None
     
+    @instrumented
     async def get_user_tweets(self, username, count=20):
         """ユーザーのツイート取得（ユーザー名指定、@付き対応）"""
         try:
@@ -200,85 +438,135 @@ class TwikitScraper:
             # @記号を除去して正規化
             clean_username = self.normalize_username(username)
             
-            if self.use_guest_mode:
-                user = await self.client.get_user_by_screen_name(clean_username)
-                tweets = await self.client.get_user_tweets(user.id, count=count)
-            else:
-                user = await self.client.get_user_by_screen_name(clean_username)
-                tweets = await self.client.get_user_tweets(user.id, count=count)
-            
-            results = []
-            for tweet in tweets:
-                tweet_data = {
-                    'id': tweet.id,
-                    'text': tweet.text,
-                    'username': clean_username
-                }
-                results.append(tweet_data)
+            user = await self.resolve_user(clean_username, delay=False)
+            tweets = await self._fetch_user_timeline(user, count)
             
-            return results
+            author = UserRecord.from_profile(user)
+            return self._record_tweets([self._tweet_to_record(tweet, author) for tweet in tweets])
             
         except Exception as e:
-            print(f"ユーザーツイート取得エラー: {e}")
-            # エラー時は少し長めに待機
-            if self.human_like:
-                await asyncio.sleep(random.uniform(5.0, 10.0))
+            logger.warning(f"ユーザーツイート取得エラー: {e}")
             return []
 
+    async def _fetch_user_timeline(self, user, count, max_pages=10):
+        """
+        ユーザーのタイムライン（生のTweetオブジェクト）を取得
+        
+        チェックポイントが有効な場合は、前回取得済みのツイートに達するまで
+        ページングして新着分だけを返し、最新ツイートIDを記録する。
+        
+        Args:
+            user (dict): ユーザー情報
+            count (int): 1ページあたりの取得数（初回は取得上限も兼ねる）
+            max_pages (int): 差分取得時の最大ページ数
+        """
+        user_id = user['id']
+        if not self.checkpoints:
+            return await self.request('get_user_tweets', user_id, count=count)
+        
+        if self.min_poll_interval and self.checkpoints.polled_within(user_id, self.min_poll_interval):
+            logger.info(f"@{user['username']} は取得済みのためスキップします")
+            return []
+        
+        since_id = self.checkpoints.get_since_id(user_id)
+        page = await self.request('get_user_tweets', user_id, count=count)
+        
+        if not since_id:
+            # 初回は通常どおり最新count件
+            tweets = list(page)
+        else:
+            tweets = []
+            seen_count = 0
+            for _ in range(max_pages):
+                for tweet in page:
+                    if int(tweet.id) > since_id:
+                        tweets.append(tweet)
+                    else:
+                        seen_count += 1
+                
+                # 固定ツイートは古くても先頭に来るので、既読が2件以上で打ち切る
+                if seen_count >= 2 or not page or not getattr(page, 'next_cursor', None):
+                    break
+                page = await self.request('get_user_tweets', user_id, count=count, cursor=page.next_cursor)
+        
+        newest_id = max((int(tweet.id) for tweet in tweets), default=None)
+        self.checkpoints.update(user_id, newest_id, user['username'])
+        return tweets
+
+    @instrumented
     async def get_user_tweets_by_id(self, user_id, count=20):
         """ユーザーのツイート取得（ユーザーID指定）"""
         try:
-            # まずユーザー情報を取得してユーザー名を取得
+            # まずユーザー情報を取得してユーザー名・フォロワー数を取得
             user_info = await self.get_user_info_by_id(user_id)
             if not user_info:
                 return []
             
-            username = user_info['username']
+            tweets = await self._fetch_user_timeline(user_info, count)
             
-            if self.use_guest_mode:
-                tweets = await self.client.get_user_tweets(str(user_id), count=count)
-            else:
-                tweets = await self.client.get_user_tweets(str(user_id), count=count)
-            
-            results = []
-            for tweet in tweets:
-                tweet_data = {
-                    'id': tweet.id,
-                    'text': tweet.text,
-                    'username': username,
-                    'user_id': user_id
-                }
-                results.append(tweet_data)
-            
-            return results
+            author = UserRecord.from_profile(user_info)
+            return self._record_tweets([self._tweet_to_record(tweet, author) for tweet in tweets])
             
         except Exception as e:
-            print(f"ユーザーツイート取得エラー (ID: {user_id}): {e}")
+            logger.warning(f"ユーザーツイート取得エラー (ID: {user_id}): {e}")
             return []
 
+    @instrumented
     async def get_multiple_users_tweets(self, usernames, count_per_user=20):
         """複数ユーザーのツイートを一括取得（ユーザー名指定）"""
-        all_tweets = []
-        
-        for username in usernames:
-            print(f"@{username} のツイートを取得中...")
-            tweets = await self.get_user_tweets(username, count_per_user)
-            all_tweets.extend(tweets)
-            # human_delay は get_user_tweets 内で呼ばれるので追加の sleep は不要
-        
-        return all_tweets
+        return [tweet async for tweet in self.iter_multiple_users_tweets(usernames, count_per_user)]
 
+    @instrumented
     async def get_multiple_users_tweets_by_ids(self, user_ids, count_per_user=20):
         """複数ユーザーのツイートを一括取得（ユーザーID指定）"""
-        all_tweets = []
+        return [tweet async for tweet in self.iter_multiple_users_tweets_by_ids(user_ids, count_per_user)]
+
+    async def iter_multiple_users_tweets(self, usernames, count_per_user=20):
+        """複数ユーザーのツイートを取得できた順に返す（ユーザー名指定、非同期イテレーター）"""
+        # human_delay は get_user_tweets 内で呼ばれるので追加の sleep は不要
+        async for tweet in self._iter_fanout(
+            self.get_user_tweets, usernames, count_per_user,
+            message="@{item} のツイートを取得中..."
+        ):
+            yield tweet
+
+    async def iter_multiple_users_tweets_by_ids(self, user_ids, count_per_user=20):
+        """複数ユーザーのツイートを取得できた順に返す（ユーザーID指定、非同期イテレーター）"""
+        async for tweet in self._iter_fanout(
+            self.get_user_tweets_by_id, user_ids, count_per_user,
+            message="ID:{item} のツイートを取得中..."
+        ):
+            yield tweet
+
+    async def _iter_fanout(self, func, items, *args, message=None):
+        """
+        items の各要素で func を呼び出し、返ってきたレコードを取得できた順に返す
         
-        for user_id in user_ids:
-            print(f"ID:{user_id} のツイートを取得中...")
-            tweets = await self.get_user_tweets_by_id(user_id, count_per_user)
-            all_tweets.extend(tweets)
-            # human_delay は get_user_tweets_by_id 内で呼ばれるので追加の sleep は不要
+        並行モードでは全件をタスク化して完了順に返す（同時実行数は request() のセマフォで制限）。
         
-        return all_tweets
+        Args:
+            func: レコードのリストを返すコルーチン関数（第1引数が item）
+            items (list): ユーザー名やユーザーIDのリスト
+            message (str): 逐次モードでの進捗表示（{i}, {total}, {item} を置換）
+        """
+        if not self.concurrent:
+            for i, item in enumerate(items, 1):
+                if message:
+                    logger.info(message.format(i=i, total=len(items), item=item))
+                for record in await func(item, *args):
+                    yield record
+            return
+        
+        logger.info(f"  {len(items)}件を並行取得中...")
+        tasks = [asyncio.ensure_future(func(item, *args)) for item in items]
+        try:
+            for future in asyncio.as_completed(tasks):
+                for record in await future:
+                    yield record
+        finally:
+            # 途中で読むのをやめた場合は残りのリクエストを取り消す
+            for task in tasks:
+                task.cancel()
 
     def normalize_username(self, identifier):
         """ユーザー名を正規化（@記号を除去）"""
@@ -321,32 +609,109 @@ class TwikitScraper:
         
         return engagement_score
 
-    async def get_user_followers(self, username, count=100):
-        """ユーザーのフォロワーリストを取得"""
-        try:
-            if self.use_guest_mode:
-                user = await self.client.get_user_by_screen_name(username)
-                followers = await self.client.get_user_followers(user.id, count=count)
-            else:
-                user = await self.client.get_user_by_screen_name(username)
-                followers = await self.client.get_user_followers(user.id, count=count)
-            
-            follower_list = []
+    @instrumented
+    async def get_user_followers(self, username, count=100, resume=False):
+        """
+        ユーザーのフォロワーリストを取得
+        
+        Args:
+            count (int): 取得数（足りなければ次のページも取得）
+            resume (bool): 前回の続きのページから取得する（checkpoint_path 指定時）
+        """
+        return [
+            follower
+            async for followers in self.iter_follower_pages(username, count, resume=resume)
+            for follower in followers
+        ]
+
+    async def iter_user_followers(self, username, count=None, page_size=100, resume=False):
+        """フォロワーを1人ずつ返す（非同期イテレーター。必要な分だけページを取得）"""
+        async for followers in self.iter_follower_pages(username, count, page_size, resume):
             for follower in followers:
-                follower_data = {
-                    'id': follower.id,
-                    'username': follower.screen_name,
-                    'name': follower.name,
-                    'followers_count': follower.followers_count,
-                    'verified': follower.verified
-                }
-                follower_list.append(follower_data)
+                yield follower
+
+    async def iter_follower_pages(self, username, count=None, page_size=100, resume=False):
+        """
+        フォロワーをページごとに返す（非同期イテレーター）
+        
+        resume=True でチェックポイントが有効な場合は、前回の続きの位置から取得し、
+        呼び出し側がページを処理し終えるたびに位置（カーソルとページ内の処理済み人数）を保存する。
+        途中で止まったら処理中のページから、count でページの途中まで返した場合はその続きから再開し、
+        最後まで取得したら次回は先頭から取得する。
+        
+        Args:
+            username (str): ユーザー名
+            count (int): 取得数（Noneなら最後まで）
+            page_size (int): 1ページあたりの取得数
+            resume (bool): 前回の続きから取得し、取得位置を保存する
+        """
+        try:
+            user_id = await self.resolve_user_id(self.normalize_username(username))
+            checkpoints = self.checkpoints if resume else None
+            saved = checkpoints.get_follower_cursor(user_id) if checkpoints else None
+            cursor = saved['cursor'] if saved else None
+            offset = saved['page_offset'] if saved else 0
+            fetched = saved['fetched'] if saved else 0
+            if saved:
+                logger.info(f"@{username} のフォロワー一覧を {fetched}人目から再開します")
             
-            return follower_list
+            returned = 0
+            while count is None or returned < count:
+                kwargs = {'count': page_size, 'cursor': cursor} if cursor else {'count': page_size}
+                page = await self.request('get_user_followers', user_id, **kwargs)
+                
+                # 前回ページの途中まで処理していたら、その続きから
+                remaining = list(page)[offset:]
+                if count is not None:
+                    remaining = remaining[:count - returned]
+                followers = []
+                for follower in remaining:
+                    # フォロワーもUserオブジェクトなので、後続のツイート取得用にキャッシュしておく
+                    self._cache_user(follower)
+                    followers.append({
+                        'id': follower.id,
+                        'username': follower.screen_name,
+                        'name': follower.name,
+                        'followers_count': follower.followers_count,
+                        'verified': follower.verified
+                    })
+                
+                returned += len(followers)
+                if followers:
+                    yield followers
+                
+                # 呼び出し側がこのページを処理し終えてから位置を進める
+                offset += len(followers)
+                fetched += len(followers)
+                if offset < len(page):
+                    # ページの途中で打ち切った場合は、次回はこのページの続きから
+                    if checkpoints:
+                        checkpoints.update_follower_cursor(user_id, cursor, fetched, offset)
+                    break
+                
+                # 空のページでも twikit は次のカーソルを返すので、空なら最後まで取得したとみなす
+                cursor = getattr(page, 'next_cursor', None) if len(page) else None
+                offset = 0
+                if not cursor:
+                    fetched = 0
+                if checkpoints:
+                    checkpoints.update_follower_cursor(user_id, cursor, fetched)
+                if not cursor:
+                    break
             
+        except BudgetExhaustedError as e:
+            # 取得済みのページまでで終える（位置は処理済みのページまで保存済み）
+            logger.info(f"フォロワー取得を中断しました: {e}")
         except Exception as e:
-            print(f"フォロワー取得エラー: {e}")
-            return []
+            logger.warning(f"フォロワー取得エラー: {e}")
+
+    def _is_seen(self, username):
+        """前回までの実行で評価済みのフォロワーか"""
+        return self.seen is not None and username in self.seen
+
+    def _mark_seen(self, usernames):
+        if self.seen is not None and usernames:
+            self.seen.add_many(usernames)
 
     def is_trending_tweet(self, tweet_raw, min_engagement=50):
         """ツイートが伸びているかを判定"""
@@ -358,130 +723,375 @@ class TwikitScraper:
         total_engagement = retweets + likes + replies
         return total_engagement >= min_engagement
 
+    @instrumented
     async def get_trending_tweets_only(self, username, count=50, min_engagement=50):
         """指定ユーザーの伸びているツイートのみを取得"""
+        _, trending = await self._check_trending_tweets(username, count, min_engagement)
+        return trending
+
+    async def _check_trending_tweets(self, username, count=50, min_engagement=50):
+        """
+        指定ユーザーのツイートをチェックして伸びているものを返す
+        
+        Returns:
+            tuple: (チェックしたツイート数, 伸びツイートのリスト)。チェックポイントで
+                   スキップした・新着が無い・取得に失敗した場合のツイート数は0
+        """
         try:
             # 生のツイートオブジェクトを取得する必要がある
             clean_username = self.normalize_username(username)
             
-            if self.use_guest_mode:
-                user = await self.client.get_user_by_screen_name(clean_username)
-                raw_tweets = await self.client.get_user_tweets(user.id, count=count)
-            else:
-                user = await self.client.get_user_by_screen_name(clean_username)
-                raw_tweets = await self.client.get_user_tweets(user.id, count=count)
-            
-            trending_tweets = []
-            for tweet in raw_tweets:
-                if self.is_trending_tweet(tweet, min_engagement):
-                    tweet_data = {
-                        'id': tweet.id,
-                        'text': tweet.text,
-                        'username': clean_username
-                    }
-                    trending_tweets.append(tweet_data)
+            user = await self.resolve_user(clean_username, delay=False)
+            raw_tweets = await self._fetch_user_timeline(user, count)
             
-            return trending_tweets
+            # 伸びていないツイートも含めて記録する（日次集計と伸び率の計算のため）
+            author = UserRecord.from_profile(user)
+            records = self._record_tweets([self._tweet_to_record(tweet, author) for tweet in raw_tweets])
+            return len(raw_tweets), [
+                record for record, tweet in zip(records, raw_tweets)
+                if self.is_trending_tweet(tweet, min_engagement)
+            ]
             
+        except BudgetExhaustedError:
+            raise
+        except Exception as e:
+            logger.warning(f"伸びツイート取得エラー ({username}): {e}")
+            return 0, []
+
+    @instrumented
+    async def poll_tweet_metrics(self, tweet_ids=None, limit=None):
+        """
+        既知のツイートを再取得してエンゲージメントの推移を記録
+        
+        タイムライン全体を取り直さずに、IDを指定して現在の数値だけを取る。
+        
+        Args:
+            tweet_ids (list): 対象のツイートID（省略時はトラッカーに記録済みのツイート）
+            limit (int): tweet_ids 省略時に再取得する件数の上限（最近記録した順。Noneなら全件）
+        
+        Returns:
+            list: 再取得できたツイートのリスト
+        """
+        if tweet_ids is None:
+            tweet_ids = self.velocity.recent_ids(limit) if limit else self.velocity.tracked_ids()
+        
+        records = [
+            record async for record in self._iter_fanout(
+                self._fetch_tweet_record, tweet_ids,
+                message="({i}/{total}) ツイート {item} の数値を再取得中..."
+            )
+        ]
+        self.save_velocity()
+        return records
+
+    def save_velocity(self):
+        """エンゲージメント推移を velocity_path に保存（指定時のみ）"""
+        if self.velocity_path:
+            self.velocity.save(self.velocity_path)
+
+    def flush(self):
+        """ユーザーキャッシュの最終アクセス時刻とエンゲージメント推移を保存（ジョブの終わりに呼ぶ）"""
+        if self.user_cache:
+            self.user_cache.flush()
+        self.save_velocity()
+
+    async def _fetch_tweet_record(self, tweet_id):
+        """ツイートを1件取得して記録（_iter_fanout 用にリストで返す）"""
+        try:
+            tweet = await self.request('get_tweet_by_id', str(tweet_id))
+            return self._record_tweets([self._tweet_to_record(tweet)])
         except Exception as e:
-            print(f"伸びツイート取得エラー ({username}): {e}")
+            logger.warning(f"ツイート再取得エラー (ID: {tweet_id}): {e}")
+            return []
+
+    async def get_rising_tweets(self, top_n=20, repoll=True, min_velocity=0.0, max_repoll=100):
+        """
+        いま伸びているツイート（エンゲージメントの増加速度が大きい順）を取得
+        
+        Args:
+            top_n (int): 件数
+            repoll (bool): 計算前に記録済みツイートを再取得するか
+            min_velocity (float): 1時間あたりの増加のしきい値
+            max_repoll (int): 再取得するツイート数の上限（最近記録した順。1件1リクエスト）
+        """
+        if repoll:
+            await self.poll_tweet_metrics(limit=max_repoll)
+        return self.velocity.rising(top_n, min_velocity)
+
+    @instrumented
+    async def get_buzz_tweets_from_users_and_followers(self, main_usernames, follower_count=50, tweet_count_per_user=50, min_engagement=100, top_n=30, dedupe_threshold=0.7):
+        """
+        指定ユーザーとそのフォロワーから伸びているツイートのみを取得
+        
+        Args:
+            dedupe_threshold (float): コピペ・微修正の投稿を1件にまとめる類似度（Noneでまとめない）
+        """
+        # まとめない場合は上位N件だけをヒープで保持するので、収集件数が増えてもメモリは一定。
+        # まとめる場合は後から来る重複と比べるため、索引が伸びツイートごとに MinHash 署名と
+        # クラスタごとの代表を持つので、メモリは伸びツイートの件数に比例する（全ツイート数ではない）
+        top = TopK(top_n)
+        index = NearDuplicateIndex(dedupe_threshold) if dedupe_threshold else None
+        
+        async for tweet in self.iter_trending_tweets_from_users_and_followers(
+            main_usernames, follower_count, tweet_count_per_user, min_engagement
+        ):
+            if index is not None:
+                index.add(tweet)
+            else:
+                top.push(tweet)
+        
+        if index is not None:
+            # 重複をまとめた代表だけを順位付けする
+            top.extend(index.representatives())
+            if top.seen:
+                logger.info(f"合計 {len(index.ids)}件の伸びツイートを発見（重複をまとめて {len(index)}件）")
+        elif top.seen:
+            logger.info(f"合計 {top.seen}件の伸びツイートを発見")
+        
+        if not top.seen:
+            logger.info("伸びているツイートが見つかりませんでした")
             return []
+        
+        # バズ度は取得時に計算済みなので、再取得せずに上位N件を選ぶ
+        return top.results()
 
-    async def get_buzz_tweets_from_users_and_followers(self, main_usernames, follower_count=50, tweet_count_per_user=50, min_engagement=100, top_n=30):
-        """指定ユーザーとそのフォロワーから伸びているツイートのみを取得"""
-        all_trending_tweets = []
+    @instrumented
+    async def get_buzz_tweets_with_budget(self, main_usernames, follower_count=50, tweet_count_per_user=50, min_engagement=100, top_n=30, request_budget=100, dedupe_threshold=0.7, score_per_follower=None):
+        """
+        リクエスト数の上限内で、指定ユーザーとそのフォロワーから伸びツイートを取得
+        
+        フォロワーはフォロワー数と過去の収穫実績から期待値の高い順に評価し、
+        上位N件がもう入れ替わらないと判断できた時点、または予算を使い切った時点で打ち切る。
+        
+        Args:
+            main_usernames (list): メインユーザー
+            follower_count (int): メインユーザーごとに取得するフォロワー数
+            tweet_count_per_user (int): ユーザーごとにチェックするツイート数
+            min_engagement (int): 伸び判定のしきい値
+            top_n (int): 取得件数
+            request_budget (int): このジョブで使える上流リクエスト数
+            dedupe_threshold (float): コピペ・微修正の投稿を1件にまとめる類似度（Noneでまとめない）
+            score_per_follower (float): 実績の無いフォロワーのバズ度の上限見積り（フォロワー1人あたり）。
+                Noneなら実績の無いフォロワーは上限なしとみなすので、初回は予算を使い切るまで打ち切らない
+        """
+        budget = RequestBudget(request_budget)
+        token = _request_budget.set(budget)
+        top = TopK(top_n)
+        index = NearDuplicateIndex(dedupe_threshold) if dedupe_threshold else None
+        scheduler = FollowerScheduler(self.yield_store, min_engagement, score_per_follower=score_per_follower)
+        evaluated = set()
+        
+        async def evaluate(username, count):
+            """伸びツイートを返す（予算を使い切って評価を終えられなかったらNone）"""
+            try:
+                checked, trending = await self._check_trending_tweets(username, count, min_engagement)
+            except BudgetExhaustedError:
+                return None
+            # 取得済みでスキップした・新着が無かったユーザーの収穫率は下げない
+            if checked:
+                self.yield_store.record(username, checked, trending)
+            return trending
+        
+        def collect(trending):
+            nonlocal top
+            if index is None:
+                top.extend(trending)
+                return
+            # 重複をまとめた代表で上位N件（打ち切り判定のしきい値）を作り直す
+            index.extend(trending)
+            top = TopK(top_n)
+            top.extend(index.representatives())
+        
+        try:
+            for main_user in main_usernames:
+                main_user = self.normalize_username(main_user)
+                # ツイート + フォロワーで最低2リクエスト
+                if main_user in evaluated or budget.remaining < 2:
+                    continue
+                evaluated.add(main_user)
+                scheduler.discard(main_user)
+                
+                logger.info(f"@{main_user} の伸びツイートを取得中...")
+                trending = await evaluate(main_user, tweet_count_per_user)
+                if trending is None:
+                    break
+                collect(trending)
+                
+                logger.info(f"@{main_user} のフォロワーを取得中...")
+                followers = await self.get_user_followers(main_user, follower_count, resume=True)
+                scheduler.add_many(
+                    f for f in followers
+                    if f['username'] not in evaluated and not self._is_seen(f['username'])
+                )
+            
+            follower_tweet_count = min(20, tweet_count_per_user)
+            while True:
+                # フォロワー1人あたり最低1リクエスト（ユーザー情報がキャッシュに無ければもっと使うが、
+                # 上限は request() で守られ、超える分は送らずに打ち切る）
+                batch_size = min(self.max_concurrency, budget.remaining)
+                if batch_size <= 0:
+                    logger.info(f"リクエスト予算 {request_budget} を使い切りました")
+                    break
+                
+                # 打ち切りの上限見積りは生のエンゲージメントの単位なので、他のスコアラーでは使わない
+                threshold = top.threshold() if self.scorer.name == 'raw' else None
+                batch = scheduler.next_batch(batch_size, threshold)
+                if not batch:
+                    break
+                
+                evaluated.update(batch)
+                logger.info(f"  {', '.join('@' + u for u in batch)} の伸びツイートをチェック中...")
+                results = await asyncio.gather(*[evaluate(username, follower_tweet_count) for username in batch])
+                # 予算切れで評価しきれなかったユーザーは評価済みにしない
+                self._mark_seen([username for username, trending in zip(batch, results) if trending is not None])
+                for trending in results:
+                    if trending is not None:
+                        collect(trending)
+                if None in results:
+                    logger.info(f"リクエスト予算 {request_budget} を使い切りました")
+                    break
+        finally:
+            _request_budget.reset(token)
+        
+        logger.info(
+            f"{len(evaluated)}人を評価、{len(scheduler)}人を未評価で終了 "
+            f"(リクエスト数: {budget.used})"
+        )
+        return top.results()
+
+    async def iter_trending_tweets_from_users_and_followers(self, main_usernames, follower_count=50, tweet_count_per_user=50, min_engagement=100):
+        """指定ユーザーとそのフォロワーの伸びツイートを見つかった順に返す（非同期イテレーター）"""
         processed_users = set()
         
-        print(f"メインユーザー {len(main_usernames)}人とそのフォロワーから伸びツイートを収集中...")
+        logger.info(f"メインユーザー {len(main_usernames)}人とそのフォロワーから伸びツイートを収集中...")
         
         # メインユーザーの処理
         for main_user in main_usernames:
             if main_user in processed_users:
                 continue
                 
-            print(f"\n@{main_user} の伸びツイートを取得中...")
+            logger.info(f"@{main_user} の伸びツイートを取得中...")
             main_trending = await self.get_trending_tweets_only(
                 main_user, tweet_count_per_user, min_engagement
             )
-            all_trending_tweets.extend(main_trending)
+            for tweet in main_trending:
+                yield tweet
             processed_users.add(main_user)
             
-            # フォロワーを取得
-            print(f"@{main_user} のフォロワーを取得中...")
-            followers = await self.get_user_followers(main_user, follower_count)
-            
-            # フォロワーの伸びツイートを取得
-            for i, follower in enumerate(followers, 1):
-                follower_username = follower['username']
-                
-                if follower_username in processed_users:
-                    continue
+            # フォロワーをページごとに取得し、ページを評価し終えてから次のページに進む
+            # （中断してもチェックポイントから続きを取得できる）
+            logger.info(f"@{main_user} のフォロワーを取得中...")
+            async for followers in self.iter_follower_pages(main_user, follower_count, resume=True):
+                targets = []
+                for follower in followers:
+                    follower_username = follower['username']
                     
-                print(f"  ({i}/{len(followers)}) @{follower_username} の伸びツイートをチェック中...")
-                
-                # フォロワー数が少なすぎる場合はスキップ
-                if follower['followers_count'] < 1000:
-                    continue
-                
-                follower_trending = await self.get_trending_tweets_only(
-                    follower_username, min(20, tweet_count_per_user), min_engagement
-                )
-                all_trending_tweets.extend(follower_trending)
-                processed_users.add(follower_username)
+                    if follower_username in processed_users or self._is_seen(follower_username):
+                        continue
+                    
+                    # フォロワー数が少なすぎる場合はスキップ
+                    if follower['followers_count'] < 1000:
+                        continue
+                    
+                    processed_users.add(follower_username)
+                    targets.append(follower_username)
                 
-                # human_delay がフォロワーツイート取得で呼ばれるので追加sleep不要
+                # フォロワーの伸びツイートを取得
+                async for tweet in self._iter_fanout(
+                    self.get_trending_tweets_only, targets,
+                    min(20, tweet_count_per_user), min_engagement,
+                    message="  ({i}/{total}) @{item} の伸びツイートをチェック中..."
+                ):
+                    yield tweet
+                self._mark_seen(targets)
             
             # メインユーザー間の間隔（追加の休憩）
-            if self.human_like:
-                await asyncio.sleep(random.uniform(3.0, 7.0))
-        
-        if not all_trending_tweets:
-            print("伸びているツイートが見つかりませんでした")
-            return []
-        
-        print(f"\n合計 {len(all_trending_tweets)}件の伸びツイートを発見")
-        
-        # バズ度の計算とソートのため、再度生データから取得
-        final_tweets = []
-        for tweet_data in all_trending_tweets:
-            # tweet_dataには基本情報しかないので、必要に応じて再取得
-            final_tweets.append(tweet_data)
-        
-        return final_tweets[:top_n]
+            # 並行モードはトークンバケットで流量制御するので不要
+            if self.human_like and not self.concurrent:
+                delay = random.uniform(3.0, 7.0)
+                await asyncio.sleep(delay)
+                self.metrics.add_sleep('human_delay', delay)
 
-    async def get_buzz_tweets_from_users(self, usernames, count_per_user=50, top_n=20):
-        """指定ユーザーからバズっているツイートを取得"""
-        print(f"{len(usernames)}人のアカウントからツイートを取得中...")
+    @instrumented
+    async def get_buzz_tweets_from_users(self, usernames, count_per_user=50, top_n=20, dedupe_threshold=0.7):
+        """
+        指定ユーザーからバズっているツイートを取得
+        
+        Args:
+            dedupe_threshold (float): コピペ・微修正の投稿を1件にまとめる類似度（Noneでまとめない）
+        """
+        logger.info(f"{len(usernames)}人のアカウントからツイートを取得中...")
         
         all_tweets = await self.get_multiple_users_tweets(usernames, count_per_user)
         
         if not all_tweets:
             return []
         
-        return all_tweets[:top_n]
+        if dedupe_threshold:
+            all_tweets = dedupe_tweets(all_tweets, dedupe_threshold)
+        
+        return self.top_tweets(all_tweets, top_n)
+
+    def top_tweets(self, tweets, top_n):
+        """バズ度の高い順に上位N件を選択（ヒープによるtop-K選択）"""
+        return heapq.nlargest(top_n, tweets, key=lambda tweet: tweet['buzz_score'])
     
+    @instrumented
     async def get_trending_topics(self):
         """トレンド取得（ログイン必要）"""
         try:
             if self.use_guest_mode:
-                print("トレンド取得にはログインが必要です")
+                logger.info("トレンド取得にはログインが必要です")
                 return []
             
-            trends = await self.client.get_trends()
+            trends = await self.request('get_trends')
             return [{'name': trend.name, 'url': trend.url} for trend in trends]
             
         except Exception as e:
-            print(f"トレンド取得エラー: {e}")
+            logger.warning(f"トレンド取得エラー: {e}")
             return []
     
     def save_to_json(self, data, filename):
         """JSONファイルに保存"""
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2, default=str)
-        print(f"データを {filename} に保存しました")
+            json.dump(data, f, ensure_ascii=False, indent=2, default=json_default)
+        logger.info(f"データを {filename} に保存しました")
+
+    async def stream_to_jsonl(self, records, filename, compression='auto', flush_every=100, append=False):
+        """
+        非同期イテレーターのレコードを JSON Lines に逐次保存
+        
+        Args:
+            records: iter_* メソッドなどの非同期イテレーター
+            filename (str): 出力ファイル名（.gz / .zst なら自動で圧縮）
+            compression (str): None, 'gzip', 'zstd', 'auto'
+            flush_every (int): 何件ごとにファイルへ書き出すか
+            append (bool): 既存ファイルに追記するか（Falseなら上書き）
+        
+        Returns:
+            int: 保存した件数
+        """
+        with JsonlWriter(filename, compression, flush_every, append) as writer:
+            async for record in records:
+                writer.write(record)
+        logger.info(f"{writer.count}件のデータを {filename} に保存しました")
+        return writer.count
+
+    async def profile_job(self, coro, filename=None):
+        """
+        1ジョブ分の処理を cProfile で計測
+        
+        Args:
+            coro: 計測するコルーチン（例: scraper.get_buzz_tweets_from_users_and_followers(...)）
+            filename (str): プロファイル結果の保存先（省略時は上位の関数を表示）
+        """
+        with self.metrics.profile(filename):
+            return await coro
 
 # 使用例
 async def main():
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    
     # ゲストモードでの使用例（人間らしい動作有効）
     print("=== ゲストモードテスト（人間らしい動作ON） ===")
     guest_scraper = TwikitScraper(use_guest_mode=True, human_like=True)
@@ -503,13 +1113,19 @@ async def main():
     
     print(f"\n界隈のバズツイート TOP {len(buzz_tweets)}")
     for i, tweet in enumerate(buzz_tweets, 1):
-        print(f"\n{i}. @{tweet['username']}")
+        print(f"\n{i}. @{tweet['username']} (バズ度: {tweet['buzz_score']})")
         print(f"   {tweet['text'][:150]}...")
     
     # データ保存
     if buzz_tweets:
         guest_scraper.save_to_json(buzz_tweets, 'community_buzz_tweets10.json')
     
+    # 待機時間・リクエスト数・キャッシュヒット率の確認
+    snapshot = guest_scraper.metrics.snapshot()
+    print(f"\nリクエスト数: {snapshot['requests']}")
+    print(f"待機時間(秒): {snapshot['sleep_seconds']}")
+    print(f"キャッシュ: {snapshot['caches']}")
+    
     print("\n" + "="*50)
     
     # 実際のアカウント情報を使用する場合はコメントアウトを解除
@@ -0,0 +1,138 @@
+# seen_set.py
+import hashlib
+import math
+import sqlite3
+import time
+
+
+class BloomFilter:
+    def __init__(self, capacity=100000, error_rate=0.01):
+        """
+        ブルームフィルター（「含まれない」は確実、「含まれる」は error_rate の確率で誤り）
+
+        要素そのものは持たず、capacity 件で error_rate になるビット配列だけを持つ
+        （10万件・1%で約120KB）。
+
+        Args:
+            capacity (int): 想定する件数
+            error_rate (float): capacity 件のときの偽陽性率
+        """
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        # 2つのハッシュの線形結合で hash_count 個の位置を作る（Kirsch-Mitzenmacher）
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def full(self):
+        return self.count >= self.capacity
+
+
+class SeenSet:
+    def __init__(self, path='seen_users.db', ttl=None, capacity=100000, error_rate=0.01):
+        """
+        評価済みのユーザーを実行をまたいで覚えておく集合
+
+        正確な一覧は SQLite に保存し、メモリにはブルームフィルターだけを置く。
+        未評価のユーザー（大半）はフィルターだけで判定でき、フィルターが「含まれる」と
+        答えたときだけ SQLite で確かめる。件数が capacity を超えたらフィルターを作り直す。
+
+        Args:
+            path (str): SQLiteファイルのパス（':memory:' で実行中のみ）
+            ttl (float): 評価済みとみなす秒数（Noneなら期限なし）
+            capacity (int): ブルームフィルターの初期の想定件数
+            error_rate (float): ブルームフィルターの偽陽性率
+        """
+        self.path = path
+        self.ttl = ttl
+        self.error_rate = error_rate
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS seen_users (
+                key TEXT PRIMARY KEY,
+                seen_at REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+        self._rebuild(capacity)
+
+    def _rebuild(self, capacity):
+        """SQLite の一覧からブルームフィルターを作り直す"""
+        total = self.conn.execute("SELECT COUNT(*) FROM seen_users").fetchone()[0]
+        self.bloom = BloomFilter(max(capacity, total * 2), self.error_rate)
+        for (key,) in self.conn.execute("SELECT key FROM seen_users"):
+            self.bloom.add(key)
+
+    @staticmethod
+    def _key(key):
+        # ユーザー名は大文字小文字を区別しない
+        return str(key).lower()
+
+    def __contains__(self, key):
+        key = self._key(key)
+        if key not in self.bloom:
+            self.misses += 1
+            return False
+        row = self.conn.execute("SELECT seen_at FROM seen_users WHERE key = ?", (key,)).fetchone()
+        if row is None or (self.ttl is not None and time.time() - row[0] > self.ttl):
+            self.misses += 1
+            return False
+        self.hits += 1
+        return True
+
+    def add(self, key):
+        self.add_many([key])
+
+    def add_many(self, keys):
+        now = time.time()
+        keys = [self._key(key) for key in keys]
+        self.conn.executemany(
+            "INSERT INTO seen_users (key, seen_at) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET seen_at = excluded.seen_at",
+            [(key, now) for key in keys]
+        )
+        self.conn.commit()
+        for key in keys:
+            if key not in self.bloom:
+                self.bloom.add(key)
+        if self.bloom.full:
+            self._rebuild(self.bloom.capacity * 2)
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM seen_users").fetchone()[0]
+
+    def prune(self):
+        """期限切れの記録を削除（ブルームフィルターも作り直す）"""
+        if self.ttl is None:
+            return 0
+        cursor = self.conn.execute("DELETE FROM seen_users WHERE seen_at < ?", (time.time() - self.ttl,))
+        self.conn.commit()
+        if cursor.rowcount:
+            self._rebuild(self.bloom.capacity)
+        return cursor.rowcount
+
+    def reset(self):
+        self.conn.execute("DELETE FROM seen_users")
+        self.conn.commit()
+        self._rebuild(self.bloom.capacity)
+
+    def close(self):
+        self.conn.close()
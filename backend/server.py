@@ -0,0 +1,363 @@
+# server.py
+# 1つの TwikitScraper セッションを使い回す非同期HTTPサービス（python server.py --help）
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from records import json_default
+from scraper import TwikitScraper
+from scoring import rank_store
+from text_analytics import analyze_store
+from timeseries import TimeSeriesQuery
+
+logger = logging.getLogger(__name__)
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+class TTLCache:
+    def __init__(self, ttl=30.0, max_entries=1000):
+        """
+        短時間だけ結果を保持するメモリキャッシュ
+
+        Args:
+            ttl (float): 有効期限（秒）
+            max_entries (int): 最大件数（超えたら古いものから削除）
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            self.entries.pop(key, None)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key, value):
+        if len(self.entries) >= self.max_entries:
+            # dictは挿入順なので先頭が最も古い
+            self.entries.pop(next(iter(self.entries)))
+        self.entries[key] = (time.monotonic(), value)
+
+
+class SingleFlight:
+    def __init__(self):
+        """同じキーの同時リクエストを1回の上流呼び出しにまとめる"""
+        self.inflight = {}
+        self.shared = 0
+
+    async def do(self, key, coro_factory):
+        """
+        key の処理が実行中ならその結果を待ち、なければ coro_factory() を実行
+
+        Args:
+            key: 同一リクエストを判定するキー
+            coro_factory: コルーチンを返す関数
+        """
+        future = self.inflight.get(key)
+        if future is not None:
+            self.shared += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(coro_factory())
+        self.inflight[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if future.done():
+                self.inflight.pop(key, None)
+            else:
+                # 呼び出し元がキャンセルされても、待っている他のリクエストのために実行は続ける
+                future.add_done_callback(lambda _: self.inflight.pop(key, None))
+
+
+class ScraperService:
+    def __init__(self, scraper, cache_ttl=30.0):
+        """
+        スクレイパーの呼び出しをキャッシュとシングルフライトでまとめるサービス
+
+        Args:
+            scraper (TwikitScraper): setup() 済みのスクレイパー
+            cache_ttl (float): 結果をメモリに保持する秒数
+        """
+        self.scraper = scraper
+        self.cache = TTLCache(cache_ttl)
+        self.single_flight = SingleFlight()
+        scraper.metrics.register_cache('service_cache', self.cache)
+        self.timeseries = TimeSeriesQuery(scraper.store) if scraper.store else None
+        if self.timeseries:
+            scraper.metrics.register_cache('timeseries_cache', self.timeseries)
+
+    async def cached(self, key, coro_factory):
+        """キャッシュ → 実行中の同一リクエスト → 上流呼び出し の順に結果を取得"""
+        value = self.cache.get(key)
+        if value is not None:
+            return value
+
+        async def load():
+            result = await coro_factory()
+            # 取得失敗（None / 空）はキャッシュしない
+            if result:
+                self.cache.set(key, result)
+            return result
+
+        return await self.single_flight.do(key, load)
+
+    async def user_info(self, username):
+        username = self.scraper.normalize_username(username).lower()
+        return await self.cached(('user_info', username), lambda: self.scraper.get_user_info(username))
+
+    async def user_tweets(self, username, count=20):
+        username = self.scraper.normalize_username(username).lower()
+        return await self.cached(
+            ('user_tweets', username, count),
+            lambda: self.scraper.get_user_tweets(username, count)
+        )
+
+    async def buzz(self, usernames, follower_count=30, tweet_count_per_user=30, min_engagement=100, top_n=30):
+        usernames = tuple(sorted(self.scraper.normalize_username(u).lower() for u in usernames))
+        key = ('buzz', usernames, follower_count, tweet_count_per_user, min_engagement, top_n)
+        return await self.cached(key, lambda: self.scraper.get_buzz_tweets_from_users_and_followers(
+            list(usernames), follower_count, tweet_count_per_user, min_engagement, top_n
+        ))
+
+    def search(self, query, count=20, username=None):
+        if not self.scraper.store:
+            return None
+        return self.scraper.search_local(query, count, username)
+
+    async def rank(self, scorer='raw', top_n=20, username=None):
+        """蓄積したツイートを別のスコアラーで順位付け（上流へのリクエスト無し。ストアが更新されるまでキャッシュ）"""
+        store = self.scraper.store
+        if not store:
+            return None
+
+        async def load():
+            return rank_store(store, scorer, top_n, username)
+        return await self.cached(('rank', scorer, top_n, username, store.version), load)
+
+    async def analytics(self, username=None, days=None, top=30):
+        """本文の集計（プロセスプールで実行するので、待っている間も他のリクエストを処理できる）"""
+        if not self.scraper.store:
+            return None
+        since = time.time() - days * 86400 if days else None
+        return await self.cached(
+            ('analytics', username, days, top),
+            lambda: asyncio.to_thread(analyze_store, self.scraper.store.path, username, since, top)
+        )
+
+    def series(self, usernames=None, start=None, end=None, granularity='day', max_points=None, metric='likes'):
+        if not self.timeseries:
+            return None
+        return self.timeseries.query(usernames, start, end, granularity, max_points, metric)
+
+    def dashboard(self, username=None, days=7, top=5):
+        if not self.scraper.store:
+            return None
+        return self.scraper.store.dashboard(username, days, top)
+
+
+def _int_param(query, name, default):
+    values = query.get(name)
+    return int(values[0]) if values else default
+
+
+async def route(service, method, path, query):
+    """
+    リクエストを処理して (ステータス, 本文) を返す
+
+    GET /api/health
+    GET /api/users/<username>
+    GET /api/users/<username>/tweets?count=20
+    GET /api/buzz?users=a,b&follower_count=30&tweet_count=30&min_engagement=100&top_n=30
+    GET /api/dashboard?username=&days=7&top=5
+    GET /api/rising?top_n=20
+    GET /api/search?q=...&count=20&username=
+    GET /api/analytics?username=&days=&top=30
+    GET /api/rank?scorer=zscore&top_n=20&username=
+    GET /api/timeseries?users=a,b&granularity=day&start=YYYY-MM-DD&end=YYYY-MM-DD&points=200&metric=likes
+    GET /metrics（Next.js の /api/scraper/... 経由では /api/metrics）
+    """
+    if method != 'GET':
+        return 405, {'error': 'GET only'}
+
+    parts = [unquote(p) for p in path.strip('/').split('/') if p]
+
+    if parts == ['api', 'health']:
+        return 200, {'status': 'ok'}
+
+    if parts in (['metrics'], ['api', 'metrics']):
+        return 200, service.scraper.metrics.to_prometheus()
+
+    if len(parts) == 3 and parts[:2] == ['api', 'users']:
+        user = await service.user_info(parts[2])
+        return (200, user) if user else (404, {'error': 'user not found'})
+
+    if len(parts) == 4 and parts[:2] == ['api', 'users'] and parts[3] == 'tweets':
+        tweets = await service.user_tweets(parts[2], _int_param(query, 'count', 20))
+        return 200, tweets
+
+    if parts == ['api', 'buzz']:
+        users = [u for value in query.get('users', []) for u in value.split(',') if u]
+        if not users:
+            return 400, {'error': 'users is required'}
+        tweets = await service.buzz(
+            users,
+            follower_count=_int_param(query, 'follower_count', 30),
+            tweet_count_per_user=_int_param(query, 'tweet_count', 30),
+            min_engagement=_int_param(query, 'min_engagement', 100),
+            top_n=_int_param(query, 'top_n', 30),
+        )
+        return 200, tweets
+
+    if parts == ['api', 'rising']:
+        top_n = _int_param(query, 'top_n', 20)
+        # 記録済みの推移から計算する（再取得は1件1リクエストなので、リクエストのたびには行わない）
+        return 200, await service.cached(
+            ('rising', top_n), lambda: service.scraper.get_rising_tweets(top_n, repoll=False)
+        )
+
+    if parts == ['api', 'search']:
+        q = (query.get('q') or [''])[0]
+        if not q.strip():
+            return 400, {'error': 'q is required'}
+        tweets = service.search(q, _int_param(query, 'count', 20), (query.get('username') or [None])[0])
+        return (200, tweets) if tweets is not None else (404, {'error': 'tweet store is not enabled'})
+
+    if parts == ['api', 'rank']:
+        ranked = await service.rank(
+            (query.get('scorer') or ['raw'])[0], _int_param(query, 'top_n', 20), (query.get('username') or [None])[0]
+        )
+        return (200, ranked) if ranked is not None else (404, {'error': 'tweet store is not enabled'})
+
+    if parts == ['api', 'analytics']:
+        days = _int_param(query, 'days', 0)
+        data = await service.analytics(
+            (query.get('username') or [None])[0], days or None, _int_param(query, 'top', 30)
+        )
+        return (200, data) if data else (404, {'error': 'tweet store is not enabled'})
+
+    if parts == ['api', 'timeseries']:
+        users = [u for value in query.get('users', []) for u in value.split(',') if u]
+        data = service.series(
+            users or None,
+            (query.get('start') or [None])[0],
+            (query.get('end') or [None])[0],
+            (query.get('granularity') or ['day'])[0],
+            _int_param(query, 'points', 0) or None,
+            (query.get('metric') or ['likes'])[0],
+        )
+        return (200, data) if data else (404, {'error': 'tweet store is not enabled'})
+
+    if parts == ['api', 'dashboard']:
+        data = service.dashboard(
+            (query.get('username') or [None])[0],
+            _int_param(query, 'days', 7),
+            _int_param(query, 'top', 5),
+        )
+        return (200, data) if data else (404, {'error': 'tweet store is not enabled'})
+
+    return 404, {'error': 'not found'}
+
+
+async def handle_connection(service, reader, writer):
+    """HTTP/1.1 のリクエストを1つ処理して接続を閉じる"""
+    try:
+        request_line = (await reader.readline()).decode('latin-1').strip()
+        if not request_line:
+            return
+        # ヘッダーは読み捨てる（GETのみなので本文は無い）
+        while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+            pass
+
+        try:
+            request = request_line.split(' ', 2)
+            if len(request) != 3:
+                raise ValueError(f"不正なリクエスト行です: {request_line}")
+            method, target, _ = request
+            url = urlsplit(target)
+            status, body = await route(service, method, url.path, parse_qs(url.query))
+        except ValueError as e:
+            status, body = 400, {'error': str(e)}
+        except Exception as e:
+            logger.exception(f"リクエスト処理エラー: {request_line}")
+            status, body = 500, {'error': str(e)}
+
+        if isinstance(body, str):
+            payload = body.encode('utf-8')
+            content_type = 'text/plain; version=0.0.4; charset=utf-8'
+        else:
+            payload = json.dumps(body, ensure_ascii=False, default=json_default).encode('utf-8')
+            content_type = 'application/json; charset=utf-8'
+
+        writer.write(
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            "Access-Control-Allow-Origin: *\r\n"
+            "Connection: close\r\n\r\n".encode('latin-1') + payload
+        )
+        await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(scraper, host='127.0.0.1', port=8000, cache_ttl=30.0):
+    """スクレイパーをHTTPで公開（停止するまで実行）"""
+    service = ScraperService(scraper, cache_ttl)
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_connection(service, reader, writer), host, port
+    )
+    logger.info(f"http://{host}:{port} で待ち受けています")
+    async with server:
+        await server.serve_forever()
+
+
+async def run(args):
+    scraper = TwikitScraper(
+        use_guest_mode=not args.login,
+        human_like=not args.no_human_like,
+        max_concurrency=args.concurrency,
+        store_path=args.store,
+    )
+    # ログイン / activate() はプロセスにつき1回だけ
+    if args.login:
+        await scraper.setup(
+            username=os.environ.get('X_USERNAME'),
+            email=os.environ.get('X_EMAIL'),
+            password=os.environ.get('X_PASSWORD'),
+        )
+    else:
+        await scraper.setup()
+    await serve(scraper, args.host, args.port, args.cache_ttl)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='TwikitScraper のHTTPサービス')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--login', action='store_true', help='ログインモード（X_USERNAME / X_EMAIL / X_PASSWORD を使用）')
+    parser.add_argument('--concurrency', type=int, default=4, help='max_concurrency')
+    parser.add_argument('--no-human-like', action='store_true')
+    parser.add_argument('--store', default='tweets.db', help='ツイートストアのパス')
+    parser.add_argument('--cache-ttl', type=float, default=30.0, help='結果キャッシュの秒数')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
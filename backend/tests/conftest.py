@@ -0,0 +1,31 @@
+# conftest.py
+# テストは backend/ で実行する（python -m pytest -q）
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from replay_client import ReplayClient  # noqa: E402
+from scraper import TwikitScraper  # noqa: E402
+
+
+@pytest.fixture
+def make_scraper():
+    """再生クライアントを使うスクレイパーを作る（待機なし・ユーザーキャッシュなし）"""
+    scrapers = []
+
+    def factory(fixtures, **kwargs):
+        client = kwargs.pop('client', None) or ReplayClient(fixtures)
+        kwargs.setdefault('user_cache_path', None)
+        kwargs.setdefault('human_like', False)
+        scraper = TwikitScraper(client=client, **kwargs)
+        scrapers.append(scraper)
+        return scraper
+
+    yield factory
+    for scraper in scrapers:
+        for resource in (scraper.checkpoints, scraper.store, scraper.seen):
+            if resource is not None:
+                resource.close()
@@ -0,0 +1,67 @@
+# test_budget.py
+import asyncio
+
+import pytest
+
+from replay_client import build_synthetic_fixtures
+
+
+@pytest.fixture(scope='module')
+def fixtures():
+    return build_synthetic_fixtures(('main',), followers_per_user=60, tweets_per_user=30)
+
+
+def _run_budget(scraper, **kwargs):
+    return asyncio.run(scraper.get_buzz_tweets_with_budget(
+        ['main'], follower_count=60, tweet_count_per_user=30, min_engagement=10, top_n=3,
+        request_budget=200, **kwargs
+    ))
+
+
+def test_score_per_follower_allows_early_stop_on_first_run(make_scraper, fixtures):
+    unbounded = make_scraper(fixtures)
+    _run_budget(unbounded)
+    bounded = make_scraper(fixtures)
+    _run_budget(bounded, score_per_follower=0.01)
+
+    assert bounded.client.request_count < unbounded.client.request_count
+
+
+def test_yield_is_not_recorded_for_skipped_users(make_scraper, fixtures, tmp_path):
+    paths = {
+        'checkpoint_path': str(tmp_path / 'checkpoints.db'),
+        'yield_path': str(tmp_path / 'yield.db'),
+        'min_poll_interval': 3600,
+    }
+    first = make_scraper(fixtures, **paths)
+    _run_budget(first)
+    runs = dict(first.yield_store.conn.execute("SELECT username, runs FROM user_yield"))
+    first.yield_store.close()
+    assert runs
+
+    # 2回目は全員 min_poll_interval 以内に取得済みなのでツイートをチェックしない
+    second = make_scraper(fixtures, **paths)
+    _run_budget(second)
+    assert dict(second.yield_store.conn.execute("SELECT username, runs FROM user_yield")) == runs
+    second.yield_store.close()
+
+
+@pytest.mark.parametrize('budget', [5, 10, 11])
+def test_request_budget_is_never_exceeded(make_scraper, fixtures, budget):
+    # ユーザーキャッシュ無しではフォロワー1人に2リクエスト以上かかるが、予算は超えない
+    scraper = make_scraper(fixtures, max_concurrency=4)
+    asyncio.run(scraper.get_buzz_tweets_with_budget(
+        ['main'], follower_count=60, tweet_count_per_user=30, min_engagement=10, top_n=60,
+        request_budget=budget,
+    ))
+    assert scraper.client.request_count <= budget
+
+
+def test_yield_best_score_is_raw_engagement_for_any_scorer(make_scraper, fixtures):
+    raw = make_scraper(fixtures)
+    _run_budget(raw)
+    rate = make_scraper(fixtures, scorer='rate')
+    _run_budget(rate)
+
+    query = "SELECT username, best_score FROM user_yield ORDER BY username"
+    assert rate.yield_store.conn.execute(query).fetchall() == raw.yield_store.conn.execute(query).fetchall()
@@ -0,0 +1,62 @@
+# test_followers.py
+import asyncio
+
+import pytest
+
+from replay_client import build_synthetic_fixtures
+
+
+@pytest.fixture(scope='module')
+def fixtures():
+    return build_synthetic_fixtures(('main',), followers_per_user=250, tweets_per_user=5, followers_page_size=100)
+
+
+def _names(followers):
+    return [f['username'] for f in followers]
+
+
+def test_follower_pages_resume_inside_page_across_runs(make_scraper, fixtures, tmp_path):
+    checkpoint_path = str(tmp_path / 'checkpoints.db')
+    runs = []
+    for _ in range(4):
+        scraper = make_scraper(fixtures, checkpoint_path=checkpoint_path)
+        followers = asyncio.run(scraper.get_user_followers('main', 30, resume=True))
+        runs.append((_names(followers), scraper.client.calls['get_user_followers']))
+
+    assert runs[0] == ([f'main_follower{i}' for i in range(0, 30)], 1)
+    assert runs[1] == ([f'main_follower{i}' for i in range(30, 60)], 1)
+    assert runs[2] == ([f'main_follower{i}' for i in range(60, 90)], 1)
+    # ページをまたぐ場合は次のページも取得する
+    assert runs[3] == ([f'main_follower{i}' for i in range(90, 120)], 2)
+
+
+def test_follower_pages_restart_from_top_after_last_page(make_scraper, fixtures, tmp_path):
+    checkpoint_path = str(tmp_path / 'checkpoints.db')
+    scraper = make_scraper(fixtures, checkpoint_path=checkpoint_path)
+    assert len(asyncio.run(scraper.get_user_followers('main', None, resume=True))) == 250
+
+    scraper = make_scraper(fixtures, checkpoint_path=checkpoint_path)
+    followers = asyncio.run(scraper.get_user_followers('main', 10, resume=True))
+    assert _names(followers) == [f'main_follower{i}' for i in range(10)]
+
+
+def test_follower_pages_without_resume_always_start_at_top(make_scraper, fixtures, tmp_path):
+    checkpoint_path = str(tmp_path / 'checkpoints.db')
+    for _ in range(2):
+        scraper = make_scraper(fixtures, checkpoint_path=checkpoint_path)
+        followers = asyncio.run(scraper.get_user_followers('main', 30))
+        assert _names(followers) == [f'main_follower{i}' for i in range(30)]
+
+
+def test_buzz_expansion_evaluates_new_followers_each_run(make_scraper, fixtures, tmp_path):
+    paths = {'checkpoint_path': str(tmp_path / 'checkpoints.db'), 'seen_path': str(tmp_path / 'seen.db')}
+    for _ in range(3):
+        scraper = make_scraper(fixtures, **paths)
+        before = len(scraper.seen)
+        asyncio.run(scraper.get_buzz_tweets_from_users_and_followers(
+            ['main'], follower_count=30, tweet_count_per_user=5, min_engagement=10
+        ))
+        # メインユーザーのタイムライン + 評価したフォロワーのタイムライン
+        timelines = scraper.client.calls['get_user_tweets'] - 1
+        assert timelines > 0
+        assert len(scraper.seen) - before == timelines
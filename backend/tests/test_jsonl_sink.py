@@ -0,0 +1,50 @@
+# test_jsonl_sink.py
+import asyncio
+
+import pytest
+
+from jsonl_sink import JsonlWriter, read_jsonl
+
+
+def _write(path, records, **kwargs):
+    with JsonlWriter(path, flush_every=2, **kwargs) as writer:
+        for record in records:
+            writer.write(record)
+    return writer.count
+
+
+@pytest.mark.parametrize('name', ['out.jsonl', 'out.jsonl.gz'])
+def test_writer_truncates_by_default_and_appends_on_request(tmp_path, name):
+    path = str(tmp_path / name)
+    _write(path, [{'id': 1}, {'id': 2}, {'id': 3}])
+    assert _write(path, [{'id': 4}]) == 1
+    assert list(read_jsonl(path)) == [{'id': 4}]
+
+    _write(path, [{'id': 5}], append=True)
+    assert list(read_jsonl(path)) == [{'id': 4}, {'id': 5}]
+
+
+def test_writer_keeps_flushed_records_when_interrupted(tmp_path):
+    path = str(tmp_path / 'out.jsonl')
+    writer = JsonlWriter(path, flush_every=2)
+    for i in range(3):
+        writer.write({'id': i})
+
+    assert list(read_jsonl(path)) == [{'id': 0}, {'id': 1}]
+    writer.close()
+    assert len(list(read_jsonl(path))) == 3
+
+
+def test_stream_to_jsonl_overwrites_previous_run(make_scraper, tmp_path):
+    path = str(tmp_path / 'out.jsonl')
+    scraper = make_scraper({'responses': {}})
+
+    async def records(n):
+        for i in range(n):
+            yield {'id': i}
+
+    asyncio.run(scraper.stream_to_jsonl(records(3), path))
+    asyncio.run(scraper.stream_to_jsonl(records(2), path))
+    assert len(list(read_jsonl(path))) == 2
+    asyncio.run(scraper.stream_to_jsonl(records(2), path, append=True))
+    assert len(list(read_jsonl(path))) == 4
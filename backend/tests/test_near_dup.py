@@ -0,0 +1,45 @@
+# test_near_dup.py
+import asyncio
+
+from near_dup import NearDuplicateIndex
+from replay_client import build_synthetic_fixtures
+
+COPIED = "新作のラーメンが最高に美味しかったので週末はみんなで東京の店に行こう"
+
+
+def _record(tweet_id, text, score, username='user'):
+    return {'id': str(tweet_id), 'text': text, 'username': username, 'buzz_score': score,
+            'metrics': {'favorite_count': score}}
+
+
+def test_index_clusters_copies_and_keeps_best_representative():
+    index = NearDuplicateIndex(0.7)
+    index.extend([
+        _record(1, f"{COPIED} https://t.co/aaa", 10, 'a'),
+        _record(2, f"RT @a: {COPIED} https://t.co/bbb", 50, 'b'),
+        _record(3, "今日は大雨なので家で映画を観ながらコーヒーを飲んでいる", 30, 'c'),
+    ])
+
+    assert len(index) == 2
+    copied = next(r for r in index.representatives() if r['duplicates']['count'] == 2)
+    assert copied['id'] == '2'
+    assert sorted(copied['duplicates']['ids']) == ['1', '2']
+    assert copied['duplicates']['usernames'] == ['a', 'b']
+    assert copied['duplicates']['buzz_score'] == 60
+
+
+def test_buzz_ranking_merges_copy_paste_posts(make_scraper):
+    fixtures = build_synthetic_fixtures(('a', 'b', 'c'), followers_per_user=0, tweets_per_user=3)
+    timelines = fixtures['responses']['get_user_tweets']
+    for user_id, suffix in (('1', 'x1'), ('2', 'x2')):
+        timelines[user_id]['items'][0]['text'] = f"{COPIED} https://t.co/{suffix}"
+    copy_ids = {timelines['1']['items'][0]['id'], timelines['2']['items'][0]['id']}
+
+    scraper = make_scraper(fixtures)
+    deduped = asyncio.run(scraper.get_buzz_tweets_from_users(['a', 'b', 'c'], 3, top_n=20))
+    raw = asyncio.run(scraper.get_buzz_tweets_from_users(['a', 'b', 'c'], 3, top_n=20, dedupe_threshold=None))
+
+    assert len(raw) == 9
+    assert len(deduped) == 8
+    merged = [t for t in deduped if t['id'] in copy_ids]
+    assert len(merged) == 1 and merged[0]['duplicates']['count'] == 2
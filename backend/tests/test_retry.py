@@ -0,0 +1,156 @@
+# test_retry.py
+import asyncio
+import time
+
+import pytest
+
+from replay_client import ReplayClient, ReplayError, build_synthetic_fixtures
+from retry import (
+    PERMANENT, RATE_LIMITED, TRANSIENT, UNKNOWN, CircuitOpenError, RetryPolicy, classify_error,
+)
+
+
+class TooManyRequests(Exception):
+    def __init__(self, message, rate_limit_reset=None):
+        super().__init__(message)
+        self.rate_limit_reset = rate_limit_reset
+
+
+class Unauthorized(Exception):
+    pass
+
+
+class UserNotFound(Exception):
+    pass
+
+
+class RateLimitedClient(ReplayClient):
+    """reset_at までは全リクエストにレート制限を返す再生クライアント"""
+
+    def __init__(self, fixtures, reset_at):
+        super().__init__(fixtures)
+        self.reset_at = reset_at
+
+    async def _replay(self, endpoint, args, kwargs):
+        # 同時に送ったリクエストがまとめてレート制限されるよう、判定の前に応答を待つ
+        await asyncio.sleep(0.01)
+        if time.time() < self.reset_at:
+            self.calls[endpoint] += 1
+            raise TooManyRequests('Rate limit exceeded', self.reset_at)
+        return await super()._replay(endpoint, args, kwargs)
+
+
+@pytest.fixture(scope='module')
+def fixtures():
+    return build_synthetic_fixtures(('main',), followers_per_user=10, tweets_per_user=1)
+
+
+def test_rate_limits_wait_for_reset_without_opening_breaker(make_scraper, fixtures, monkeypatch):
+    # リセット時刻に加えるジッターを0にしてテストを速くする
+    monkeypatch.setattr('retry.random.uniform', lambda a, b: a)
+    client = RateLimitedClient(fixtures, time.time() + 0.3)
+    scraper = make_scraper(fixtures, client=client, max_concurrency=8)
+
+    async def lookup_all():
+        return await asyncio.gather(*[scraper.get_user_info_by_id(user_id) for user_id in range(1, 9)])
+
+    profiles = asyncio.run(lookup_all())
+
+    assert all(profile is not None for profile in profiles)
+    assert scraper.breaker('get_user_by_id').state == 'closed'
+    assert not scraper.metrics.rejected
+    assert scraper.metrics.retries['get_user_by_id'] >= 8
+
+
+def test_transient_failures_open_breaker(make_scraper, fixtures):
+    client = ReplayClient(fixtures, error_rate=1.0)
+    scraper = make_scraper(fixtures, client=client, retry_policy=RetryPolicy(max_retries=0))
+
+    for _ in range(scraper.breaker('get_user_by_id').failure_threshold):
+        with pytest.raises(ReplayError):
+            asyncio.run(scraper.request('get_user_by_id', '1'))
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(scraper.request('get_user_by_id', '1'))
+    assert scraper.metrics.rejected['get_user_by_id'] == 1
+
+
+def test_auth_errors_are_not_retried_or_negatively_cached(make_scraper, fixtures):
+    client = ReplayClient(fixtures, error_rate=1.0, error_factory=lambda endpoint: Unauthorized('Could not authenticate'))
+    scraper = make_scraper(fixtures, client=client)
+
+    with pytest.raises(Unauthorized):
+        asyncio.run(scraper.request('get_user_by_id', '1'))
+    with pytest.raises(Unauthorized):
+        asyncio.run(scraper.request('get_user_by_id', '1'))
+
+    assert client.calls['get_user_by_id'] == 2
+    assert not scraper.negative_cache.entries
+    assert scraper.breaker('get_user_by_id').failures == 2
+
+
+def test_negative_cache_raises_fresh_exception(make_scraper, fixtures):
+    client = ReplayClient(fixtures, error_rate=1.0, error_factory=lambda endpoint: UserNotFound('User not found'))
+    scraper = make_scraper(fixtures, client=client)
+
+    with pytest.raises(UserNotFound) as first:
+        asyncio.run(scraper.request('get_user_by_id', '1'))
+    with pytest.raises(UserNotFound) as second:
+        asyncio.run(scraper.request('get_user_by_id', '1'))
+
+    assert client.calls['get_user_by_id'] == 1
+    assert second.value is not first.value
+    assert str(second.value) == 'User not found'
+    assert scraper.breaker('get_user_by_id').state == 'closed'
+
+
+def test_throttled_endpoint_does_not_block_other_endpoints(make_scraper, fixtures):
+    scraper = make_scraper(fixtures, rate_limits={'get_user_tweets': 1})
+
+    async def run():
+        await scraper.request('get_user_tweets', '1', count=1)
+        # 2回目はトークンの補充（約15分）を待つ
+        throttled = asyncio.create_task(scraper.request('get_user_tweets', '1', count=1))
+        await asyncio.sleep(0)
+        try:
+            return await asyncio.wait_for(scraper.request('get_user_by_id', '1'), timeout=1.0)
+        finally:
+            throttled.cancel()
+
+    assert asyncio.run(run()).screen_name == 'main'
+
+
+class _Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class HTTPStatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.response = _Response(status_code)
+
+
+@pytest.mark.parametrize('error, kind', [
+    (TimeoutError(), TRANSIENT),
+    (ConnectionResetError(), TRANSIENT),
+    (HTTPStatusError(503), TRANSIENT),
+    (HTTPStatusError(429), RATE_LIMITED),
+    (HTTPStatusError(404), UNKNOWN),
+    (UserNotFound(), PERMANENT),
+    (ValueError('unexpected response'), UNKNOWN),
+])
+def test_classify_error_retries_only_known_transient_errors(error, kind):
+    assert classify_error(error) == kind
+
+
+def test_unknown_errors_are_not_retried_cached_or_counted(make_scraper, fixtures):
+    client = ReplayClient(fixtures, error_rate=1.0, error_factory=lambda endpoint: ValueError('unexpected response'))
+    scraper = make_scraper(fixtures, client=client)
+
+    for _ in range(scraper.breaker('get_user_by_id').failure_threshold + 1):
+        with pytest.raises(ValueError):
+            asyncio.run(scraper.request('get_user_by_id', '1'))
+
+    assert client.calls['get_user_by_id'] == scraper.breaker('get_user_by_id').failure_threshold + 1
+    assert not scraper.negative_cache.entries
+    assert scraper.breaker('get_user_by_id').state == 'closed'
@@ -0,0 +1,63 @@
+# test_scoring.py
+import math
+
+import pytest
+
+from scoring import EngagementRateScorer, ZScoreScorer, score_records
+
+
+def _tweet(tweet_id, likes, username='a', followers=None):
+    record = {'id': str(tweet_id), 'username': username, 'metrics': {'favorite_count': likes}}
+    if followers is not None:
+        record['user'] = {'username': username, 'followers_count': followers}
+    return record
+
+
+def test_zscore_baseline_excludes_the_scored_tweet():
+    scorer = ZScoreScorer(min_samples=3, min_std=0.0)
+    tweets = [_tweet(i, likes) for i, likes in enumerate([10, 20, 30, 40, 1000], 1)]
+    score_records(scorer, tweets)
+
+    others = [math.log1p(likes) for likes in (10, 20, 30, 40)]
+    mean = sum(others) / len(others)
+    std = math.sqrt(sum((v - mean) ** 2 for v in others) / len(others))
+    assert tweets[-1]['buzz_score'] == round((math.log1p(1000) - mean) / std, 3)
+    assert tweets[-1]['buzz_score'] > max(t['buzz_score'] for t in tweets[:-1])
+
+
+def test_zscore_needs_min_samples_per_author():
+    scorer = ZScoreScorer(min_samples=5)
+    tweets = score_records(scorer, [_tweet(i, 10 * i) for i in range(1, 6)] + [_tweet(9, 500, username='b')])
+
+    # 自分を除くと4件しかない
+    assert all(t['buzz_score'] == 0.0 for t in tweets)
+
+
+def test_zscore_baseline_keeps_newest_window_and_loads_once():
+    loads = []
+
+    def loader(username, limit):
+        loads.append(username)
+        return [_tweet(i, 5) for i in range(1, 11)]
+
+    scorer = ZScoreScorer(window=5, loader=loader)
+    scorer.observe(_tweet(100, 5))
+    scorer.observe(_tweet(101, 5))
+
+    assert loads == ['a']
+    assert sorted(scorer.baselines['a'].values) == [8, 9, 10, 100, 101]
+    assert (scorer.hits, scorer.misses) == (1, 1)
+
+
+@pytest.mark.parametrize('followers', [0, None])
+def test_rate_scorer_treats_missing_followers_as_one(followers):
+    scorer = EngagementRateScorer(per=1000)
+    record = _tweet(1, 3, followers=followers) if followers is not None else _tweet(1, 3)
+
+    assert scorer.score(record) == 3000
+
+
+def test_rate_scorer_divides_by_followers():
+    scorer = EngagementRateScorer(per=1000)
+
+    assert scorer.score(_tweet(1, 50, followers=10000)) == 5.0
@@ -0,0 +1,74 @@
+# test_search.py
+import pytest
+
+from tweet_store import TweetStore
+
+TWEETS = [
+    ('1', 'alice', '東京のラーメンが美味しい', 10),
+    ('2', 'bob', '期間限定 ラーメン 始めました', 50),
+    ('3', 'alice', '京都 東京 どちらも好き', 30),
+    ('4', 'bob', '東京都 の うどん', 20),
+    ('5', 'carol', 'Pythonで 全文検索 を作る', 40),
+    ('6', 'carol', 'python search engine', 5),
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TweetStore(str(tmp_path / 'tweets.db'))
+    store.add_tweets([
+        {'id': tweet_id, 'username': username, 'text': text, 'created_at': 1700000000, 'buzz_score': score}
+        for tweet_id, username, text, score in TWEETS
+    ])
+    yield store
+    store.close()
+
+
+def _ids(results):
+    return [tweet['id'] for tweet in results]
+
+
+def test_japanese_bigrams_match_substrings(store):
+    assert _ids(store.search('ラーメン')) == ['2', '1']
+    assert _ids(store.search('東京')) == ['3', '4', '1']
+
+
+def test_bigram_candidates_are_confirmed_against_text(store):
+    # 「京都 東京」は 東京都 の2-gram（東京・京都）を両方含むが、東京都 は含まない
+    assert _ids(store.search('東京都')) == ['4']
+
+
+def test_quoted_phrase_keeps_word_order(store):
+    assert _ids(store.search('"python search"')) == ['6']
+    assert _ids(store.search('"search python"')) == []
+
+
+def test_exclusions_and_or(store):
+    assert _ids(store.search('ラーメン -"期間限定"')) == ['1']
+    assert _ids(store.search('ラーメン OR うどん -東京')) == ['2']
+
+
+def test_username_filter(store):
+    assert _ids(store.search('東京', username='alice')) == ['3', '1']
+    assert _ids(store.search('python', username='alice')) == []
+
+
+def test_results_are_ordered_by_buzz_score_and_limited(store):
+    assert _ids(store.search('python')) == ['5', '6']
+    assert _ids(store.search('東京', limit=2)) == ['3', '4']
+
+
+def test_many_candidates_use_buzz_index(tmp_path):
+    store = TweetStore(str(tmp_path / 'tweets.db'))
+    store.add_tweets([
+        {'id': str(i), 'username': 'u', 'text': f'ラーメン {i}' if i % 3 else f'ラーメン 期間限定 {i}',
+         'created_at': 1700000000, 'buzz_score': i % 97}
+        for i in range(1, 2001)
+    ])
+    results = store.search('ラーメン -期間限定', limit=10)
+    store.close()
+
+    scores = [tweet['buzz_score'] for tweet in results]
+    assert len(results) == 10
+    assert scores == sorted(scores, reverse=True) and scores[0] == 96
+    assert all('期間限定' not in tweet['text'] for tweet in results)
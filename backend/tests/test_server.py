@@ -0,0 +1,101 @@
+# test_server.py
+import asyncio
+
+import pytest
+
+from replay_client import build_synthetic_fixtures
+from server import ScraperService, SingleFlight, TTLCache, handle_connection, route
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Writer:
+    def __init__(self):
+        self.data = b''
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr('server.time.monotonic', clock)
+    cache = TTLCache(ttl=30.0)
+    cache.set('key', 'value')
+
+    clock.now += 30.0
+    assert cache.get('key') == 'value'
+    clock.now += 0.1
+    assert cache.get('key') is None
+    assert 'key' not in cache.entries
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_ttl_cache_drops_oldest_when_full():
+    cache = TTLCache(max_entries=2)
+    for key in ('a', 'b', 'c'):
+        cache.set(key, key)
+
+    assert list(cache.entries) == ['b', 'c']
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    single_flight = SingleFlight()
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return 'result'
+
+    async def run():
+        results = await asyncio.gather(*[single_flight.do('key', load) for _ in range(5)])
+        # 完了後の呼び出しは新しく実行する
+        results.append(await single_flight.do('key', load))
+        return results
+
+    assert asyncio.run(run()) == ['result'] * 6
+    assert len(calls) == 2
+    assert single_flight.shared == 4
+    assert not single_flight.inflight
+
+
+@pytest.fixture
+def service(make_scraper):
+    return ScraperService(make_scraper(build_synthetic_fixtures(('main',), followers_per_user=1, tweets_per_user=1)))
+
+
+def _request(service, raw):
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        reader.feed_eof()
+        writer = _Writer()
+        await handle_connection(service, reader, writer)
+        return writer.data
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize('request_line', [b'GET\r\n', b'GET /api/health\r\n'])
+def test_malformed_request_line_returns_400(service, request_line):
+    assert _request(service, request_line + b'\r\n').startswith(b'HTTP/1.1 400 Bad Request')
+
+
+def test_metrics_are_served_under_api_prefix(service):
+    status, body = asyncio.run(route(service, 'GET', '/api/metrics', {}))
+
+    assert status == 200
+    assert body == asyncio.run(route(service, 'GET', '/metrics', {}))[1]
@@ -0,0 +1,42 @@
+# test_timeline.py
+import asyncio
+import copy
+
+from replay_client import build_synthetic_fixtures
+
+
+def _tweet(template, tweet_id):
+    tweet = dict(template)
+    tweet['id'] = str(tweet_id)
+    tweet['text'] = f"新着 {tweet_id}"
+    return tweet
+
+
+def test_since_id_pages_until_known_tweets(make_scraper, tmp_path):
+    fixtures = build_synthetic_fixtures(('main',), followers_per_user=0, tweets_per_user=10)
+    old = fixtures['responses']['get_user_tweets']['1']['items']
+    newest_old = int(old[0]['id'])
+    checkpoint_path = str(tmp_path / 'checkpoints.db')
+
+    first = make_scraper(fixtures, checkpoint_path=checkpoint_path)
+    assert len(asyncio.run(first.get_user_tweets('main', 10))) == 10
+    assert first.checkpoints.get_since_id('1') == newest_old
+
+    # 新着5件が2ページにまたがり、2ページ目の途中から既読
+    new = [_tweet(old[0], newest_old + i) for i in range(5, 0, -1)]
+    updated = copy.deepcopy(fixtures)
+    timelines = updated['responses']['get_user_tweets']
+    timelines['1'] = {'items': new[:3], 'next_cursor': 'page2'}
+    timelines['1|page2'] = {'items': new[3:] + old[:3], 'next_cursor': 'page3'}
+
+    second = make_scraper(updated, checkpoint_path=checkpoint_path)
+    tweets = asyncio.run(second.get_user_tweets('main', 10))
+    assert [t['id'] for t in tweets] == [t['id'] for t in new]
+    assert second.client.calls['get_user_tweets'] == 2
+    assert second.checkpoints.get_since_id('1') == newest_old + 5
+
+    # 新着が無ければ1ページで終わる
+    timelines['1'] = {'items': new + old[:5], 'next_cursor': 'page2'}
+    third = make_scraper(updated, checkpoint_path=checkpoint_path)
+    assert asyncio.run(third.get_user_tweets('main', 10)) == []
+    assert third.client.calls['get_user_tweets'] == 1
@@ -0,0 +1,66 @@
+# test_timeseries.py
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from timeseries import TimeSeriesQuery, lttb
+from tweet_store import TweetStore
+
+
+def _store(tmp_path, utc_offset_hours):
+    store = TweetStore(str(tmp_path / 'tweets.db'), utc_offset_hours=utc_offset_hours)
+    # 2024-03-04（月曜日）23:30（ストアのタイムゾーン）の投稿
+    tz = timezone(timedelta(hours=utc_offset_hours))
+    created_at = datetime(2024, 3, 4, 23, 30, tzinfo=tz).isoformat()
+    store.add_tweets([{'id': '1', 'username': 'main', 'created_at': created_at, 'metrics': {'favorite_count': 7}}])
+    return store
+
+
+def test_lttb_keeps_endpoints_and_point_count():
+    values = [(i * 37) % 11 for i in range(500)]
+    selected = lttb(values, 50)
+
+    assert len(selected) == 50
+    assert selected[0] == 0 and selected[-1] == len(values) - 1
+    assert selected == sorted(set(selected))
+    assert lttb(values, 600) == list(range(500))
+
+
+def test_query_downsamples_to_max_points(tmp_path):
+    store = _store(tmp_path, 9)
+    result = TimeSeriesQuery(store).query(start='2024-01-01', end='2024-03-31', granularity='hour', max_points=100)
+    store.close()
+
+    assert result['downsampled']
+    assert len(result['points']) == 100
+    assert result['points'][0]['timestamp'] == result['start']
+    assert result['points'][-1]['timestamp'] == result['end'] - 3600
+
+
+@pytest.mark.parametrize('utc_offset_hours', [9, 0, -5])
+@pytest.mark.parametrize('granularity, date', [
+    ('hour', '2024-03-04 23:00'),
+    ('day', '2024-03-04'),
+    ('week', '2024-03-04'),
+])
+def test_buckets_align_to_store_timezone(tmp_path, utc_offset_hours, granularity, date):
+    store = _store(tmp_path, utc_offset_hours)
+    result = TimeSeriesQuery(store).query(start='2024-03-01', end='2024-03-10', granularity=granularity)
+    store.close()
+
+    points = [point for point in result['points'] if point['likes']]
+    assert [point['date'] for point in points] == [date]
+    assert points[0]['likes'] == 7
+
+
+def test_date_only_end_is_inclusive(tmp_path):
+    store = _store(tmp_path, 9)
+    query = TimeSeriesQuery(store)
+    by_date = query.query(start='2024-03-01', end='2024-03-04', granularity='day')
+    by_time = query.query(start='2024-03-01', end='2024-03-04T00:00:00+09:00', granularity='day')
+    store.close()
+
+    assert [point['date'] for point in by_date['points']][-1] == '2024-03-04'
+    assert by_date['points'][-1]['likes'] == 7
+    assert by_time['buckets'] == 3
+    assert sum(point['likes'] for point in by_time['points']) == 0
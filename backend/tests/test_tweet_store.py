@@ -0,0 +1,40 @@
+# test_tweet_store.py
+import asyncio
+import copy
+
+from replay_client import build_synthetic_fixtures
+
+
+def test_repoll_applies_only_engagement_deltas_to_rollups(make_scraper, tmp_path):
+    fixtures = build_synthetic_fixtures(('main',), followers_per_user=0, tweets_per_user=5)
+    store_path = str(tmp_path / 'tweets.db')
+
+    first = make_scraper(fixtures, store_path=store_path)
+    asyncio.run(first.get_user_tweets('main', 5))
+    before = first.store.overview('main')
+    first.store.close()
+    first.store = None
+
+    updated = copy.deepcopy(fixtures)
+    for tweet in updated['responses']['get_user_tweets']['1']['items']:
+        tweet['favorite_count'] += 10
+        tweet['retweet_count'] += 2
+
+    second = make_scraper(updated, store_path=store_path)
+    asyncio.run(second.get_user_tweets('main', 5))
+    store = second.store
+
+    after = store.overview('main')
+    assert after['tweets'] == before['tweets'] == 5
+    assert after['likes'] == before['likes'] + 50
+    assert after['retweets'] == before['retweets'] + 10
+    assert store.overview() == after
+
+    daily = store.daily_series('main')
+    assert sum(day['likes'] for day in daily) == after['likes']
+    assert sum(day['tweets'] for day in daily) == 5
+
+    hourly = store.conn.execute(
+        "SELECT SUM(tweets), SUM(likes) FROM hourly_rollups WHERE username = 'main'"
+    ).fetchone()
+    assert tuple(hourly) == (5, after['likes'])
@@ -0,0 +1,99 @@
+# test_user_cache.py
+import pytest
+
+from user_cache import UserCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr('user_cache.time.time', clock)
+    return clock
+
+
+def _profile(user_id, username):
+    return {'id': user_id, 'username': username, 'followers_count': 1}
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = UserCache(':memory:', id_ttl=100, profile_ttl=10)
+    cache.put_profile(_profile('1', 'alice'))
+
+    clock.now += 10
+    assert cache.get_profile_by_screen_name('ALICE')['id'] == '1'
+    clock.now += 1
+    assert cache.get_profile('1') is None
+    assert cache.get_user_id('alice') == '1'
+    clock.now += 90
+    assert cache.get_user_id('alice') is None
+
+    cache.purge_expired()
+    assert cache.conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0] == 0
+    cache.close()
+
+
+def test_least_recently_accessed_entries_are_evicted(clock):
+    cache = UserCache(':memory:', max_entries=2)
+    cache.put_profile(_profile('1', 'alice'))
+    clock.now += 1
+    cache.put_profile(_profile('2', 'bob'))
+    clock.now += 1
+    # alice を読んだので、最終アクセスが最も古いのは bob
+    assert cache.get_profile_by_screen_name('alice') is not None
+    clock.now += 1
+    cache.put_profile(_profile('3', 'carol'))
+
+    assert cache.get_profile('2') is None and cache.get_user_id('bob') is None
+    assert cache.get_profile('1') is not None and cache.get_profile('3') is not None
+    cache.close()
+
+
+def test_updating_an_existing_key_does_not_evict(clock):
+    cache = UserCache(':memory:', max_entries=2)
+    cache.put_profile(_profile('1', 'alice'))
+    cache.put_profile(_profile('2', 'bob'))
+    for _ in range(3):
+        clock.now += 1
+        cache.put_profile(_profile('2', 'Bob'))
+
+    assert cache.counts == {'screen_names': 2, 'profiles': 2}
+    assert cache.get_profile('1') is not None
+    assert cache.conn.execute("SELECT screen_name FROM screen_names WHERE user_id = '2'").fetchone()[0] == 'Bob'
+    cache.close()
+
+
+def test_access_times_are_saved_in_batches(tmp_path, clock):
+    path = str(tmp_path / 'user_cache.db')
+    cache = UserCache(path, commit_every=3, commit_interval=3600)
+    for i, username in enumerate(['alice', 'bob', 'carol']):
+        cache.put_user_id(username, str(i))
+    other = UserCache(path)
+
+    def last_access(username):
+        return other.conn.execute(
+            "SELECT last_access FROM screen_names WHERE screen_name = ?", (username,)
+        ).fetchone()[0]
+
+    clock.now += 10
+    cache.get_user_id('alice')
+    cache.get_user_id('bob')
+    # 保存済みのエントリは他の接続からもすぐに読める
+    assert other.get_user_id('carol') == '2'
+    assert last_access('alice') == clock.now - 10
+    cache.get_user_id('carol')
+    assert last_access('alice') == clock.now
+
+    clock.now += 10
+    cache.get_user_id('alice')
+    cache.close()
+    assert last_access('alice') == clock.now
+    assert UserCache(path).counts['screen_names'] == 3
+    other.close()
@@ -0,0 +1,59 @@
+# test_velocity.py
+import asyncio
+
+from replay_client import build_synthetic_fixtures
+from velocity import VelocityTracker
+
+
+def test_tracker_prunes_stale_histories():
+    tracker = VelocityTracker(max_age=3600, prune_interval=60)
+    tracker.last_prune = 0
+    tracker.record_tweets([{'id': '1', 'metrics': {'favorite_count': 1}}], timestamp=1000)
+    tracker.record_tweets([{'id': '2', 'metrics': {'favorite_count': 1}}], timestamp=5000)
+
+    assert tracker.tracked_ids() == ['2']
+
+
+def test_recent_ids_orders_by_last_snapshot():
+    tracker = VelocityTracker(max_age=None)
+    for i, timestamp in enumerate([300, 100, 200]):
+        tracker.record(str(i), {'favorite_count': 1}, timestamp)
+
+    assert tracker.recent_ids(2) == ['0', '2']
+
+
+def test_rising_repoll_is_bounded(make_scraper):
+    fixtures = build_synthetic_fixtures(('main',), followers_per_user=1, tweets_per_user=30)
+    for tweet in fixtures['responses']['get_user_tweets']['1']['items']:
+        fixtures['responses']['get_tweet_by_id'][tweet['id']] = tweet
+    scraper = make_scraper(fixtures)
+
+    asyncio.run(scraper.get_user_tweets('main', 30))
+    asyncio.run(scraper.get_rising_tweets(repoll=True, max_repoll=5))
+
+    assert scraper.client.calls['get_tweet_by_id'] == 5
+
+
+def test_save_drops_pruned_histories(tmp_path):
+    path = str(tmp_path / 'velocity.db')
+    tracker = VelocityTracker(max_age=3600, prune_interval=60)
+    tracker.last_prune = 0
+    tracker.record_tweets([{'id': '1', 'metrics': {'favorite_count': 1}}], timestamp=1000)
+    tracker.save(path)
+    tracker.record_tweets([{'id': '2', 'metrics': {'favorite_count': 1}}], timestamp=5000)
+    tracker.save(path)
+
+    loaded = VelocityTracker(max_age=None)
+    assert loaded.load(path) == 1
+    assert loaded.tracked_ids() == ['2']
+
+
+def test_run_jobs_saves_velocity(make_scraper, tmp_path):
+    from cli import run_jobs
+
+    path = str(tmp_path / 'velocity.db')
+    fixtures = build_synthetic_fixtures(('main',), followers_per_user=1, tweets_per_user=5)
+    scraper = make_scraper(fixtures, velocity_path=path)
+    asyncio.run(run_jobs(scraper, [{'type': 'user_tweets', 'params': {'username': 'main', 'count': 5}}]))
+
+    assert VelocityTracker(max_age=None).load(path) == 5
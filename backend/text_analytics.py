@@ -0,0 +1,248 @@
+# text_analytics.py
+# 蓄積したツイートの本文を集計する（python text_analytics.py tweets.db --help）
+import argparse
+import json
+import os
+import re
+import sqlite3
+import unicodedata
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+
+from timeutil import parse_created_at
+
+_HASHTAG_RE = re.compile(r'[#＃](\w+)')
+_MENTION_RE = re.compile(r'@(\w{1,15})')
+_URL_RE = re.compile(r'https?://[^\s<>"]+')
+# 日本語は単語の区切りが無いので、カタカナ・漢字の連続と英数字の単語をキーワードとみなす
+_KEYWORD_RE = re.compile(r'[ァ-ヴー]{2,}|[一-龯々〆ヵヶ]{2,}|[a-z][a-z0-9_]{2,}')
+
+STOPWORDS = frozenset({
+    'the', 'and', 'for', 'you', 'this', 'that', 'with', 'are', 'was', 'have', 'not', 'but',
+    'rt', 'amp', 'http', 'https', 'www', 'com',
+})
+
+
+def _empty_partial():
+    return {
+        'tweets': 0,
+        'hashtags': Counter(),
+        'mentions': Counter(),
+        'domains': Counter(),
+        'keywords': Counter(),
+        'hours': [0] * 24,
+        'keyword_buzz': {},
+    }
+
+
+def extract_keywords(text):
+    """
+    本文からキーワード（カタカナ語・漢字語・英単語）を抽出
+
+    URL・メンション・ハッシュタグは除いてから抽出し、1ツイート内の重複は1回と数える。
+    """
+    text = _URL_RE.sub(' ', text)
+    text = _MENTION_RE.sub(' ', text)
+    text = _HASHTAG_RE.sub(' ', text)
+    return {word for word in _KEYWORD_RE.findall(text) if word not in STOPWORDS}
+
+
+def analyze_chunk(rows, utc_offset_hours=9):
+    """
+    ツイートの一部を集計（プロセスプールの各ワーカーで実行）
+
+    Args:
+        rows (list): (本文, 投稿時刻, バズ度) のタプルのリスト
+        utc_offset_hours (int): 投稿時間帯の集計に使うタイムゾーン（9なら日本時間）
+
+    Returns:
+        dict: 部分集計（merge_partials でまとめる）
+    """
+    tz = timezone(timedelta(hours=utc_offset_hours))
+    partial = _empty_partial()
+    keyword_buzz = partial['keyword_buzz']
+
+    for text, created_at, buzz_score in rows:
+        partial['tweets'] += 1
+        text = unicodedata.normalize('NFKC', text or '').lower()
+
+        partial['hashtags'].update(set(_HASHTAG_RE.findall(text)))
+        partial['mentions'].update(set(_MENTION_RE.findall(text)))
+        partial['domains'].update({url.split('/')[2] for url in _URL_RE.findall(text)})
+
+        keywords = extract_keywords(text)
+        partial['keywords'].update(keywords)
+        for keyword in keywords:
+            total = keyword_buzz.get(keyword)
+            if total is None:
+                keyword_buzz[keyword] = [buzz_score or 0, 1]
+            else:
+                total[0] += buzz_score or 0
+                total[1] += 1
+
+        timestamp = parse_created_at(created_at)
+        if timestamp is not None:
+            partial['hours'][datetime.fromtimestamp(timestamp, tz).hour] += 1
+
+    return partial
+
+
+def merge_partials(total, partial):
+    """部分集計 partial を total に足し込む"""
+    total['tweets'] += partial['tweets']
+    for key in ('hashtags', 'mentions', 'domains', 'keywords'):
+        total[key].update(partial[key])
+    total['hours'] = [a + b for a, b in zip(total['hours'], partial['hours'])]
+    keyword_buzz = total['keyword_buzz']
+    for keyword, (buzz, count) in partial['keyword_buzz'].items():
+        current = keyword_buzz.get(keyword)
+        if current is None:
+            keyword_buzz[keyword] = [buzz, count]
+        else:
+            current[0] += buzz
+            current[1] += count
+    return total
+
+
+def summarize(total, top=30, min_keyword_count=5):
+    """
+    集計結果をダッシュボード用の形式にする
+
+    Args:
+        total (dict): merge_partials でまとめた集計
+        top (int): 各ランキングの件数
+        min_keyword_count (int): 平均バズ度のランキングに入れる最低出現数
+    """
+    def ranking(counter):
+        return [{'name': name, 'count': count} for name, count in counter.most_common(top)]
+
+    keyword_buzz = [
+        {'keyword': keyword, 'count': count, 'avg_buzz': buzz / count}
+        for keyword, (buzz, count) in total['keyword_buzz'].items()
+        if count >= min_keyword_count
+    ]
+    keyword_buzz.sort(key=lambda k: (k['avg_buzz'], k['count']), reverse=True)
+
+    return {
+        'tweets': total['tweets'],
+        'hashtags': ranking(total['hashtags']),
+        'mentions': ranking(total['mentions']),
+        'domains': ranking(total['domains']),
+        'keywords': ranking(total['keywords']),
+        'hours': [{'hour': hour, 'tweets': count} for hour, count in enumerate(total['hours'])],
+        'keywordBuzz': keyword_buzz[:top],
+    }
+
+
+def iter_chunks(rows, chunk_size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def analyze_rows(rows, workers=None, chunk_size=5000, utc_offset_hours=9):
+    """
+    (本文, 投稿時刻, バズ度) の列を集計
+
+    chunk_size 件ずつプロセスプールに渡し、終わったものから部分集計をまとめる。
+    同時に渡すのはワーカー数の2倍までなので、件数が多くてもメモリは一定。
+
+    Args:
+        rows: (本文, 投稿時刻, バズ度) のタプルのイテラブル
+        workers (int): プロセス数（省略時はCPU数、1ならプールを使わない）
+        chunk_size (int): 1回にワーカーへ渡す件数
+        utc_offset_hours (int): 投稿時間帯の集計に使うタイムゾーン
+
+    Returns:
+        dict: merge_partials でまとめた集計（summarize でランキングにする）
+    """
+    workers = workers or os.cpu_count() or 1
+    total = _empty_partial()
+
+    if workers == 1:
+        for chunk in iter_chunks(rows, chunk_size):
+            merge_partials(total, analyze_chunk(chunk, utc_offset_hours))
+        return total
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for chunk in iter_chunks(rows, chunk_size):
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    merge_partials(total, future.result())
+            pending.add(pool.submit(analyze_chunk, chunk, utc_offset_hours))
+        for future in pending:
+            merge_partials(total, future.result())
+    return total
+
+
+def iter_store_rows(path, username=None, since=None, batch_size=5000):
+    """
+    TweetStore のSQLiteファイルから (本文, 投稿時刻, バズ度) を順に読む
+
+    JSONの復元を避けるため tweets テーブルの列を直接読む。
+    接続はここで開くので、別スレッドから呼んでもよい。
+
+    Args:
+        path (str): TweetStore のパス
+        username (str): 投稿者で絞り込む
+        since (float): この時刻（UNIX時刻）以降の投稿のみ
+    """
+    conn = sqlite3.connect(path)
+    try:
+        query = "SELECT text, created_at, buzz_score FROM tweets WHERE 1 = 1"
+        params = []
+        if username:
+            query += " AND username = ?"
+            params.append(username)
+        if since is not None:
+            query += " AND created_at >= ?"
+            params.append(since)
+        cursor = conn.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield from rows
+    finally:
+        conn.close()
+
+
+def analyze_store(path, username=None, since=None, top=30, workers=None, chunk_size=5000,
+                  utc_offset_hours=9, min_keyword_count=5):
+    """
+    ツイートストアの本文を集計してダッシュボード用の形式で返す
+
+    Returns:
+        dict: 'tweets', 'hashtags', 'mentions', 'domains', 'keywords', 'hours', 'keywordBuzz'
+    """
+    total = analyze_rows(
+        iter_store_rows(path, username, since, chunk_size), workers, chunk_size, utc_offset_hours
+    )
+    return summarize(total, top, min_keyword_count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='蓄積したツイートの本文を集計')
+    parser.add_argument('store', nargs='?', default='tweets.db', help='ツイートストアのパス')
+    parser.add_argument('--username', help='投稿者で絞り込む')
+    parser.add_argument('--days', type=float, help='直近何日分を対象にするか')
+    parser.add_argument('--top', type=int, default=30)
+    parser.add_argument('--workers', type=int, help='プロセス数（省略時はCPU数）')
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    since = datetime.now().timestamp() - args.days * 86400 if args.days else None
+    result = analyze_store(args.store, args.username, since, args.top, args.workers, args.chunk_size)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# text_search.py
+import re
+import unicodedata
+
+# 語末を表す記号（1文字の検索語を「その文字で始まる2-gram」の範囲検索で引けるようにする）
+END = '\x00'
+
+_QUERY_TOKEN_RE = re.compile(r'(-?)"([^"]*)"|(\S+)')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize(text):
+    """検索用の正規化（NFKC → 小文字化 → 空白を1つに詰める）"""
+    return _SPACE_RE.sub(' ', unicodedata.normalize('NFKC', text or '').lower()).strip()
+
+
+def term_grams(term):
+    """
+    検索語（空白を含まない）の文字2-gram
+
+    1文字の語は2-gramを作れないので空集合を返す（prefix_gram で範囲検索する）。
+    """
+    return {term[i:i + 2] for i in range(len(term) - 1)}
+
+
+def text_grams(text):
+    """
+    索引に登録する文字2-gram
+
+    日本語は単語の区切りが無いので空白で分割した語ごとに2-gramを作り、
+    語の最後の文字には END を付けた2-gramも登録する（1文字の検索語用）。
+    """
+    grams = set()
+    for word in normalize(text).split(' '):
+        if word:
+            grams.update(term_grams(word))
+            grams.add(word[-1] + END)
+    return grams
+
+
+def prefix_range(char):
+    """1文字の検索語に一致する2-gramの範囲 [char, 次の文字)"""
+    return char, chr(ord(char) + 1)
+
+
+class Query:
+    def __init__(self, groups, excluded):
+        """
+        解析済みの検索クエリ
+
+        Args:
+            groups (list): ORでつないだ語のリスト。すべてのグループを満たすものが一致（AND）
+            excluded (list): 含んではいけない語
+        """
+        self.groups = groups
+        self.excluded = excluded
+
+    def matches(self, text):
+        """正規化済みのテキストがクエリに一致するか（2-gramで絞り込んだ候補の最終確認）"""
+        return (
+            all(any(term in text for term in group) for group in self.groups)
+            and not any(term in text for term in self.excluded)
+        )
+
+    def __bool__(self):
+        return bool(self.groups)
+
+
+def parse_query(query):
+    """
+    検索クエリを解析
+
+    - 空白区切りの語はすべて含むもの（AND）
+    - "..." は空白も含めてその並びのまま一致（フレーズ）
+    - 語の間の OR はどちらかを含むもの
+    - 先頭に - を付けた語・フレーズは含まないもの
+
+    例: 'ラーメン OR うどん -"期間限定" 東京'
+
+    Returns:
+        Query: 解析結果
+    """
+    groups = []
+    excluded = []
+    pending_or = False
+    for match in _QUERY_TOKEN_RE.finditer(query or ''):
+        negate, phrase, word = match.groups()
+        if word == 'OR':
+            pending_or = bool(groups)
+            continue
+        if phrase is None:
+            negate = word.startswith('-') and len(word) > 1
+            term = word[1:] if negate else word
+        else:
+            term = phrase
+        term = normalize(term)
+        if not term:
+            continue
+        if negate:
+            excluded.append(term)
+        elif pending_or:
+            groups[-1].append(term)
+        else:
+            groups.append([term])
+        pending_or = False
+    return Query(groups, excluded)
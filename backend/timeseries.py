@@ -0,0 +1,180 @@
+# timeseries.py
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from timeutil import parse_created_at
+
+# 粒度ごとのバケットの秒数
+GRANULARITIES = {'hour': 3600, 'day': 86400, 'week': 7 * 86400}
+
+# 範囲を省略したときの期間
+DEFAULT_SPANS = {'hour': 7 * 86400, 'day': 30 * 86400, 'week': 365 * 86400}
+
+# UNIX時刻0（1970-01-01）は木曜日なので、週の境界を月曜日に合わせるためのずれ
+_WEEK_SHIFT = 3 * 86400
+
+SERIES_FIELDS = ('tweets', 'likes', 'retweets', 'replies', 'quotes')
+
+
+def lttb(values, threshold):
+    """
+    Largest-Triangle-Three-Buckets で残す点の番号を選ぶ
+
+    最初と最後の点は必ず残し、間を threshold - 2 個の区間に分けて、
+    前に選んだ点と次の区間の平均とで作る三角形が最大になる点を各区間から1つ選ぶ。
+
+    Args:
+        values (list): 等間隔に並んだ値
+        threshold (int): 残す点の数
+
+    Returns:
+        list: 残す点の番号（昇順）
+    """
+    n = len(values)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        # 次の区間の平均（三角形の3点目）
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = (next_start + next_end - 1) / 2
+        avg_y = sum(values[next_start:next_end]) / (next_end - next_start)
+
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((a - avg_x) * (values[j] - values[a]) - (a - j) * (avg_y - values[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return selected
+
+
+class TimeSeriesQuery:
+    def __init__(self, store, max_entries=256):
+        """
+        ダッシュボードのグラフ用の時系列（任意の期間・粒度・ユーザーの組み合わせ）
+
+        TweetStore の時間別集計（hourly_rollups）を粒度ごとにまとめ、
+        点が多すぎる場合は LTTB で間引く。結果は条件ごとにキャッシュし、
+        ストアに書き込みがあったら（store.version が変わったら）作り直す。
+
+        Args:
+            store (TweetStore): ツイートストア
+            max_entries (int): キャッシュする結果の数
+        """
+        self.store = store
+        self.max_entries = max_entries
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _parse_time(self, value, end=False):
+        """
+        'YYYY-MM-DD'（ストアのタイムゾーンの0時）・ISO 8601・UNIX時刻を UNIX時刻に変換
+
+        end=True のとき、日付だけの指定はその日を含めるため翌日の0時にする。
+        """
+        if value is None or value == '':
+            return None
+        if isinstance(value, str):
+            if value.replace('.', '', 1).isdigit():
+                return float(value)
+            if len(value) == 10:
+                date = datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=self.store.tz)
+                return (date + timedelta(days=1) if end else date).timestamp()
+        timestamp = parse_created_at(value)
+        if timestamp is None:
+            raise ValueError(f"日時を解釈できません: {value}")
+        return timestamp
+
+    def _offset(self, granularity):
+        offset = int(self.store.tz.utcoffset(None).total_seconds())
+        return offset + _WEEK_SHIFT if granularity == 'week' else offset
+
+    def _label(self, timestamp, granularity):
+        local = datetime.fromtimestamp(timestamp, self.store.tz)
+        return local.strftime('%Y-%m-%d %H:00' if granularity == 'hour' else '%Y-%m-%d')
+
+    def query(self, usernames=None, start=None, end=None, granularity='day', max_points=None, metric='likes'):
+        """
+        時系列を取得
+
+        Args:
+            usernames (list): 対象ユーザー（省略時は全体。複数なら合計）
+            start, end: 範囲（'YYYY-MM-DD'・ISO 8601・UNIX時刻。省略時は直近）。
+                end は日時の指定ならその時刻を含まず、日付だけの指定ならその日の終わりまで含む
+            granularity (str): 'hour', 'day', 'week'
+            max_points (int): 点の最大数（超えたら LTTB で間引く）
+            metric (str): 間引くときに形を保つ指標（SERIES_FIELDS のいずれか）
+
+        Returns:
+            dict: 'granularity', 'start', 'end', 'buckets'（間引く前の点の数）, 'downsampled',
+                  'points'（{'date', 'timestamp', 'tweets', 'likes', 'retweets', 'replies', 'quotes'} のリスト）
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity は {', '.join(GRANULARITIES)} のいずれかです")
+        if metric not in SERIES_FIELDS:
+            raise ValueError(f"metric は {', '.join(SERIES_FIELDS)} のいずれかです")
+
+        bucket = GRANULARITIES[granularity]
+        offset = self._offset(granularity)
+        end = self._parse_time(end, end=True)
+        if end is None:
+            end = time.time()
+        start = self._parse_time(start)
+        if start is None:
+            start = end - DEFAULT_SPANS[granularity]
+        # バケットの境界に揃える（end はそのバケットの終わりまで含める）
+        start = int(start + offset) // bucket * bucket - offset
+        end = -(-int(end + offset) // bucket) * bucket - offset
+
+        usernames = tuple(sorted(set(usernames))) if usernames else ()
+        key = (usernames, start, end, granularity, max_points, metric)
+        cached = self.cache.get(key)
+        if cached is not None and cached[0] == self.store.version:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+
+        rows = {
+            row[0]: row[1:]
+            for row in self.store.hourly_series(usernames, start, end, bucket, offset)
+        }
+        empty = (0,) * len(SERIES_FIELDS)
+        timestamps = range(start, end, bucket)
+        series = [rows.get(timestamp, empty) for timestamp in timestamps]
+        buckets = len(series)
+        indices = range(buckets)
+        if max_points and buckets > max_points:
+            column = SERIES_FIELDS.index(metric)
+            indices = lttb([values[column] for values in series], max_points)
+
+        # 日付の文字列は間引いた後の点だけ作る
+        points = []
+        for i in indices:
+            point = {'date': self._label(timestamps[i], granularity), 'timestamp': timestamps[i]}
+            point.update(zip(SERIES_FIELDS, series[i]))
+            points.append(point)
+
+        result = {
+            'granularity': granularity,
+            'start': start,
+            'end': end,
+            'buckets': buckets,
+            'downsampled': len(points) < buckets,
+            'points': points,
+        }
+        self.cache[key] = (self.store.version, result)
+        if len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+        return result
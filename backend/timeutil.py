@@ -0,0 +1,38 @@
+# timeutil.py
+from datetime import datetime, timezone
+
+# twikitの created_at 形式（例: 'Wed Oct 10 20:19:24 +0000 2018'）
+TWITTER_TIME_FORMAT = '%a %b %d %H:%M:%S %z %Y'
+
+
+def parse_created_at(value):
+    """
+    created_at をUNIX時刻（秒）に変換
+
+    Args:
+        value: twikit形式の文字列、ISO 8601文字列、datetime、数値のいずれか
+
+    Returns:
+        float: UNIX時刻（解釈できない場合はNone）
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+
+    text = str(value)
+    try:
+        return datetime.strptime(text, TWITTER_TIME_FORMAT).timestamp()
+    except ValueError:
+        pass
+    try:
+        parsed = datetime.fromisoformat(text.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
@@ -0,0 +1,532 @@
+# tweet_store.py
+import json
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+
+from records import json_default
+from text_search import normalize, parse_query, prefix_range, term_grams, text_grams
+from timeutil import parse_created_at
+
+# 全ユーザー合計の集計行に使うキー
+ALL_USERS = '*'
+
+# 検索の候補をIN句で引く最大数（超えたら buzz_score インデックスを順に読む）
+_MAX_IN_IDS = 500
+
+# 再スコアリング用の列（投稿者のフォロワー数だけJSONから取り出す）
+_ENGAGEMENT_QUERY = (
+    "SELECT id, username, retweet_count, favorite_count, reply_count, quote_count, "
+    "json_extract(data, '$.user.followers_count') AS followers FROM tweets"
+)
+
+
+class TweetStore:
+    def __init__(self, path='tweets.db', utc_offset_hours=9):
+        """
+        収集したツイートとプロフィールのローカルストア（SQLite）
+
+        ツイートID・(ユーザー, 投稿時刻) で索引を張り、挿入のたびに
+        ユーザー別の日次集計と累計を差分更新する。ダッシュボードの
+        概要・時系列・人気投稿は集計テーブルとインデックスから直接読める。
+        本文は文字2-gramの転置インデックスにも登録し、search() で検索できる。
+        時間別の集計（hourly_rollups）も差分更新し、任意の期間・粒度の時系列は
+        timeseries.TimeSeriesQuery からこの集計を読んで作る。
+
+        Args:
+            path (str): SQLiteファイルのパス
+            utc_offset_hours (int): 日次集計の日付境界（9なら日本時間）
+        """
+        self.path = path
+        self.tz = timezone(timedelta(hours=utc_offset_hours))
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        tables = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        # 書き込みのたびに増える番号（集計結果のキャッシュの無効化に使う）
+        self.version = 0
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tweets (
+                id INTEGER PRIMARY KEY,
+                user_id TEXT,
+                username TEXT NOT NULL,
+                created_at REAL,
+                day TEXT NOT NULL,
+                text TEXT,
+                retweet_count INTEGER NOT NULL DEFAULT 0,
+                favorite_count INTEGER NOT NULL DEFAULT 0,
+                reply_count INTEGER NOT NULL DEFAULT 0,
+                quote_count INTEGER NOT NULL DEFAULT 0,
+                buzz_score REAL NOT NULL DEFAULT 0,
+                data TEXT NOT NULL,
+                stored_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_tweets_user_time ON tweets(username, created_at);
+            CREATE INDEX IF NOT EXISTS idx_tweets_buzz ON tweets(buzz_score DESC);
+            CREATE INDEX IF NOT EXISTS idx_tweets_user_buzz ON tweets(username, buzz_score DESC);
+
+            CREATE TABLE IF NOT EXISTS profiles (
+                user_id TEXT PRIMARY KEY,
+                username TEXT,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_profiles_username ON profiles(username);
+
+            CREATE TABLE IF NOT EXISTS daily_rollups (
+                username TEXT NOT NULL,
+                day TEXT NOT NULL,
+                tweets INTEGER NOT NULL DEFAULT 0,
+                likes INTEGER NOT NULL DEFAULT 0,
+                retweets INTEGER NOT NULL DEFAULT 0,
+                replies INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (username, day)
+            ) WITHOUT ROWID;
+
+            CREATE TABLE IF NOT EXISTS hourly_rollups (
+                username TEXT NOT NULL,
+                hour INTEGER NOT NULL,
+                tweets INTEGER NOT NULL DEFAULT 0,
+                likes INTEGER NOT NULL DEFAULT 0,
+                retweets INTEGER NOT NULL DEFAULT 0,
+                replies INTEGER NOT NULL DEFAULT 0,
+                quotes INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (username, hour)
+            ) WITHOUT ROWID;
+
+            CREATE TABLE IF NOT EXISTS user_totals (
+                username TEXT PRIMARY KEY,
+                tweets INTEGER NOT NULL DEFAULT 0,
+                likes INTEGER NOT NULL DEFAULT 0,
+                retweets INTEGER NOT NULL DEFAULT 0,
+                replies INTEGER NOT NULL DEFAULT 0,
+                quotes INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID;
+
+            CREATE TABLE IF NOT EXISTS tweet_grams (
+                gram TEXT NOT NULL,
+                tweet_id INTEGER NOT NULL,
+                PRIMARY KEY (gram, tweet_id)
+            ) WITHOUT ROWID;
+        """)
+        self.conn.commit()
+        # 検索インデックス・時間別集計が無かった頃のDBは、既存のツイートから作る
+        if 'tweet_grams' not in tables:
+            self.rebuild_search_index()
+        if 'hourly_rollups' not in tables:
+            self.rebuild_hourly_rollups()
+
+    def _day(self, timestamp):
+        return datetime.fromtimestamp(timestamp, self.tz).strftime('%Y-%m-%d')
+
+    def add_tweets(self, records):
+        """
+        正規化したツイートdict（_tweet_to_record の形式）をまとめて保存
+
+        既存ツイートはエンゲージメントを上書きし、集計には差分だけを反映する。
+
+        Returns:
+            int: 新規に追加した件数
+        """
+        added = 0
+        now = time.time()
+        with self.conn:
+            for record in records:
+                added += self._add_tweet(record, now)
+        self.version += 1
+        return added
+
+    def add_tweet(self, record):
+        """ツイートを1件保存（新規ならTrue）"""
+        return self.add_tweets([record]) == 1
+
+    def _add_tweet(self, record, now):
+        metrics = record.get('metrics') or {}
+        counts = (
+            metrics.get('retweet_count') or 0,
+            metrics.get('favorite_count') or 0,
+            metrics.get('reply_count') or 0,
+            metrics.get('quote_count') or 0,
+        )
+        tweet_id = int(record['id'])
+        username = record.get('username') or (record.get('user') or {}).get('username') or ''
+        created_at = parse_created_at(record.get('created_at'))
+        day = self._day(created_at if created_at is not None else now)
+        hour = int(created_at if created_at is not None else now) // 3600 * 3600
+
+        old = self.conn.execute(
+            "SELECT retweet_count, favorite_count, reply_count, quote_count FROM tweets WHERE id = ?",
+            (tweet_id,)
+        ).fetchone()
+
+        self.conn.execute("""
+            INSERT OR REPLACE INTO tweets
+                (id, user_id, username, created_at, day, text, retweet_count, favorite_count,
+                 reply_count, quote_count, buzz_score, data, stored_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+                    COALESCE((SELECT stored_at FROM tweets WHERE id = ?), ?))
+        """, (
+            tweet_id, str(record.get('user_id') or ''), username, created_at, day, record.get('text'),
+            *counts, record.get('buzz_score') or 0,
+            json.dumps(record, ensure_ascii=False, default=json_default), tweet_id, now
+        ))
+
+        if old is None:
+            self._index_text(tweet_id, record.get('text'))
+            delta_tweets = 1
+            deltas = counts
+        else:
+            delta_tweets = 0
+            deltas = tuple(new - prev for new, prev in zip(counts, tuple(old)))
+        retweets, likes, replies, quotes = deltas
+
+        for key in (username, ALL_USERS):
+            self.conn.execute("""
+                INSERT INTO daily_rollups (username, day, tweets, likes, retweets, replies)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(username, day) DO UPDATE SET
+                    tweets = tweets + excluded.tweets,
+                    likes = likes + excluded.likes,
+                    retweets = retweets + excluded.retweets,
+                    replies = replies + excluded.replies
+            """, (key, day, delta_tweets, likes, retweets, replies))
+            self.conn.execute("""
+                INSERT INTO hourly_rollups (username, hour, tweets, likes, retweets, replies, quotes)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(username, hour) DO UPDATE SET
+                    tweets = tweets + excluded.tweets,
+                    likes = likes + excluded.likes,
+                    retweets = retweets + excluded.retweets,
+                    replies = replies + excluded.replies,
+                    quotes = quotes + excluded.quotes
+            """, (key, hour, delta_tweets, likes, retweets, replies, quotes))
+            self.conn.execute("""
+                INSERT INTO user_totals (username, tweets, likes, retweets, replies, quotes)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(username) DO UPDATE SET
+                    tweets = tweets + excluded.tweets,
+                    likes = likes + excluded.likes,
+                    retweets = retweets + excluded.retweets,
+                    replies = replies + excluded.replies,
+                    quotes = quotes + excluded.quotes
+            """, (key, delta_tweets, likes, retweets, replies, quotes))
+
+        return 1 if old is None else 0
+
+    def _index_text(self, tweet_id, text):
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO tweet_grams (gram, tweet_id) VALUES (?, ?)",
+            [(gram, tweet_id) for gram in text_grams(text)]
+        )
+
+    def rebuild_search_index(self):
+        """保存済みの全ツイートから検索インデックスを作り直す"""
+        with self.conn:
+            self.conn.execute("DELETE FROM tweet_grams")
+            for row in self.conn.execute("SELECT id, text FROM tweets").fetchall():
+                self._index_text(row['id'], row['text'])
+
+    def rebuild_hourly_rollups(self):
+        """保存済みの全ツイートから時間別の集計を作り直す"""
+        with self.conn:
+            self.conn.execute("DELETE FROM hourly_rollups")
+            for key_expr in ('username', '?'):
+                self.conn.execute(f"""
+                    INSERT INTO hourly_rollups (username, hour, tweets, likes, retweets, replies, quotes)
+                    SELECT {key_expr}, CAST(COALESCE(created_at, stored_at) AS INTEGER) / 3600 * 3600 AS hour,
+                           COUNT(*), SUM(favorite_count), SUM(retweet_count), SUM(reply_count), SUM(quote_count)
+                    FROM tweets GROUP BY 1, 2
+                """, (ALL_USERS,) if key_expr == '?' else ())
+        self.version += 1
+
+    def hourly_series(self, usernames=None, start=None, end=None, bucket_seconds=3600, offset_seconds=0):
+        """
+        時間別の集計を bucket_seconds ごとにまとめて返す（hourly_rollups の主キーを範囲検索）
+
+        Args:
+            usernames (list): 対象ユーザー（省略時は全体。複数なら合計）
+            start, end (float): 範囲（UNIX時刻、end は含まない）
+            bucket_seconds (int): まとめる秒数（3600の倍数）
+            offset_seconds (int): バケットの境界をずらす秒数（日の境界をタイムゾーンに合わせる用）
+
+        Returns:
+            list: (バケットの開始時刻, tweets, likes, retweets, replies, quotes) のタプル（古い順）
+        """
+        keys = list(usernames) if usernames else [ALL_USERS]
+        query = f"""
+            SELECT (hour + ?) / ? * ? - ? AS bucket,
+                   SUM(tweets), SUM(likes), SUM(retweets), SUM(replies), SUM(quotes)
+            FROM hourly_rollups WHERE username IN ({','.join('?' * len(keys))})
+        """
+        params = [offset_seconds, bucket_seconds, bucket_seconds, offset_seconds, *keys]
+        if start is not None:
+            query += " AND hour >= ?"
+            params.append(int(start) // 3600 * 3600)
+        if end is not None:
+            query += " AND hour < ?"
+            params.append(end)
+        query += " GROUP BY bucket ORDER BY bucket"
+        return [tuple(row) for row in self.conn.execute(query, params)]
+
+    def add_profile(self, profile):
+        """プロフィール（get_user_info の形式）を保存"""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO profiles (user_id, username, data, updated_at) VALUES (?, ?, ?, ?)",
+                (str(profile['id']), profile.get('username'),
+                 json.dumps(profile, ensure_ascii=False, default=str), time.time())
+            )
+
+    def get_profile(self, username):
+        row = self.conn.execute(
+            "SELECT data FROM profiles WHERE username = ? ORDER BY updated_at DESC LIMIT 1", (username,)
+        ).fetchone()
+        return json.loads(row['data']) if row else None
+
+    def get_tweet(self, tweet_id):
+        row = self.conn.execute("SELECT data FROM tweets WHERE id = ?", (int(tweet_id),)).fetchone()
+        return json.loads(row['data']) if row else None
+
+    def user_tweets(self, username, since=None, until=None, limit=None):
+        """
+        ユーザーのツイートを新しい順に取得（(username, created_at) インデックスを使用）
+
+        Args:
+            username (str): ユーザー名
+            since, until (float): 投稿時刻の範囲（UNIX時刻）
+            limit (int): 最大件数
+        """
+        query = "SELECT data FROM tweets WHERE username = ?"
+        params = [username]
+        if since is not None:
+            query += " AND created_at >= ?"
+            params.append(since)
+        if until is not None:
+            query += " AND created_at < ?"
+            params.append(until)
+        query += " ORDER BY created_at DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [json.loads(row['data']) for row in self.conn.execute(query, params)]
+
+    def iter_tweets(self, batch_size=1000):
+        """保存済みの全ツイートを順に返す（ジェネレーター）"""
+        cursor = self.conn.execute("SELECT data FROM tweets ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for row in rows:
+                yield json.loads(row['data'])
+
+    def _engagement_rows(self, query, params):
+        for row in self.conn.execute(query, params):
+            yield {
+                'id': row['id'],
+                'username': row['username'],
+                'metrics': {
+                    'retweet_count': row['retweet_count'],
+                    'favorite_count': row['favorite_count'],
+                    'reply_count': row['reply_count'],
+                    'quote_count': row['quote_count'],
+                },
+                'user': {'followers_count': row['followers']},
+            }
+
+    def iter_engagement(self, username=None):
+        """
+        再スコアリング用にツイートのエンゲージメントを読む（JSONの復元なし）
+
+        Returns:
+            ジェネレーター: {'id', 'username', 'metrics', 'user': {'followers_count'}}
+        """
+        if username:
+            return self._engagement_rows(_ENGAGEMENT_QUERY + " WHERE username = ?", (username,))
+        return self._engagement_rows(_ENGAGEMENT_QUERY, ())
+
+    def recent_engagement(self, username, limit=50):
+        """ユーザーの新しい順 limit 件のエンゲージメント（scoring.ZScoreScorer の loader 用）"""
+        return list(self._engagement_rows(
+            _ENGAGEMENT_QUERY + " WHERE username = ? ORDER BY created_at DESC LIMIT ?",
+            (username, limit)
+        ))
+
+    def update_scores(self, scores):
+        """
+        バズ度を書き換える（scoring.rescore_store 用）
+
+        Args:
+            scores: (バズ度, ツイートID) のイテラブル
+        """
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE tweets SET buzz_score = ?1, data = json_set(data, '$.buzz_score', ?1) WHERE id = ?2",
+                scores
+            )
+        self.version += 1
+
+    def _word_ids(self, word):
+        """語の2-gramをすべて含むツイートIDの集合"""
+        grams = term_grams(word)
+        if not grams:
+            rows = self.conn.execute(
+                "SELECT DISTINCT tweet_id FROM tweet_grams WHERE gram >= ? AND gram < ?", prefix_range(word)
+            )
+        else:
+            placeholders = ','.join('?' * len(grams))
+            rows = self.conn.execute(
+                f"SELECT tweet_id FROM tweet_grams WHERE gram IN ({placeholders}) "
+                "GROUP BY tweet_id HAVING COUNT(*) = ?",
+                (*grams, len(grams))
+            )
+        return {row[0] for row in rows}
+
+    def _term_ids(self, term):
+        """語・フレーズの候補ツイートID（2-gramでの絞り込みなので最終確認は Query.matches）"""
+        ids = None
+        for word in term.split(' '):
+            word_ids = self._word_ids(word)
+            ids = word_ids if ids is None else ids & word_ids
+            if not ids:
+                break
+        return ids or set()
+
+    def search(self, query, limit=20, username=None):
+        """
+        保存済みツイートの全文検索（バズ度の高い順）
+
+        文字2-gramの転置インデックスで候補を絞り、本文で最終確認する。
+        クエリの書き方は text_search.parse_query を参照。
+
+        Args:
+            query (str): 検索クエリ（例: 'ラーメン OR うどん -"期間限定"'）
+            limit (int): 最大件数
+            username (str): 投稿者で絞り込む
+
+        Returns:
+            list: 正規化したツイートdict（search_tweets と同じ形式）
+        """
+        parsed = parse_query(query)
+        if not parsed:
+            return []
+
+        candidates = None
+        # 候補の少ない（長い語の）グループから絞り込む
+        for group in sorted(parsed.groups, key=lambda g: -min(len(t) for t in g)):
+            group_ids = set()
+            for term in group:
+                group_ids |= self._term_ids(term)
+            candidates = group_ids if candidates is None else candidates & group_ids
+            if not candidates:
+                return []
+
+        results = []
+        for row in self._rows_by_buzz(candidates, username):
+            if row['id'] in candidates and parsed.matches(normalize(row['text'])):
+                results.append(self.get_tweet(row['id']))
+                if len(results) >= limit:
+                    break
+        return results
+
+    def _rows_by_buzz(self, ids, username=None):
+        """
+        ツイートの (id, text) をバズ度の高い順に返す（呼び出し側が必要な件数で打ち切る）
+
+        候補が少なければIDで引いて並べ、多ければ buzz_score インデックスを順に読む
+        （候補以外の行も返すので、呼び出し側で ids に含まれるか確かめる）。
+        """
+        conditions = []
+        params = []
+        if len(ids) <= _MAX_IN_IDS:
+            conditions.append(f"id IN ({','.join('?' * len(ids))})")
+            params.extend(ids)
+        if username:
+            conditions.append("username = ?")
+            params.append(username)
+        sql = "SELECT id, text FROM tweets"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        return self.conn.execute(sql + " ORDER BY buzz_score DESC, id DESC", params)
+
+    def overview(self, username=None):
+        """累計のツイート数・いいね・リツイート・リプライ（username省略時は全体）"""
+        row = self.conn.execute(
+            "SELECT tweets, likes, retweets, replies, quotes FROM user_totals WHERE username = ?",
+            (username or ALL_USERS,)
+        ).fetchone()
+        if row is None:
+            return {'tweets': 0, 'likes': 0, 'retweets': 0, 'replies': 0, 'quotes': 0}
+        return dict(row)
+
+    def daily_series(self, username=None, start=None, end=None):
+        """
+        日次集計（ダッシュボードの tweetData と同じ形式）
+
+        Args:
+            username (str): ユーザー名（省略時は全体）
+            start, end (str): 'YYYY-MM-DD' の範囲（両端を含む）
+        """
+        query = "SELECT day, tweets, likes, retweets, replies FROM daily_rollups WHERE username = ?"
+        params = [username or ALL_USERS]
+        if start:
+            query += " AND day >= ?"
+            params.append(start)
+        if end:
+            query += " AND day <= ?"
+            params.append(end)
+        query += " ORDER BY day"
+        return [
+            {'date': row['day'], 'tweets': row['tweets'], 'likes': row['likes'],
+             'retweets': row['retweets'], 'replies': row['replies']}
+            for row in self.conn.execute(query, params)
+        ]
+
+    def top_tweets(self, limit=10, username=None):
+        """バズ度の高い順にツイートを取得（buzz_score インデックスを使用）"""
+        if username:
+            rows = self.conn.execute(
+                "SELECT data FROM tweets WHERE username = ? ORDER BY buzz_score DESC LIMIT ?",
+                (username, limit)
+            )
+        else:
+            rows = self.conn.execute("SELECT data FROM tweets ORDER BY buzz_score DESC LIMIT ?", (limit,))
+        return [json.loads(row['data']) for row in rows]
+
+    def dashboard(self, username=None, days=7, top=5):
+        """
+        ダッシュボード（page.tsx）の各パネル用データ
+
+        Returns:
+            dict: 'overview', 'tweetData', 'engagementData', 'topTweets'
+        """
+        end = datetime.now(self.tz)
+        start = (end - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+        totals = self.overview(username)
+
+        top_tweets = []
+        for record in self.top_tweets(top, username):
+            metrics = record.get('metrics') or {}
+            created_at = parse_created_at(record.get('created_at'))
+            top_tweets.append({
+                'id': record['id'],
+                'text': record.get('text'),
+                'likes': metrics.get('favorite_count', 0),
+                'retweets': metrics.get('retweet_count', 0),
+                'replies': metrics.get('reply_count', 0),
+                'date': self._day(created_at) if created_at is not None else None,
+                'url': record.get('url'),
+            })
+
+        return {
+            'overview': totals,
+            'tweetData': self.daily_series(username, start, end.strftime('%Y-%m-%d')),
+            'engagementData': [
+                {'name': 'いいね', 'value': totals['likes'], 'color': '#ef4444'},
+                {'name': 'リツイート', 'value': totals['retweets'], 'color': '#22c55e'},
+                {'name': 'リプライ', 'value': totals['replies'], 'color': '#3b82f6'},
+            ],
+            'topTweets': top_tweets,
+        }
+
+    def close(self):
+        self.conn.close()
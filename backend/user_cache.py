@@ -0,0 +1,190 @@
+# user_cache.py
+import json
+import sqlite3
+import time
+
+# 保存する列（先頭が主キー）
+_COLUMNS = {
+    'screen_names': ('screen_name', 'user_id', 'fetched_at', 'last_access'),
+    'profiles': ('user_id', 'data', 'fetched_at', 'last_access'),
+}
+
+
+class UserCache:
+    def __init__(self, path='user_cache.db', id_ttl=7 * 86400, profile_ttl=86400, max_entries=50000,
+                 commit_every=100, commit_interval=5.0):
+        """
+        ユーザー情報の永続キャッシュ（SQLite）
+
+        screen_name→id と id→プロフィールの2種類を保存し、
+        実行をまたいで同じユーザーの再取得を防ぐ。
+
+        Args:
+            path (str): SQLiteファイルのパス（':memory:' でメモリ上のみ）
+            id_ttl (int): screen_name→id の有効期限（秒）
+            profile_ttl (int): プロフィールの有効期限（秒）
+            max_entries (int): 各テーブルの最大件数（超えたら最終アクセスが古い順に削除）
+            commit_every (int): 最終アクセス時刻をメモリにためてまとめて保存する件数（残りは flush() / close() で保存）
+            commit_interval (float): 前回の保存からこの秒数が経ったら commit_every 未満でも保存
+        """
+        self.path = path
+        self.id_ttl = id_ttl
+        self.profile_ttl = profile_ttl
+        self.max_entries = max_entries
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        # 読み出しのたびに書き込まないよう、最終アクセス時刻はメモリにためてまとめて更新する
+        self.accessed = {table: {} for table in _COLUMNS}
+        self.pending = 0
+        self.last_flush = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS screen_names (
+                screen_name TEXT PRIMARY KEY COLLATE NOCASE,
+                user_id TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS profiles (
+                user_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        # LRU削除用のインデックス
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_screen_names_access ON screen_names(last_access)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_profiles_access ON profiles(last_access)")
+        self.conn.commit()
+        # 件数上限の判定のため、テーブルごとの件数はメモリ上で数える（他のプロセスの追加は次に開くまで数えない）
+        self.counts = {
+            table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ('screen_names', 'profiles')
+        }
+
+    def get_user_id(self, screen_name):
+        """screen_nameからユーザーIDを取得（期限切れ・未登録はNone）"""
+        now = time.time()
+        row = self.conn.execute(
+            "SELECT user_id, fetched_at FROM screen_names WHERE screen_name = ?",
+            (screen_name,)
+        ).fetchone()
+
+        if row is None or now - row[1] > self.id_ttl:
+            self.misses += 1
+            return None
+
+        self._accessed('screen_names', screen_name, now)
+        self.hits += 1
+        return row[0]
+
+    def get_profile(self, user_id):
+        """ユーザーIDからプロフィールを取得（期限切れ・未登録はNone）"""
+        now = time.time()
+        row = self.conn.execute(
+            "SELECT data, fetched_at FROM profiles WHERE user_id = ?",
+            (str(user_id),)
+        ).fetchone()
+
+        if row is None or now - row[1] > self.profile_ttl:
+            self.misses += 1
+            return None
+
+        self._accessed('profiles', str(user_id), now)
+        self.hits += 1
+        return json.loads(row[0])
+
+    def get_profile_by_screen_name(self, screen_name):
+        """screen_nameからプロフィールを取得（どちらかが無ければNone）"""
+        user_id = self.get_user_id(screen_name)
+        if user_id is None:
+            return None
+        return self.get_profile(user_id)
+
+    def put_user_id(self, screen_name, user_id):
+        """screen_name→id を保存"""
+        now = time.time()
+        self._put('screen_names', (screen_name, str(user_id), now, now))
+        self.conn.commit()
+
+    def put_profile(self, profile):
+        """
+        プロフィールを保存（screen_name→id も同時に更新）
+
+        Args:
+            profile (dict): get_user_info と同じ形式のユーザー情報
+        """
+        now = time.time()
+        user_id = str(profile['id'])
+        self._put('profiles', (user_id, json.dumps(profile, ensure_ascii=False, default=str), now, now))
+        if profile.get('username'):
+            self._put('screen_names', (profile['username'], user_id, now, now))
+        self.conn.commit()
+
+    def _put(self, table, row):
+        """1行を保存（新しいキーのときだけ件数を増やして上限を確認する）"""
+        columns = _COLUMNS[table]
+        # 保存する行の最終アクセス時刻の方が新しいので、ためていた分は捨てる
+        self.accessed[table].pop(row[0], None)
+        cursor = self.conn.execute(
+            f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            row
+        )
+        if cursor.rowcount:
+            self.counts[table] += 1
+            self._evict(table)
+        else:
+            self.conn.execute(
+                f"UPDATE {table} SET {', '.join(f'{column} = ?' for column in columns)} WHERE {columns[0]} = ?",
+                (*row, row[0])
+            )
+
+    def _evict(self, table):
+        """件数上限を超えた分を最終アクセスの古い順に削除"""
+        overflow = self.counts[table] - self.max_entries
+        if overflow > 0:
+            # ためている最終アクセス時刻を反映してから古い順に消す
+            self.flush()
+            cursor = self.conn.execute(
+                f"DELETE FROM {table} WHERE rowid IN "
+                f"(SELECT rowid FROM {table} ORDER BY last_access ASC LIMIT ?)",
+                (overflow,)
+            )
+            self.counts[table] -= cursor.rowcount
+
+    def _accessed(self, table, key, now):
+        """最終アクセス時刻をためる（commit_every 件たまったか commit_interval 秒経っていたら保存）"""
+        self.accessed[table][key] = now
+        self.pending += 1
+        if self.pending >= self.commit_every or time.monotonic() - self.last_flush >= self.commit_interval:
+            self.flush()
+
+    def flush(self):
+        """ためている最終アクセス時刻を保存"""
+        with self.conn:
+            for table, accessed in self.accessed.items():
+                if accessed:
+                    self.conn.executemany(
+                        f"UPDATE {table} SET last_access = ? WHERE {_COLUMNS[table][0]} = ?",
+                        [(now, key) for key, now in accessed.items()]
+                    )
+                    accessed.clear()
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+    def purge_expired(self):
+        """期限切れのエントリを削除"""
+        now = time.time()
+        for table, ttl in (('screen_names', self.id_ttl), ('profiles', self.profile_ttl)):
+            cursor = self.conn.execute(f"DELETE FROM {table} WHERE fetched_at < ?", (now - ttl,))
+            self.counts[table] -= cursor.rowcount
+        self.conn.commit()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
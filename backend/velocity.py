@@ -0,0 +1,237 @@
+# velocity.py
+import heapq
+import sqlite3
+import time
+from array import array
+
+# スナップショットに保存するエンゲージメントの種類（_tweet_to_record の metrics のキー）
+METRIC_KEYS = ('retweet_count', 'favorite_count', 'reply_count', 'quote_count')
+
+# 伸び判定の重み（calculate_buzz_score と同じ）
+VELOCITY_WEIGHTS = (3, 1, 2, 0)
+
+
+class MetricHistory:
+    __slots__ = ('base_time', 'base_values', 'last_time', 'last_values', 'deltas')
+
+    def __init__(self, timestamp, values):
+        """
+        1ツイート分のエンゲージメント推移（差分で保持）
+
+        初回の値と時刻だけをそのまま持ち、以降は前回との差分を
+        1つの整数配列に (経過秒, 各指標の差分...) の順で詰めて保存する。
+        """
+        self.base_time = int(timestamp)
+        self.base_values = tuple(values)
+        self.last_time = self.base_time
+        self.last_values = tuple(values)
+        self.deltas = array('q')
+
+    def append(self, timestamp, values):
+        """スナップショットを追加（前回と同じ時刻・値なら追加しない）"""
+        timestamp = int(timestamp)
+        values = tuple(values)
+        if timestamp <= self.last_time or values == self.last_values:
+            return False
+        self.deltas.append(timestamp - self.last_time)
+        self.deltas.extend(v - prev for v, prev in zip(values, self.last_values))
+        self.last_time = timestamp
+        self.last_values = values
+        return True
+
+    def __len__(self):
+        return 1 + len(self.deltas) // (1 + len(self.base_values))
+
+    def points(self):
+        """(時刻, 各指標の値のタプル) を古い順に返す"""
+        width = 1 + len(self.base_values)
+        timestamp = self.base_time
+        values = list(self.base_values)
+        yield timestamp, tuple(values)
+        for i in range(0, len(self.deltas), width):
+            timestamp += self.deltas[i]
+            for j in range(len(values)):
+                values[j] += self.deltas[i + 1 + j]
+            yield timestamp, tuple(values)
+
+    def nbytes(self):
+        return self.deltas.itemsize * len(self.deltas)
+
+
+class VelocityTracker:
+    def __init__(self, weights=VELOCITY_WEIGHTS, max_points=48, max_age=48 * 3600, prune_interval=600):
+        """
+        ツイートごとのエンゲージメント推移から伸び率（速度）と加速度を計算
+
+        常駐するサーバーでも増え続けないよう、最終スナップショットから max_age 秒
+        更新の無いツイートは記録のついでに（prune_interval 秒ごとに）削除する。
+
+        Args:
+            weights (tuple): METRIC_KEYS の順の重み
+            max_points (int): 速度計算に使う直近のスナップショット数
+            max_age (float): 推移を保持する秒数（Noneなら削除しない）
+            prune_interval (float): 古い推移を削除する間隔（秒）
+        """
+        self.weights = weights
+        self.max_points = max_points
+        self.max_age = max_age
+        self.prune_interval = prune_interval
+        self.last_prune = time.time()
+        self.histories = {}
+        self.usernames = {}
+
+    def record(self, tweet_id, metrics, timestamp=None, username=None):
+        """
+        エンゲージメントのスナップショットを記録
+
+        Args:
+            tweet_id: ツイートID
+            metrics (dict): retweet_count などのエンゲージメント数
+            timestamp (float): 取得時刻（省略時は現在時刻）
+            username (str): 投稿者（結果表示用）
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        values = tuple(int(metrics.get(key) or 0) for key in METRIC_KEYS)
+        tweet_id = str(tweet_id)
+        history = self.histories.get(tweet_id)
+        if history is None:
+            self.histories[tweet_id] = MetricHistory(timestamp, values)
+        else:
+            history.append(timestamp, values)
+        if username:
+            self.usernames[tweet_id] = username
+
+    def record_tweets(self, records, timestamp=None):
+        """正規化したツイートdictのリストをまとめて記録"""
+        if timestamp is None:
+            timestamp = time.time()
+        for record in records:
+            self.record(record['id'], record.get('metrics') or {}, timestamp, record.get('username'))
+        if timestamp - self.last_prune >= self.prune_interval:
+            self.prune(timestamp)
+
+    def prune(self, now=None):
+        """max_age 秒以上更新の無いツイートを削除"""
+        if now is None:
+            now = time.time()
+        self.last_prune = now
+        if self.max_age is None:
+            return 0
+        return self.forget(now - self.max_age)
+
+    def _weighted_points(self, history):
+        points = list(history.points())[-self.max_points:]
+        return [
+            (timestamp, sum(w * v for w, v in zip(self.weights, values)))
+            for timestamp, values in points
+        ]
+
+    def scores(self, tweet_id):
+        """
+        速度と加速度を計算
+
+        Returns:
+            dict: 'velocity'（直近区間の1時間あたり増加）、
+                  'acceleration'（直近区間と1つ前の区間の速度差 / 時間）、
+                  'engagement'（最新の重み付き合計）、'points'（スナップショット数）
+            スナップショットが無ければNone
+        """
+        history = self.histories.get(str(tweet_id))
+        if history is None:
+            return None
+        points = self._weighted_points(history)
+        result = {'velocity': 0.0, 'acceleration': 0.0, 'engagement': points[-1][1], 'points': len(points)}
+        if len(points) < 2:
+            return result
+
+        (t0, v0), (t1, v1) = points[-2], points[-1]
+        velocity = (v1 - v0) / ((t1 - t0) / 3600.0)
+        result['velocity'] = velocity
+        if len(points) >= 3:
+            tp, vp = points[-3]
+            previous_velocity = (v0 - vp) / ((t0 - tp) / 3600.0)
+            result['acceleration'] = (velocity - previous_velocity) / ((t1 - tp) / 2 / 3600.0)
+        return result
+
+    def rising(self, top_n=20, min_velocity=0.0):
+        """
+        伸び率の高いツイートを返す
+
+        Returns:
+            list: {'id', 'username', 'velocity', 'acceleration', 'engagement', 'points'} のリスト
+        """
+        results = []
+        for tweet_id in self.histories:
+            score = self.scores(tweet_id)
+            if score['points'] < 2 or score['velocity'] < min_velocity:
+                continue
+            results.append({'id': tweet_id, 'username': self.usernames.get(tweet_id), **score})
+        results.sort(key=lambda r: (r['velocity'], r['acceleration']), reverse=True)
+        return results[:top_n]
+
+    def forget(self, older_than):
+        """最終スナップショットが指定時刻より古いツイートを削除"""
+        stale = [tid for tid, h in self.histories.items() if h.last_time < older_than]
+        for tweet_id in stale:
+            del self.histories[tweet_id]
+            self.usernames.pop(tweet_id, None)
+        return len(stale)
+
+    def tracked_ids(self):
+        return list(self.histories)
+
+    def recent_ids(self, limit):
+        """最終スナップショットの新しい順に最大 limit 件のツイートID"""
+        return [
+            tweet_id for tweet_id, _ in
+            heapq.nlargest(limit, self.histories.items(), key=lambda item: item[1].last_time)
+        ]
+
+    def save(self, path):
+        """推移をSQLiteに保存（差分配列はそのままバイナリで保存。prune で消した推移は保存先からも消す）"""
+        conn = sqlite3.connect(path)
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS metric_history (
+                    tweet_id TEXT PRIMARY KEY,
+                    username TEXT,
+                    base_time INTEGER NOT NULL,
+                    base_values TEXT NOT NULL,
+                    last_time INTEGER NOT NULL,
+                    last_values TEXT NOT NULL,
+                    deltas BLOB NOT NULL
+                )
+            """)
+            # 追跡中の推移だけで書き直す（同じトランザクション内なので途中で失敗しても前回の内容が残る）
+            conn.execute("DELETE FROM metric_history")
+            conn.executemany(
+                "INSERT INTO metric_history VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (tweet_id, self.usernames.get(tweet_id), h.base_time,
+                     ','.join(map(str, h.base_values)), h.last_time,
+                     ','.join(map(str, h.last_values)), h.deltas.tobytes())
+                    for tweet_id, h in self.histories.items()
+                ]
+            )
+        conn.close()
+
+    def load(self, path):
+        """save() で保存した推移を読み込む"""
+        conn = sqlite3.connect(path)
+        try:
+            rows = conn.execute("SELECT * FROM metric_history").fetchall()
+        except sqlite3.OperationalError:
+            rows = []
+        conn.close()
+
+        for tweet_id, username, base_time, base_values, last_time, last_values, deltas in rows:
+            history = MetricHistory(base_time, tuple(int(v) for v in base_values.split(',')))
+            history.last_time = last_time
+            history.last_values = tuple(int(v) for v in last_values.split(','))
+            history.deltas.frombytes(deltas)
+            self.histories[tweet_id] = history
+            if username:
+                self.usernames[tweet_id] = username
+        self.prune()
+        return len(rows)
@@ -0,0 +1,34 @@
+import { NextRequest, NextResponse } from "next/server";
+
+// backend/server.py の接続先
+const SCRAPER_API_URL = process.env.SCRAPER_API_URL ?? "http://127.0.0.1:8000";
+
+export async function GET(
+  request: NextRequest,
+  { params }: { params: Promise<{ path: string[] }> }
+) {
+  const { path } = await params;
+  const url = `${SCRAPER_API_URL}/api/${path
+    .map(encodeURIComponent)
+    .join("/")}${request.nextUrl.search}`;
+
+  try {
+    const response = await fetch(url, { cache: "no-store" });
+    const contentType = response.headers.get("content-type") ?? "";
+    // /api/metrics は Prometheus のテキスト形式なのでそのまま返す
+    if (!contentType.includes("application/json")) {
+      return new NextResponse(await response.text(), {
+        status: response.status,
+        headers: { "Content-Type": contentType },
+      });
+    }
+    const data = await response.json();
+    return NextResponse.json(data, { status: response.status });
+  } catch (error) {
+    console.error("Scraper API Error:", error);
+    return NextResponse.json(
+      { error: "Failed to reach scraper service" },
+      { status: 502 }
+    );
+  }
+}